@@ -10,31 +10,98 @@ def create_app():
     # Configurações
     app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
     app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///investments.db")
-    # Configuração para PostgreSQL no Render
-    if "postgres" in app.config["SQLALCHEMY_DATABASE_URI"]:
-        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"pool_pre_ping": True}
+    # Perfil do banco: pool, timeouts, pragmas do SQLite e réplica de leitura
+    from app.database import carregar_config, configurar_engines
+    carregar_config(app)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET_KEY'] = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-string')
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=24)
+    app.config['PIX_QR_WORKERS'] = int(os.environ.get('PIX_QR_WORKERS', 2))
+    app.config['CATALOG_CACHE_TTL'] = int(os.environ.get('CATALOG_CACHE_TTL', 30))
+    app.config['CATALOG_MAX_AGE'] = int(os.environ.get('CATALOG_MAX_AGE', 0))
+    app.config['IDENTITY_CACHE_TTL'] = int(os.environ.get('IDENTITY_CACHE_TTL', 5))
+    app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256:600000')
+    app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 4))
+    app.config['ADMIN_TOKEN'] = os.environ.get('ADMIN_TOKEN')
+    app.config['DB_AUTO_MIGRATE'] = os.environ.get('DB_AUTO_MIGRATE', 'false').lower() in ('1', 'true', 'sim')
+    app.config['DB_SCHEMA_CHECK'] = os.environ.get('DB_SCHEMA_CHECK', 'false').lower() in ('1', 'true', 'sim')
+    app.config['JSON_BACKEND'] = os.environ.get('JSON_BACKEND', 'auto')
+    app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', 'false').lower() in ('1', 'true', 'sim')
+    app.config['METRICS_TOKEN'] = os.environ.get('METRICS_TOKEN')
+    app.config['PROFILE_SAMPLE_RATE'] = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+    app.config['PROFILE_DIR'] = os.environ.get('PROFILE_DIR', 'profiles')
+    app.config['ASGI_EXECUTOR_WORKERS'] = int(os.environ.get('ASGI_EXECUTOR_WORKERS', 16))
+    # Rate limiting e idempotência das rotas que movem dinheiro
+    app.config['KV_STORE_URL'] = os.environ.get('KV_STORE_URL', 'memory://')
+    app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'sim')
+    app.config['RATE_LIMIT_USER'] = os.environ.get('RATE_LIMIT_USER', '30/60')
+    app.config['RATE_LIMIT_IP'] = os.environ.get('RATE_LIMIT_IP', '120/60')
+    app.config['IDEMPOTENCY_TTL'] = int(os.environ.get('IDEMPOTENCY_TTL', 24 * 3600))
+    app.config['IDEMPOTENCY_LOCK_TTL'] = int(os.environ.get('IDEMPOTENCY_LOCK_TTL', 60))
+    # Acompanhamento da captação em tempo real (SSE)
+    app.config['FUNDRAISING_BROKER_URL'] = os.environ.get('FUNDRAISING_BROKER_URL', 'memory://')
+    app.config['FUNDRAISING_MAX_ASSINANTES'] = int(os.environ.get('FUNDRAISING_MAX_ASSINANTES', 10000))
+    app.config['FUNDRAISING_KEEPALIVE'] = int(os.environ.get('FUNDRAISING_KEEPALIVE', 15))
+    app.config['FUNDRAISING_LONG_POLL'] = int(os.environ.get('FUNDRAISING_LONG_POLL', 20))
+    # Ligado por app.asgi: o cliente só mantém o SSE aberto quando servido por ASGI
+    app.config['SERVIDOR_ASGI'] = False
+    # Proxies reversos confiáveis à frente da aplicação (IP real via X-Forwarded-For)
+    app.config['PROXY_HOPS'] = int(os.environ.get('PROXY_HOPS', 0))
+    
+    # Serialização JSON: orjson quando disponível, decimais como string exata
+    from app.utils.serialization import FastJSONProvider
+    app.json = FastJSONProvider(app)
     
     # Inicializar extensões
     from app.models import db
     db.init_app(app)
+    configurar_engines(app, db)
+    
+    if app.config['PROXY_HOPS']:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_HOPS'])
+    
+    from app.services import fundraising, kvstore
+    kvstore.init_app(app)
+    fundraising.init_app(app)
     
     jwt = JWTManager()
     jwt.init_app(app)
+    # Rotas com jwt_required só atendem usuários existentes e ativos
+    from app.services import identity
+    identity.registrar(jwt)
     CORS(app, origins="*")  # Permitir CORS para todas as origens
     
     # Registrar blueprints
     from app.routes.auth import auth_bp
     from app.routes.investments import investments_bp
+    from app.routes.admin import admin_bp
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(investments_bp)
+    app.register_blueprint(admin_bp)
     
-    # Criar tabelas
-    with app.app_context():
-        db.create_all()
+    # Instrumentação opcional: latência, SQL e serialização por endpoint
+    if app.config['METRICS_ENABLED']:
+        from app.metrics import register_metrics
+        register_metrics(app)
+    
+    # Comandos de manutenção (flask <comando>)
+    from app.commands import register_commands
+    register_commands(app)
+    
+    # O esquema é criado e atualizado por "flask db-upgrade"; a inicialização
+    # só aplica as migrações quando DB_AUTO_MIGRATE estiver ligado (desenvolvimento)
+    # e só consulta o banco para conferir a versão com DB_SCHEMA_CHECK
+    if app.config['DB_AUTO_MIGRATE']:
+        from app import migrations
+        with app.app_context():
+            migrations.aplicar(db.engine)
+    elif app.config['DB_SCHEMA_CHECK']:
+        from app import migrations
+        with app.app_context():
+            pendentes = [versao for versao, aplicada in migrations.status(db.engine) if not aplicada]
+        if pendentes:
+            app.logger.warning('Migrações pendentes: %s (rode flask db-upgrade)', ', '.join(pendentes))
     
     return app
-
@@ -0,0 +1,432 @@
+import asyncio
+import base64
+import dataclasses
+import functools
+import json
+import re
+import uuid
+from urllib.parse import parse_qs
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.wsgi import WsgiToAsgi
+from flask_jwt_extended import create_access_token, decode_token
+from jwt import ExpiredSignatureError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app import create_app
+from app.database import engine_options, registrar_pragmas
+from app.models import db
+from app.models.user import User, Transaction, TransactionType, TransactionStatus
+from app.services import fundraising, identity, idempotency, kvstore, ledger, passwords, pix_qr, ratelimit
+
+# Modo ASGI: as rotas mais chamadas de auth_bp e investments_bp têm handlers
+# assíncronos com sessão async do SQLAlchemy; o restante da API continua nas
+# views do Flask, servidas pelo adaptador WSGI do asgiref. Hashing de senha e
+# renderização de QR Code rodam em executor para não bloquear o event loop.
+
+DRIVERS_ASSINCRONOS = {'sqlite': 'sqlite+aiosqlite', 'postgresql': 'postgresql+asyncpg'}
+DEFAULT_EXECUTOR_WORKERS = 16
+MAX_CORPO = 1024 * 1024
+
+class ErroHTTP(Exception):
+    def __init__(self, status, corpo):
+        super().__init__(corpo)
+        self.status = status
+        self.corpo = corpo
+
+class Requisicao:
+    def __init__(self, scope, corpo):
+        self.metodo = scope['method']
+        self.caminho = scope['path']
+        self.ip = scope['client'][0] if scope.get('client') else None
+        self.headers = {nome.decode('latin-1').lower(): valor.decode('latin-1') for nome, valor in scope['headers']}
+        self.args = {nome: valores[-1] for nome, valores in parse_qs(scope.get('query_string', b'').decode()).items()}
+        self.corpo = corpo
+
+    def json(self):
+        try:
+            return json.loads(self.corpo) if self.corpo else None
+        except ValueError:
+            raise ErroHTTP(400, {'error': 'JSON inválido'})
+
+def criar_engine_assincrono(app):
+    """Engine async apontando para o mesmo banco do app, com o mesmo perfil"""
+    with app.app_context():
+        url = db.engine.url
+    backend = url.get_backend_name()
+    if backend not in DRIVERS_ASSINCRONOS:
+        raise ValueError(f'Modo ASGI não suportado para {backend}')
+
+    opcoes = engine_options(url.render_as_string(hide_password=False), app.config)
+    connect_args = opcoes.pop('connect_args', {})
+    if backend == 'postgresql' and 'options' in connect_args:
+        # asyncpg não aceita "options"; o statement_timeout vai em server_settings
+        connect_args = {'server_settings': {'statement_timeout': str(app.config['DB_STATEMENT_TIMEOUT_MS'])}}
+    engine = create_async_engine(url.set(drivername=DRIVERS_ASSINCRONOS[backend]),
+                                 connect_args=connect_args, **opcoes)
+    registrar_pragmas(engine.sync_engine, app.config)
+    return engine
+
+class AsgiApp:
+    """Aplicação ASGI: handlers assíncronos nas rotas quentes, Flask no restante"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        flask_app.config['SERVIDOR_ASGI'] = True
+        self.wsgi = WsgiToAsgi(flask_app)
+        self.engine = criar_engine_assincrono(flask_app)
+        self.sessoes = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.executor = ThreadPoolExecutor(
+            max_workers=flask_app.config.get('ASGI_EXECUTOR_WORKERS', DEFAULT_EXECUTOR_WORKERS),
+            thread_name_prefix='asgi')
+        self.json = flask_app.json
+        self.store = kvstore.obter_store(flask_app)
+        self.rotas = [
+            ('POST', re.compile(r'/api/login'), self.login),
+            ('GET', re.compile(r'/api/saldo'), self.saldo),
+            ('GET', re.compile(r'/api/profile'), self.perfil),
+            ('POST', re.compile(r'/api/gerar_pix'), self.gerar_pix),
+            ('GET', re.compile(r'/api/pix/(?P<pix_id>[^/]+)/qr/(?P<digest>[^/.]+)\.(?P<formato>[^/.]+)'),
+             self.qr_code),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] == 'http':
+            if scope['method'] == 'GET' and scope['path'] == '/api/investments/stream':
+                return await self.stream_captacao(scope, receive, send)
+            for metodo, padrao, handler in self.rotas:
+                casamento = padrao.fullmatch(scope['path'])
+                if casamento and scope['method'] == metodo:
+                    return await self._despachar(handler, casamento.groupdict(), scope, receive, send)
+        return await self.wsgi(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            mensagem = await receive()
+            if mensagem['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensagem['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _despachar(self, handler, parametros, scope, receive, send):
+        try:
+            corpo = await self._ler_corpo(receive)
+            status, resposta, headers = await handler(Requisicao(scope, corpo), **parametros)
+        except ErroHTTP as e:
+            status, resposta, headers = e.status, e.corpo, {}
+        except idempotency.IdempotenciaErro as e:
+            status, resposta, headers = e.status_code, {'error': str(e)}, {}
+        except passwords.HashIndisponivel as e:
+            status, resposta, headers = 503, {'error': str(e)}, {}
+        except Exception as e:
+            status, resposta, headers = 500, {'error': str(e)}, {}
+
+        if isinstance(resposta, (bytes, type(None))):
+            dados = resposta or b''
+        else:
+            dados = self.json.dumps_bytes(resposta)
+            headers.setdefault('Content-Type', 'application/json')
+        headers['Access-Control-Allow-Origin'] = '*'
+        headers['Content-Length'] = str(len(dados))
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(nome.encode('latin-1'), valor.encode('latin-1')) for nome, valor in headers.items()]})
+        await send({'type': 'http.response.body', 'body': dados})
+
+    async def _ler_corpo(self, receive):
+        partes = []
+        tamanho = 0
+        while True:
+            mensagem = await receive()
+            if mensagem['type'] == 'http.disconnect':
+                break
+            partes.append(mensagem.get('body', b''))
+            tamanho += len(partes[-1])
+            if tamanho > MAX_CORPO:
+                raise ErroHTTP(413, {'error': 'Corpo da requisição muito grande'})
+            if not mensagem.get('more_body'):
+                break
+        return b''.join(partes)
+
+    def _no_contexto(self, funcao, *args, **kwargs):
+        with self.flask_app.app_context():
+            return funcao(*args, **kwargs)
+
+    async def em_executor(self, funcao, *args, **kwargs):
+        """Roda trabalho bloqueante ou de CPU no executor, com o contexto do Flask"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(self._no_contexto, funcao, *args, **kwargs))
+
+    def _identidade(self, requisicao, query_string=False):
+        # Mesmas respostas do flask_jwt_extended: 401 sem token ou expirado, 422 inválido
+        autorizacao = requisicao.headers.get('authorization', '')
+        if autorizacao.startswith('Bearer '):
+            token = autorizacao[len('Bearer '):]
+        elif query_string and requisicao.args.get('jwt'):
+            token = requisicao.args['jwt']
+        else:
+            raise ErroHTTP(401, {'msg': 'Missing Authorization Header'})
+        try:
+            with self.flask_app.app_context():
+                return int(decode_token(token)['sub'])
+        except ExpiredSignatureError:
+            raise ErroHTTP(401, {'msg': 'Token has expired'})
+        except Exception as e:
+            raise ErroHTTP(422, {'msg': str(e)})
+
+    async def _autenticar(self, requisicao, query_string=False):
+        """Usuário do token, existente e ativo, pelo cache de identidade (como o jwt_required das views)"""
+        user_id = self._identidade(requisicao, query_string)
+        usuario, marca = identity.em_cache(user_id)
+        if usuario is None:
+            async with self.sessoes() as sessao:
+                linha = (await sessao.execute(select(*identity.COLUNAS).where(User.id == user_id))).first()
+            usuario = self._no_contexto(identity.guardar, linha, marca)
+        if usuario is None or not usuario.ativo:
+            raise ErroHTTP(401, {'error': 'Usuário inativo ou inexistente'})
+        return usuario
+
+    async def _saldo(self, sessao, user_id):
+        return await sessao.run_sync(lambda sessao_sync: ledger.saldo(user_id, sessao=sessao_sync))
+
+    async def login(self, requisicao):
+        """Autentica um usuário"""
+        data = requisicao.json()
+        if not data or 'cpf' not in data or 'senha' not in data:
+            return 400, {'error': 'CPF e senha são obrigatórios'}, {}
+
+        async with self.sessoes() as sessao:
+            user = (await sessao.execute(select(User).where(User.cpf == data['cpf']))).scalars().first()
+
+            if not user or not await self.em_executor(passwords.verificar_senha, user, data['senha']):
+                return 401, {'error': 'CPF ou senha inválidos'}, {}
+
+            if not user.ativo:
+                return 401, {'error': 'Usuário inativo'}, {}
+
+            # Persistir o hash refeito quando o algoritmo ou o custo mudaram
+            if sessao.is_modified(user):
+                await sessao.commit()
+
+            saldo = await self._saldo(sessao, user.id)
+
+        access_token = self._no_contexto(create_access_token, identity=str(user.id))
+        return 200, {'access_token': access_token, 'user': user.to_dict(saldo=saldo)}, {}
+
+    async def perfil(self, requisicao):
+        """Retorna o perfil do usuário logado"""
+        usuario = await self._autenticar(requisicao)
+        async with self.sessoes() as sessao:
+            saldo = await self._saldo(sessao, usuario.id)
+        return 200, dataclasses.replace(usuario, saldo=saldo).to_dict(), {}
+
+    async def saldo(self, requisicao):
+        """Retorna o saldo do usuário logado"""
+        user_id = (await self._autenticar(requisicao)).id
+        async with self.sessoes() as sessao:
+            saldo = await self._saldo(sessao, user_id)
+        if saldo is None:
+            return 404, {'error': 'Usuário não encontrado'}, {}
+        return 200, {'saldo': saldo}, {}
+
+    async def _protegido(self, requisicao, endpoint, user_id, handler):
+        """Idempotency-Key e rate limiting, como os decoradores das views do Flask"""
+        valor = requisicao.headers.get(idempotency.HEADER.lower())
+        if valor is None:
+            return await self._limitado(requisicao, endpoint, user_id, handler)
+
+        config = self.flask_app.config
+        chave_store = idempotency.chave(user_id, requisicao.metodo, requisicao.caminho, valor)
+        impressao = idempotency.impressao(requisicao.corpo)
+        try:
+            gravada = await self.em_executor(idempotency.iniciar, self.store, chave_store, impressao,
+                                             config['IDEMPOTENCY_LOCK_TTL'])
+        except kvstore.StoreIndisponivel:
+            return await self._limitado(requisicao, endpoint, user_id, handler)
+        if gravada is not None:
+            return gravada['status'], idempotency.corpo_gravado(gravada), {
+                'Content-Type': gravada['content_type'], 'Idempotent-Replayed': 'true'}
+
+        resposta = None
+        try:
+            status, corpo, headers = await self._limitado(requisicao, endpoint, user_id, handler)
+            if not isinstance(corpo, bytes):
+                corpo = self.json.dumps_bytes(corpo)
+                headers['Content-Type'] = 'application/json'
+            resposta = (status, corpo, headers)
+            return resposta
+        finally:
+            argumentos = () if resposta is None else (
+                resposta[0], resposta[2].get('Content-Type'), resposta[1], config['IDEMPOTENCY_TTL'])
+            try:
+                await self.em_executor(idempotency.concluir, self.store, chave_store, impressao, *argumentos)
+            except kvstore.StoreIndisponivel:
+                pass
+
+    async def _limitado(self, requisicao, endpoint, user_id, handler):
+        config = self.flask_app.config
+        if config['RATE_LIMIT_ENABLED']:
+            try:
+                espera = await self.em_executor(ratelimit.consumir, self.store, config, endpoint,
+                                                user_id, requisicao.ip)
+            except kvstore.StoreIndisponivel:
+                espera = 0
+            if espera:
+                corpo, headers = ratelimit.resposta_excedida(espera)
+                return 429, corpo, headers
+        return await handler(requisicao, int(user_id))
+
+    async def gerar_pix(self, requisicao):
+        """Gera dados PIX para depósito"""
+        user_id = (await self._autenticar(requisicao)).id
+        # Mesmo endpoint das views, para compartilhar os baldes de rate limiting
+        return await self._protegido(requisicao, 'investments.gerar_pix', str(user_id), self._gerar_pix)
+
+    async def _gerar_pix(self, requisicao, user_id):
+        data = requisicao.json()
+
+        if not data or 'valor' not in data:
+            return 400, {'error': 'Valor é obrigatório'}, {}
+
+        valor = float(data['valor'])
+
+        if valor <= 0:
+            return 400, {'error': 'Valor deve ser positivo'}, {}
+
+        formato = data.get('formato', 'png')
+        if formato not in pix_qr.FORMATOS:
+            return 400, {'error': 'Formato deve ser png ou svg'}, {}
+
+        pix_id = str(uuid.uuid4())
+        payload = pix_qr.montar_payload(valor)
+
+        async with self.sessoes() as sessao:
+            transaction = Transaction(
+                user_id=user_id,
+                tipo=TransactionType.DEPOSITO,
+                valor=valor,
+                status=TransactionStatus.PENDENTE,
+                descricao=f'Depósito PIX de R$ {valor:.2f}',
+                pix_id=pix_id,
+                pix_qr_code=payload
+            )
+            sessao.add(transaction)
+            await sessao.commit()
+
+        response = {
+            'pix_id': pix_id,
+            'dados_bancarios': pix_qr.DADOS_BANCARIOS,
+            'pix_copia_e_cola': payload,
+            'qr_code_url': f'/api/pix/{pix_id}/qr/{pix_qr.digest(payload)}.{formato}',
+            'valor': valor,
+            'transaction_id': transaction.id
+        }
+
+        if data.get('inline'):
+            imagem = await self.em_executor(pix_qr.gerar_qr_code, payload, formato)
+            response['qr_code'] = base64.b64encode(imagem).decode()
+
+        return 200, response, {}
+
+    async def qr_code(self, requisicao, pix_id, digest, formato):
+        """Serve a imagem do QR Code PIX endereçada pelo hash do payload"""
+        if formato not in pix_qr.FORMATOS:
+            return 400, {'error': 'Formato deve ser png ou svg'}, {}
+
+        etag = f'"{digest}.{formato}"'
+        if requisicao.headers.get('if-none-match') == etag:
+            return 304, None, {'ETag': etag}
+
+        async with self.sessoes() as sessao:
+            conteudo = (await sessao.execute(
+                select(Transaction.pix_qr_code).where(Transaction.pix_id == pix_id)
+            )).scalar()
+        if not conteudo:
+            return 404, {'error': 'QR Code não encontrado'}, {}
+
+        imagem = await self.em_executor(pix_qr.imagem, conteudo, digest, formato)
+        if imagem is None:
+            return 404, {'error': 'QR Code não encontrado'}, {}
+
+        return 200, imagem, {
+            'Content-Type': pix_qr.FORMATOS[formato],
+            'ETag': etag,
+            'Cache-Control': 'public, max-age=31536000, immutable'
+        }
+
+    async def _enviar_erro(self, send, status, corpo):
+        dados = self.json.dumps_bytes(corpo)
+        await send({'type': 'http.response.start', 'status': status, 'headers': [
+            (b'content-type', b'application/json'), (b'content-length', str(len(dados)).encode()),
+            (b'access-control-allow-origin', b'*')]})
+        await send({'type': 'http.response.body', 'body': dados})
+
+    async def stream_captacao(self, scope, receive, send):
+        """Acompanha a captação em tempo real por server-sent events
+
+        Mesmo protocolo da view do Flask, mas cada conexão é apenas uma
+        corrotina esperando o aviso do hub, sem ocupar uma thread.
+        """
+        requisicao = Requisicao(scope, b'')
+        try:
+            await self._autenticar(requisicao, query_string=True)
+            try:
+                ids = fundraising.parse_ids(requisicao.args.get('ids'))
+            except ValueError as e:
+                raise ErroHTTP(400, {'error': str(e)})
+            iniciais = []
+            if ids:
+                async with self.sessoes() as sessao:
+                    iniciais = fundraising.deltas_iniciais(await sessao.execute(fundraising.consulta_estado(ids)))
+            loop = asyncio.get_running_loop()
+            sinal = asyncio.Event()
+            hub = fundraising.hub(self.flask_app)
+            assinatura = hub.assinar(ids, lambda: loop.call_soon_threadsafe(sinal.set))
+        except ErroHTTP as e:
+            return await self._enviar_erro(send, e.status, e.corpo)
+        except fundraising.HubLotado as e:
+            return await self._enviar_erro(send, 503, {'error': str(e)})
+        except Exception as e:
+            return await self._enviar_erro(send, 500, {'error': str(e)})
+
+        keepalive = self.flask_app.config.get('FUNDRAISING_KEEPALIVE', fundraising.DEFAULT_KEEPALIVE)
+        desconexao = asyncio.ensure_future(self._aguardar_desconexao(receive))
+        espera = None
+        try:
+            await send({'type': 'http.response.start', 'status': 200, 'headers': [
+                (b'content-type', b'text/event-stream'), (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'), (b'access-control-allow-origin', b'*')]})
+            inicio = 'retry: 3000\n\n' + (fundraising.evento_sse(iniciais) if iniciais else '')
+            await send({'type': 'http.response.body', 'body': inicio.encode(), 'more_body': True})
+            while True:
+                espera = asyncio.ensure_future(sinal.wait())
+                feitos, _ = await asyncio.wait({espera, desconexao}, timeout=keepalive,
+                                               return_when=asyncio.FIRST_COMPLETED)
+                if desconexao in feitos:
+                    break
+                if espera in feitos:
+                    sinal.clear()
+                    deltas = hub.retirar(assinatura)
+                    if not deltas:
+                        continue
+                    corpo = fundraising.evento_sse(deltas)
+                else:
+                    espera.cancel()
+                    corpo = fundraising.KEEPALIVE_SSE
+                await send({'type': 'http.response.body', 'body': corpo.encode(), 'more_body': True})
+        finally:
+            hub.cancelar(assinatura)
+            desconexao.cancel()
+            if espera is not None:
+                espera.cancel()
+
+    async def _aguardar_desconexao(self, receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+def create_asgi_app(flask_app=None):
+    return AsgiApp(flask_app or create_app())
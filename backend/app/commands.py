@@ -0,0 +1,155 @@
+import click
+
+def register_commands(app):
+    """Registra os comandos de manutenção no CLI do Flask (flask <comando>)"""
+
+    @app.cli.command('portfolio-rebuild')
+    @click.option('--user-id', type=int, default=None, help='Reconstruir apenas um usuário')
+    def portfolio_rebuild(user_id):
+        """Recalcula o resumo das carteiras a partir das aplicações"""
+        from app.services import portfolio
+        processadas = portfolio.reconstruir(user_id)
+        click.echo(f'{processadas} aplicações processadas')
+
+    @app.cli.command('import-investments')
+    @click.argument('arquivo', type=click.File('r', encoding='utf-8-sig'))
+    @click.option('--formato', type=click.Choice(['csv', 'jsonl']), default=None,
+                  help='Formato do arquivo (padrão: pela extensão)')
+    @click.option('--chunk-size', type=int, default=1000, help='Linhas por INSERT em lote')
+    def import_investments(arquivo, formato, chunk_size):
+        """Importa investimentos de um arquivo CSV ou JSON lines"""
+        from app.services import importer
+        if formato is None:
+            formato = 'jsonl' if arquivo.name.endswith(('.jsonl', '.ndjson')) else 'csv'
+        resultado = importer.importar(arquivo, formato, chunk_size=chunk_size)
+        for erro in resultado['erros']:
+            click.echo(f"linha {erro['linha']}: {erro['erro']}", err=True)
+        click.echo(f"{resultado['inseridos']} inseridos, {resultado['rejeitados']} rejeitados")
+
+    @app.cli.command('settle-deposits')
+    @click.argument('arquivo', type=click.File('r', encoding='utf-8-sig'))
+    @click.option('--formato', type=click.Choice(['csv', 'jsonl']), default=None,
+                  help='Formato do extrato (padrão: pela extensão)')
+    @click.option('--batch-size', type=int, default=500, help='Lançamentos por transação')
+    def settle_deposits(arquivo, formato, batch_size):
+        """Liquida depósitos PIX pendentes a partir de um extrato bancário"""
+        import time
+        from app.services import settlement
+        if formato is None:
+            formato = 'jsonl' if arquivo.name.endswith(('.jsonl', '.ndjson')) else 'csv'
+        inicio = time.perf_counter()
+        relatorio = settlement.liquidar(settlement.ler_extrato(arquivo, formato), batch_size=batch_size)
+        duracao = time.perf_counter() - inicio
+        for chave, valor in relatorio.items():
+            click.echo(f'{chave}: {valor}')
+        click.echo(f"{relatorio['liquidados'] / duracao:.0f} liquidados/s")
+
+    @app.cli.command('ledger-snapshot')
+    def ledger_snapshot():
+        """Consolida os saldos do razão em novos snapshots"""
+        from app.services import ledger
+        click.echo(f'{ledger.consolidar()} snapshots gravados')
+
+    @app.cli.command('ledger-check')
+    def ledger_check():
+        """Reconstrói todos os saldos a partir do razão e aponta divergências"""
+        from app.services import ledger
+        resultado = ledger.verificar()
+        for divergencia in resultado['usuarios_divergentes']:
+            click.echo(f"usuário {divergencia['user_id']}: reconstruído {divergencia['reconstruido']}, "
+                       f"servido {divergencia['servido']}", err=True)
+        for transaction_id in resultado['transacoes_desbalanceadas']:
+            click.echo(f'transação {transaction_id}: pernas não somam zero', err=True)
+        click.echo(f"{resultado['lancamentos']} lançamentos verificados")
+        if resultado['usuarios_divergentes'] or resultado['transacoes_desbalanceadas']:
+            raise SystemExit(1)
+
+    @app.cli.command('statements-build')
+    @click.option('--ano', type=int, required=True, help='Ano do informe de rendimentos')
+    @click.option('--user-id', type=int, default=None, help='Consolidar apenas um usuário')
+    @click.option('--chunk-size', type=int, default=1000, help='Linhas lidas e gravadas por lote')
+    def statements_build(ano, user_id, chunk_size):
+        """Consolida os informes de rendimentos do ano em annual_statements"""
+        from app.services import statements
+        click.echo(f'{statements.consolidar(ano, user_id, chunk_size=chunk_size)} linhas de informe gravadas')
+
+    @app.cli.command('statements-export')
+    @click.argument('tipo', type=click.Choice(['extrato', 'informe']))
+    @click.argument('saida', type=click.File('w', encoding='utf-8'), default='-')
+    @click.option('--ano', type=int, default=None, help='Ano do extrato ou do informe (obrigatório no informe)')
+    @click.option('--user-id', type=int, default=None, help='Exportar apenas um usuário')
+    @click.option('--formato', type=click.Choice(['csv', 'jsonl']), default='csv')
+    @click.option('--chunk-size', type=int, default=1000, help='Linhas lidas e escritas por bloco')
+    def statements_export(tipo, saida, ano, user_id, formato, chunk_size):
+        """Exporta extratos ou informes de rendimentos de todos os usuários em fluxo"""
+        from app.services import statements
+        if tipo == 'informe':
+            if ano is None:
+                raise click.UsageError('--ano é obrigatório para o informe')
+            linhas, colunas = statements.informe(ano, user_id, chunk_size=chunk_size), statements.COLUNAS_INFORME
+        else:
+            de, ate = statements.periodo({'ano': ano} if ano else {})
+            linhas, colunas = statements.extrato(user_id, de, ate, chunk_size), statements.COLUNAS_EXTRATO
+        for bloco in statements.exportar(linhas, colunas, formato, chunk_size):
+            saida.write(bloco)
+
+    @app.cli.command('seed')
+    @click.option('--usuarios', type=int, default=10000)
+    @click.option('--investimentos', type=int, default=2000)
+    @click.option('--transacoes', type=int, default=1000000)
+    @click.option('--seed', type=int, default=42, help='Semente do gerador (mesma semente, mesmos dados)')
+    @click.option('--ate', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+                  help='Data final do histórico (padrão: hoje)')
+    @click.option('--anos', type=int, default=3, help='Anos de histórico até --ate')
+    @click.option('--chunk-size', type=int, default=5000, help='Linhas por INSERT em lote')
+    def seed(usuarios, investimentos, transacoes, seed, ate, anos, chunk_size):
+        """Gera uma massa de dados sintética e determinística em um banco vazio"""
+        import time
+        from app.services import synthetic
+        inicio = time.perf_counter()
+        try:
+            contagem = synthetic.gerar(usuarios, investimentos, transacoes, seed=seed, ate=ate, anos=anos,
+                                       chunk_size=chunk_size,
+                                       progresso=lambda feitos: click.echo(f'{feitos}/{usuarios} usuários', err=True))
+        except synthetic.BancoNaoVazio as e:
+            raise click.ClickException(str(e))
+        for chave, valor in contagem.items():
+            click.echo(f'{chave}: {valor}')
+        click.echo(f'gerado em {time.perf_counter() - inicio:.0f}s; senha dos usuários: {synthetic.SENHA}')
+
+    @app.cli.command('db-upgrade')
+    @click.option('--ate', default=None, help='Aplicar somente até esta versão')
+    def db_upgrade(ate):
+        """Aplica as migrações de esquema pendentes"""
+        from app import migrations
+        from app.models import db
+        versoes = migrations.aplicar(db.engine, ate=ate)
+        for versao in versoes:
+            click.echo(f'aplicada {versao}')
+        click.echo(f'{len(versoes)} migrações aplicadas')
+
+    @app.cli.command('db-status')
+    def db_status():
+        """Lista as migrações de esquema e se já foram aplicadas"""
+        from app import migrations
+        from app.models import db
+        for versao, aplicada in migrations.status(db.engine):
+            click.echo(f"{'[x]' if aplicada else '[ ]'} {versao}")
+
+    @app.cli.command('db-check-plans')
+    def db_check_plans():
+        """Confere que as consultas das rotas quentes usam índices (falha se não usarem)"""
+        from app.migrations import planos
+        from app.models import db
+        try:
+            resultado = planos.verificar(db.engine)
+        except planos.DialetoNaoSuportado as e:
+            raise click.ClickException(str(e))
+        falhas = 0
+        for nome, (plano, problemas) in resultado.items():
+            click.echo(f"{'FALHOU' if problemas else 'ok':6} {nome}")
+            for linha in plano:
+                click.echo(f'         {linha}')
+            falhas += bool(problemas)
+        if falhas:
+            raise SystemExit(1)
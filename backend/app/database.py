@@ -0,0 +1,124 @@
+import os
+from contextlib import contextmanager
+from functools import wraps
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.sql import Select
+
+REPLICA = 'replica'
+PERFIS = ('tuned', 'default')
+
+def _env(nome, padrao, tipo=str):
+    return tipo(os.environ.get(nome, padrao))
+
+def carregar_config(app):
+    """Lê o perfil do banco das variáveis de ambiente para app.config
+
+    DB_PROFILE=default mantém os padrões do SQLAlchemy (útil para comparar);
+    tuned aplica pool, timeouts e os pragmas do SQLite.
+    """
+    app.config['DB_PROFILE'] = _env('DB_PROFILE', 'tuned')
+    if app.config['DB_PROFILE'] not in PERFIS:
+        raise ValueError(f"DB_PROFILE inválido: {app.config['DB_PROFILE']}")
+    app.config['DB_POOL_SIZE'] = _env('DB_POOL_SIZE', 10, int)
+    app.config['DB_MAX_OVERFLOW'] = _env('DB_MAX_OVERFLOW', 20, int)
+    app.config['DB_POOL_TIMEOUT'] = _env('DB_POOL_TIMEOUT', 10, int)
+    app.config['DB_POOL_RECYCLE'] = _env('DB_POOL_RECYCLE', 1800, int)
+    app.config['DB_STATEMENT_TIMEOUT_MS'] = _env('DB_STATEMENT_TIMEOUT_MS', 15000, int)
+    app.config['SQLITE_JOURNAL_MODE'] = _env('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config['SQLITE_SYNCHRONOUS'] = _env('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config['SQLITE_MMAP_SIZE'] = _env('SQLITE_MMAP_SIZE', 256 * 1024 * 1024, int)
+    app.config['SQLITE_BUSY_TIMEOUT'] = _env('SQLITE_BUSY_TIMEOUT', 10, int)
+
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'], app.config)
+
+    # Réplica de leitura opcional, usada pelas rotas marcadas com somente_leitura;
+    # DB_REPLICA_LAG é o atraso de replicação tolerado depois de uma escrita
+    app.config['DB_REPLICA_LAG'] = _env('DB_REPLICA_LAG', 5, float)
+    replica = os.environ.get('DATABASE_READ_URL')
+    if replica:
+        app.config['SQLALCHEMY_BINDS'] = {REPLICA: {'url': replica, **engine_options(replica, app.config)}}
+
+def engine_options(uri, config):
+    """Opções de create_engine do perfil configurado para a URI informada"""
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        if config['DB_PROFILE'] == 'default':
+            return {}
+        return {'connect_args': {'timeout': config['SQLITE_BUSY_TIMEOUT']}}
+
+    opcoes = {'pool_pre_ping': True}
+    if config['DB_PROFILE'] == 'default':
+        return opcoes
+
+    opcoes.update(
+        pool_size=config['DB_POOL_SIZE'],
+        max_overflow=config['DB_MAX_OVERFLOW'],
+        pool_timeout=config['DB_POOL_TIMEOUT'],
+        pool_recycle=config['DB_POOL_RECYCLE'],
+    )
+    if url.get_backend_name() == 'postgresql' and config['DB_STATEMENT_TIMEOUT_MS']:
+        opcoes['connect_args'] = {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"}
+    return opcoes
+
+def configurar_engines(app, db):
+    """Aplica os pragmas do perfil a cada nova conexão SQLite"""
+    with app.app_context():
+        engines = list(db.engines.values())
+    for engine in engines:
+        registrar_pragmas(engine, app.config)
+
+def registrar_pragmas(engine, config):
+    """Registra os pragmas do SQLite no evento connect do engine (síncrono)"""
+    if config['DB_PROFILE'] == 'default' or engine.dialect.name != 'sqlite':
+        return
+    if engine.url.database in (None, '', ':memory:'):
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}")
+        cursor.execute(f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}")
+        cursor.execute(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}")
+        cursor.close()
+
+class RoutingSession(Session):
+    """Sessão que envia os SELECTs das rotas somente leitura para a réplica
+
+    Escritas, flushes e qualquer consulta fora dessas rotas continuam no
+    banco principal; sem réplica configurada nada muda.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and isinstance(clause, Select) and not self._flushing
+                and has_app_context() and g.get('somente_leitura')):
+            replica = self._db.engines.get(REPLICA)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+def somente_leitura(view):
+    """Marca a rota como somente leitura, liberando o uso da réplica
+
+    Use apenas em rotas que toleram o atraso de replicação.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.somente_leitura = True
+        return view(*args, **kwargs)
+    return wrapper
+
+@contextmanager
+def primario():
+    """Envia as consultas do bloco ao banco principal, mesmo em uma rota somente_leitura"""
+    if not has_app_context() or not g.get('somente_leitura'):
+        yield
+        return
+    g.somente_leitura = False
+    try:
+        yield
+    finally:
+        g.somente_leitura = True
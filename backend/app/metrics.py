@@ -0,0 +1,206 @@
+import cProfile
+import hmac
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, g, has_request_context, request
+from flask.json.provider import JSONProvider
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCIA_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+CONSULTAS_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+TAMANHO_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class Histograma:
+    """Histograma cumulativo no formato do Prometheus, com rótulos"""
+
+    def __init__(self, nome, ajuda, rotulos, buckets):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.rotulos = rotulos
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observar(self, valor, *rotulos):
+        with self._lock:
+            serie = self._series.get(rotulos)
+            if serie is None:
+                serie = self._series[rotulos] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][bisect_left(self.buckets, valor)] += 1
+            serie[1] += valor
+
+    def exportar(self, fixos=()):
+        """Linhas no formato texto; fixos são pares (rótulo, valor) acrescentados a todas as séries"""
+        linhas = [f'# HELP {self.nome} {self.ajuda}', f'# TYPE {self.nome} histogram']
+        with self._lock:
+            series = [(rotulos, list(contagens), soma) for rotulos, (contagens, soma) in self._series.items()]
+        for rotulos, contagens, soma in sorted(series):
+            pares = list(fixos) + list(zip(self.rotulos, rotulos))
+            base = ','.join(f'{chave}="{_escapar(valor)}"' for chave, valor in pares)
+            separador = ',' if base else ''
+            acumulado = 0
+            for limite, quantidade in zip(self.buckets, contagens):
+                acumulado += quantidade
+                linhas.append(f'{self.nome}_bucket{{{base}{separador}le="{limite}"}} {acumulado}')
+            acumulado += contagens[-1]
+            linhas.append(f'{self.nome}_bucket{{{base}{separador}le="+Inf"}} {acumulado}')
+            linhas.append(f'{self.nome}_sum{{{base}}} {soma}')
+            linhas.append(f'{self.nome}_count{{{base}}} {acumulado}')
+        return linhas
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+LATENCIA = Histograma('http_request_duration_seconds', 'Latência das requisições por endpoint',
+                      ('endpoint', 'method', 'status'), LATENCIA_BUCKETS)
+CONSULTAS = Histograma('http_request_sql_queries', 'Consultas SQL executadas por requisição',
+                       ('endpoint',), CONSULTAS_BUCKETS)
+TEMPO_SQL = Histograma('http_request_sql_duration_seconds', 'Tempo gasto em SQL por requisição',
+                       ('endpoint',), LATENCIA_BUCKETS)
+SERIALIZACAO = Histograma('http_response_serialization_seconds', 'Tempo de serialização JSON por requisição',
+                          ('endpoint',), LATENCIA_BUCKETS)
+TAMANHO = Histograma('http_response_size_bytes', 'Tamanho do corpo das respostas',
+                     ('endpoint',), TAMANHO_BUCKETS)
+PERFIS = Histograma('http_request_profiled_duration_seconds', 'Latência das requisições amostradas pelo cProfile',
+                    ('endpoint',), LATENCIA_BUCKETS)
+
+HISTOGRAMAS = (LATENCIA, CONSULTAS, TEMPO_SQL, SERIALIZACAO, TAMANHO, PERFIS)
+
+def _medicao():
+    """Acumuladores da requisição atual, ou None fora de uma requisição medida"""
+    if not has_request_context():
+        return None
+    return g.get('metricas')
+
+# Os eventos são registrados na classe Engine, uma única vez por processo,
+# e contam apenas as consultas feitas dentro de requisições medidas.
+_eventos_registrados = False
+
+def _registrar_eventos_sql():
+    global _eventos_registrados
+    if _eventos_registrados:
+        return
+    _eventos_registrados = True
+
+    @event.listens_for(Engine, 'before_cursor_execute')
+    def _antes_da_consulta(conn, cursor, statement, parameters, context, executemany):
+        context._inicio_consulta = time.perf_counter()
+
+    @event.listens_for(Engine, 'after_cursor_execute')
+    def _depois_da_consulta(conn, cursor, statement, parameters, context, executemany):
+        medicao = _medicao()
+        if medicao is not None:
+            medicao['consultas'] += 1
+            medicao['tempo_sql'] += time.perf_counter() - context._inicio_consulta
+
+class JSONCronometrado(JSONProvider):
+    """Envolve o provedor JSON da aplicação medindo o tempo de serialização"""
+
+    def __init__(self, app, interno):
+        super().__init__(app)
+        self.interno = interno
+
+    def _cronometrar(self, funcao, *args, **kwargs):
+        medicao = _medicao()
+        if medicao is None:
+            return funcao(*args, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return funcao(*args, **kwargs)
+        finally:
+            medicao['serializacao'] += time.perf_counter() - inicio
+
+    def dumps(self, obj, **kwargs):
+        return self._cronometrar(self.interno.dumps, obj, **kwargs)
+
+    def dumps_bytes(self, obj):
+        # Usado pelos handlers assíncronos do modo ASGI
+        return self._cronometrar(self.interno.dumps_bytes, obj)
+
+    def loads(self, s, **kwargs):
+        return self.interno.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        return self._cronometrar(self.interno.response, *args, **kwargs)
+
+def exportar():
+    """Todas as métricas do processo no formato texto do Prometheus
+
+    Os histogramas ficam na memória de cada worker: as séries levam o rótulo
+    pid para que raspagens de workers diferentes não se misturem, e a soma
+    entre workers fica a cargo das consultas (sum without (pid)).
+    """
+    pid = os.getpid()
+    linhas = [f'# Métricas apenas do worker pid={pid}']
+    for histograma in HISTOGRAMAS:
+        linhas.extend(histograma.exportar(fixos=(('pid', pid),)))
+    return '\n'.join(linhas) + '\n'
+
+def register_metrics(app):
+    """Instrumenta as requisições e expõe /metrics (opt-in por METRICS_ENABLED)
+
+    /metrics exige Authorization: Bearer <METRICS_TOKEN> e fica fechado
+    sem METRICS_TOKEN: latências, perfis e nomes de endpoints são internos.
+    Com PROFILE_SAMPLE_RATE > 0, essa fração das requisições roda sob o
+    cProfile e o perfil é gravado em PROFILE_DIR como <endpoint>-<ns>.prof,
+    para análise com pstats ou snakeviz.
+    """
+    _registrar_eventos_sql()
+    app.json = JSONCronometrado(app, app.json)
+
+    taxa_amostragem = app.config.get('PROFILE_SAMPLE_RATE', 0.0)
+    diretorio_perfis = app.config.get('PROFILE_DIR', 'profiles')
+    if taxa_amostragem > 0:
+        os.makedirs(diretorio_perfis, exist_ok=True)
+
+    @app.before_request
+    def _iniciar_medicao():
+        if request.endpoint == 'metrics':
+            return
+        g.metricas = {'inicio': time.perf_counter(), 'consultas': 0, 'tempo_sql': 0.0, 'serializacao': 0.0}
+        if taxa_amostragem > 0 and random.random() < taxa_amostragem:
+            g.perfil = cProfile.Profile()
+            g.perfil.enable()
+
+    def _finalizar(status, tamanho):
+        medicao = g.pop('metricas', None)
+        if medicao is None:
+            return
+        duracao = time.perf_counter() - medicao['inicio']
+        endpoint = request.endpoint or 'desconhecido'
+
+        perfil = g.pop('perfil', None)
+        if perfil is not None:
+            perfil.disable()
+            perfil.dump_stats(os.path.join(diretorio_perfis, f'{endpoint}-{time.time_ns()}.prof'))
+            PERFIS.observar(duracao, endpoint)
+
+        LATENCIA.observar(duracao, endpoint, request.method, str(status))
+        CONSULTAS.observar(medicao['consultas'], endpoint)
+        TEMPO_SQL.observar(medicao['tempo_sql'], endpoint)
+        SERIALIZACAO.observar(medicao['serializacao'], endpoint)
+        if tamanho is not None:
+            TAMANHO.observar(tamanho, endpoint)
+
+    @app.after_request
+    def _registrar_medicao(response):
+        _finalizar(response.status_code, response.content_length)
+        return response
+
+    @app.teardown_request
+    def _registrar_falha(exc):
+        # Exceções não tratadas não passam pelo after_request
+        _finalizar(500, None)
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """Métricas das requisições no formato do Prometheus"""
+        esperado = app.config.get('METRICS_TOKEN')
+        recebido = request.headers.get('Authorization', '')
+        if not esperado or not hmac.compare_digest(recebido.encode(), f'Bearer {esperado}'.encode()):
+            return Response('Acesso restrito\n', status=403, mimetype='text/plain')
+        return Response(exportar(), mimetype='text/plain; version=0.0.4')
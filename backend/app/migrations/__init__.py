@@ -0,0 +1,72 @@
+import importlib
+import pkgutil
+from datetime import datetime
+from sqlalchemy import Column, DateTime, MetaData, String, Table, insert, select, text
+
+# Migrações versionadas do esquema, aplicadas por "flask db-upgrade" em vez
+# de um create_all a cada inicialização. Cada módulo em versoes/ se chama
+# vNNNN_descricao.py e define upgrade(conn), que roda em uma transação.
+
+_metadata = MetaData()
+
+schema_migrations = Table(
+    'schema_migrations', _metadata,
+    Column('versao', String(100), primary_key=True),
+    Column('aplicada_em', DateTime, nullable=False),
+)
+
+# Chave do advisory lock que impede dois processos de migrar ao mesmo tempo
+PG_LOCK_MIGRACOES = 7350001
+
+def migracoes():
+    """Módulos de migração disponíveis, em ordem de versão"""
+    from app.migrations import versoes
+    nomes = sorted(nome for _, nome, _ in pkgutil.iter_modules(versoes.__path__) if nome.startswith('v'))
+    return [importlib.import_module(f'{versoes.__name__}.{nome}') for nome in nomes]
+
+def _versao(modulo):
+    return modulo.__name__.rsplit('.', 1)[-1]
+
+def aplicadas(conn):
+    """Versões já registradas no banco"""
+    schema_migrations.create(conn, checkfirst=True)
+    return {versao for (versao,) in conn.execute(select(schema_migrations.c.versao))}
+
+def pendentes(engine):
+    """Migrações ainda não aplicadas neste banco"""
+    with engine.begin() as conn:
+        feitas = aplicadas(conn)
+    return [modulo for modulo in migracoes() if _versao(modulo) not in feitas]
+
+def aplicar(engine, ate=None):
+    """Aplica as migrações pendentes (até a versão ate) e retorna as versões aplicadas
+
+    Cada migração roda em sua própria transação junto com o registro em
+    schema_migrations, então uma falha não deixa a versão meio aplicada.
+    """
+    aplicadas_agora = []
+    with engine.connect() as trava:
+        if engine.dialect.name == 'postgresql':
+            trava.execute(text('SELECT pg_advisory_lock(:chave)'), {'chave': PG_LOCK_MIGRACOES})
+        try:
+            for modulo in pendentes(engine):
+                versao = _versao(modulo)
+                with engine.begin() as conn:
+                    if versao in aplicadas(conn):
+                        continue
+                    modulo.upgrade(conn)
+                    conn.execute(insert(schema_migrations).values(versao=versao, aplicada_em=datetime.utcnow()))
+                aplicadas_agora.append(versao)
+                if versao == ate:
+                    break
+        finally:
+            if engine.dialect.name == 'postgresql':
+                trava.execute(text('SELECT pg_advisory_unlock(:chave)'), {'chave': PG_LOCK_MIGRACOES})
+                trava.commit()
+    return aplicadas_agora
+
+def status(engine):
+    """Lista (versão, aplicada?) de todas as migrações conhecidas"""
+    with engine.begin() as conn:
+        feitas = aplicadas(conn)
+    return [(_versao(modulo), _versao(modulo) in feitas) for modulo in migracoes()]
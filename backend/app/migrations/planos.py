@@ -0,0 +1,118 @@
+import json
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+from app.models.investment import Investment, UserInvestment, InvestmentCategory, InvestmentStatus, INVESTMENT_COLUMNS
+from app.models.ledger import LedgerEntry, BalanceSnapshot
+from app.models.portfolio import PortfolioSummary
+from app.models.user import Transaction, TransactionType
+from app.services import search
+from app.utils.pagination import DEFAULT_LIMIT
+
+# Consultas das rotas quentes, na forma em que as rotas as emitem (primeira
+# página, sem cursor). Cada uma deve ser resolvida por índice, sem varredura
+# completa da tabela e sem ordenação em memória.
+CONSULTAS = {
+    'catalogo_por_categoria_e_taxa': lambda: (
+        select(*INVESTMENT_COLUMNS)
+        .where(Investment.categoria == InvestmentCategory.CRI)
+        .order_by(Investment.taxa_retorno, Investment.id).limit(DEFAULT_LIMIT + 1)
+    ),
+    'catalogo_disponiveis_por_categoria': lambda: (
+        select(*INVESTMENT_COLUMNS)
+        .where(Investment.status == InvestmentStatus.DISPONIVEL, Investment.categoria == InvestmentCategory.CRI)
+        .order_by(Investment.id).limit(DEFAULT_LIMIT + 1)
+    ),
+    'catalogo_mais_recentes': lambda: (
+        select(*INVESTMENT_COLUMNS)
+        .order_by(Investment.data_criacao.desc(), Investment.id.desc()).limit(DEFAULT_LIMIT + 1)
+    ),
+    'transacoes_do_usuario': lambda: (
+        select(Transaction.id, Transaction.tipo, Transaction.valor, Transaction.status, Transaction.data_criacao)
+        .where(Transaction.user_id == 1)
+        .order_by(Transaction.data_criacao.desc(), Transaction.id.desc()).limit(DEFAULT_LIMIT + 1)
+    ),
+    'liquidacao_por_pix_id': lambda: (
+        select(Transaction.id, Transaction.user_id, Transaction.valor, Transaction.status)
+        .where(Transaction.pix_id.in_(['a', 'b']), Transaction.tipo == TransactionType.DEPOSITO)
+    ),
+    'meus_investimentos': lambda: (
+        select(*INVESTMENT_COLUMNS, UserInvestment.valor_aplicado, UserInvestment.data_aplicacao)
+        .join(Investment, UserInvestment.investment_id == Investment.id)
+        .where(UserInvestment.user_id == 1)
+    ),
+    'saldo_cauda_do_razao': lambda: (
+        select(func.sum(LedgerEntry.valor)).where(LedgerEntry.user_id == 1, LedgerEntry.id > 0)
+    ),
+    'saldo_ultimo_snapshot': lambda: (
+        select(func.max(BalanceSnapshot.id)).where(BalanceSnapshot.user_id == 1)
+    ),
+    'resumo_da_carteira': lambda: (
+        select(PortfolioSummary.categoria, PortfolioSummary.valor_aplicado).where(PortfolioSummary.user_id == 1)
+    ),
+}
+
+# Consultas que dependem do dialeto, construídas com o nome dele. A busca é
+# conferida sem a ordenação por relevância, que por natureza ordena em memória
+# (apenas os documentos encontrados pelo índice textual).
+CONSULTAS_POR_DIALETO = {
+    'busca_textual': lambda dialeto: (
+        search.aplicar(select(*INVESTMENT_COLUMNS), 'credito', dialeto)[0]
+        .where(Investment.categoria == InvestmentCategory.CRI).limit(DEFAULT_LIMIT + 1)
+    ),
+}
+
+class DialetoNaoSuportado(Exception):
+    """Banco sem verificação de planos (apenas SQLite e PostgreSQL)"""
+
+def _sql(conn, consulta):
+    return str(consulta.compile(dialect=conn.dialect, compile_kwargs={'literal_binds': True}))
+
+def _plano_sqlite(conn, consulta):
+    linhas = [detalhe for *_, detalhe in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + _sql(conn, consulta))]
+    problemas = [
+        detalhe for detalhe in linhas
+        if (detalhe.startswith('SCAN ') and ' USING ' not in detalhe and ' VIRTUAL TABLE INDEX ' not in detalhe)
+        or 'TEMP B-TREE' in detalhe
+    ]
+    return linhas, problemas
+
+def _nos(plano):
+    yield plano
+    for filho in plano.get('Plans', []):
+        yield from _nos(filho)
+
+def _plano_postgresql(conn, consulta):
+    # Sem varredura sequencial disponível, o planejador só recorre a ela
+    # quando não existe índice utilizável: tabelas pequenas não mascaram o teste
+    conn.exec_driver_sql('SET LOCAL enable_seqscan = off')
+    resultado = conn.exec_driver_sql('EXPLAIN (FORMAT JSON) ' + _sql(conn, consulta)).scalar()
+    plano = (json.loads(resultado) if isinstance(resultado, str) else resultado)[0]['Plan']
+    linhas = [f"{no['Node Type']} {no.get('Relation Name', '')} {no.get('Index Name', '')}".strip()
+              for no in _nos(plano)]
+    problemas = [linha for linha in linhas if linha.startswith(('Seq Scan', 'Sort'))]
+    return linhas, problemas
+
+def verificar(engine):
+    """Explica cada consulta quente e retorna {nome: (plano, problemas)}"""
+    if engine.dialect.name == 'sqlite':
+        explicar = _plano_sqlite
+    elif engine.dialect.name == 'postgresql':
+        explicar = _plano_postgresql
+    else:
+        raise DialetoNaoSuportado(f'Verificação de planos não suportada para o banco {engine.dialect.name} '
+                                  '(apenas sqlite e postgresql)')
+
+    resultado = {}
+    with engine.connect() as conn:
+        consultas = {nome: construir for nome, construir in CONSULTAS.items()}
+        for nome, construir in CONSULTAS_POR_DIALETO.items():
+            consultas[nome] = lambda construir=construir: construir(engine.dialect.name)
+        for nome, construir in consultas.items():
+            try:
+                with conn.begin():
+                    resultado[nome] = explicar(conn, construir())
+            except DBAPIError as e:
+                # Tabela ou coluna ausente: o banco não está na versão do esquema
+                erro = f'erro: {e.orig}'
+                resultado[nome] = ([erro], [erro])
+    return resultado
@@ -0,0 +1,103 @@
+"""Esquema base: as tabelas que o create_all criava na inicialização
+
+O DDL fica congelado aqui, e não vem dos modelos: mudanças posteriores nos
+modelos entram em novas migrações, e um banco novo termina igual a um banco
+atualizado. Bancos já criados pelo create_all mantêm suas tabelas
+(checkfirst); os índices das consultas quentes são criados pela v0002.
+"""
+from sqlalchemy import (DECIMAL, Boolean, Column, Date, DateTime, Enum, ForeignKey, Integer, MetaData, String,
+                        Table, Text, UniqueConstraint)
+
+# Enums gravados pelo nome do membro, como o db.Enum dos modelos grava
+CATEGORIAS = ('DEBENTURES', 'CRI', 'CRA', 'NOTAS_FISCAIS', 'RECEBIVEIS_JUDICIAIS', 'OPERACOES_ESTRUTURADAS',
+              'PRECATORIOS_FEDERAL', 'PRECATORIOS_ESTADUAL', 'PRECATORIOS_MUNICIPAL')
+
+metadata = MetaData()
+
+Table(
+    'users', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('cpf', String(14), unique=True, nullable=False),
+    Column('email', String(120), unique=True, nullable=False),
+    Column('nome', String(100), nullable=False),
+    Column('senha_hash', String(255), nullable=False),
+    Column('saldo', DECIMAL(15, 2), nullable=False),
+    Column('data_criacao', DateTime),
+    Column('ativo', Boolean),
+)
+
+Table(
+    'investments', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('titulo', String(200), nullable=False),
+    Column('descricao', Text),
+    Column('categoria', Enum(*CATEGORIAS, name='investmentcategory'), nullable=False),
+    Column('valor_minimo', DECIMAL(15, 2), nullable=False),
+    Column('taxa_retorno', DECIMAL(5, 2), nullable=False),
+    Column('prazo', Integer, nullable=False),
+    Column('status', Enum('DISPONIVEL', 'ESGOTADO', name='investmentstatus')),
+    Column('isencao_ir', Boolean),
+    Column('valor_total', DECIMAL(15, 2)),
+    Column('valor_captado', DECIMAL(15, 2)),
+    Column('data_criacao', DateTime),
+    Column('data_vencimento', DateTime),
+)
+
+Table(
+    'user_investments', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('investment_id', Integer, ForeignKey('investments.id'), nullable=False),
+    Column('valor_aplicado', DECIMAL(15, 2), nullable=False),
+    Column('data_aplicacao', DateTime),
+)
+
+Table(
+    'transactions', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('tipo', Enum('DEPOSITO', 'INVESTIMENTO', 'RESGATE', name='transactiontype'), nullable=False),
+    Column('valor', DECIMAL(15, 2), nullable=False),
+    Column('status', Enum('PENDENTE', 'APROVADO', 'REJEITADO', name='transactionstatus')),
+    Column('descricao', String(255)),
+    Column('data_criacao', DateTime),
+    Column('data_aprovacao', DateTime),
+    Column('pix_id', String(100)),
+    Column('pix_qr_code', Text),
+)
+
+Table(
+    'portfolio_summaries', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('categoria', Enum(*CATEGORIAS, name='investmentcategory'), nullable=False),
+    Column('mes_vencimento', Date, nullable=False),
+    Column('quantidade', Integer, nullable=False),
+    Column('valor_aplicado', DECIMAL(15, 2), nullable=False),
+    Column('valor_taxa', DECIMAL(20, 4), nullable=False),
+    Column('rendimento_projetado', DECIMAL(15, 2), nullable=False),
+    Column('data_atualizacao', DateTime),
+    UniqueConstraint('user_id', 'categoria', 'mes_vencimento', name='uq_portfolio_summaries_chave'),
+)
+
+Table(
+    'ledger_entries', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('transaction_id', Integer, ForeignKey('transactions.id'), nullable=False),
+    Column('conta', String(30), nullable=False),
+    Column('user_id', Integer, ForeignKey('users.id')),
+    Column('valor', DECIMAL(15, 2), nullable=False),
+    Column('data_criacao', DateTime),
+)
+
+Table(
+    'balance_snapshots', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('ultimo_lancamento_id', Integer, nullable=False),
+    Column('saldo', DECIMAL(15, 2), nullable=False),
+    Column('data_criacao', DateTime),
+)
+
+def upgrade(conn):
+    metadata.create_all(conn, checkfirst=True)
@@ -0,0 +1,35 @@
+"""Índices das consultas quentes, inclusive em tabelas criadas sem eles"""
+from sqlalchemy import Index, MetaData, Table
+
+# tabela -> [(nome do índice, colunas)]
+INDICES = {
+    'investments': [
+        ('ix_investments_status_categoria_id', ('status', 'categoria', 'id')),
+        ('ix_investments_categoria_taxa_id', ('categoria', 'taxa_retorno', 'id')),
+        ('ix_investments_taxa_id', ('taxa_retorno', 'id')),
+        ('ix_investments_prazo_id', ('prazo', 'id')),
+        ('ix_investments_valor_minimo_id', ('valor_minimo', 'id')),
+        ('ix_investments_data_criacao_id', ('data_criacao', 'id')),
+    ],
+    'user_investments': [
+        ('ix_user_investments_user_id', ('user_id', 'investment_id')),
+    ],
+    'transactions': [
+        ('ix_transactions_pix_id', ('pix_id',)),
+        ('ix_transactions_user_data_id', ('user_id', 'data_criacao', 'id')),
+    ],
+    'ledger_entries': [
+        ('ix_ledger_entries_user_id_id', ('user_id', 'id')),
+        ('ix_ledger_entries_transaction_id', ('transaction_id',)),
+    ],
+    'balance_snapshots': [
+        ('ix_balance_snapshots_user_id_id', ('user_id', 'id')),
+    ],
+}
+
+def upgrade(conn):
+    metadata = MetaData()
+    for nome_tabela, indices in INDICES.items():
+        tabela = Table(nome_tabela, metadata, autoload_with=conn)
+        for nome, colunas in indices:
+            Index(nome, *[tabela.c[coluna] for coluna in colunas]).create(conn, checkfirst=True)
@@ -0,0 +1,86 @@
+"""Índice de busca textual sobre título e descrição dos investimentos
+
+SQLite: tabela FTS5 de conteúdo externo (investments_fts), mantida por
+triggers, com tokenizador unicode61 sem acentos. PostgreSQL: coluna
+investments.busca (tsvector com o título de peso A e a descrição de peso B)
+na configuração portuguese_unaccent, mantida por trigger e indexada por GIN.
+Nos dois bancos o índice só é tocado quando título ou descrição mudam: as
+ordens, que atualizam valor_captado, não pagam a retokenização.
+"""
+
+SQLITE = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS investments_fts USING fts5(
+        titulo, descricao,
+        content='investments', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS investments_fts_ai AFTER INSERT ON investments BEGIN
+        INSERT INTO investments_fts(rowid, titulo, descricao) VALUES (new.id, new.titulo, new.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS investments_fts_ad AFTER DELETE ON investments BEGIN
+        INSERT INTO investments_fts(investments_fts, rowid, titulo, descricao)
+        VALUES ('delete', old.id, old.titulo, old.descricao);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS investments_fts_au AFTER UPDATE OF titulo, descricao ON investments BEGIN
+        INSERT INTO investments_fts(investments_fts, rowid, titulo, descricao)
+        VALUES ('delete', old.id, old.titulo, old.descricao);
+        INSERT INTO investments_fts(rowid, titulo, descricao) VALUES (new.id, new.titulo, new.descricao);
+    END
+    """,
+    # Indexa as linhas já existentes
+    "INSERT INTO investments_fts(investments_fts) VALUES ('rebuild')",
+]
+
+VETOR_PG = """
+    setweight(to_tsvector('portuguese_unaccent', coalesce({linha}titulo, '')), 'A')
+    || setweight(to_tsvector('portuguese_unaccent', coalesce({linha}descricao, '')), 'B')
+"""
+
+POSTGRESQL = [
+    'CREATE EXTENSION IF NOT EXISTS unaccent',
+    # Stemmer português depois de remover os acentos
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = 'portuguese_unaccent') THEN
+            CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent (COPY = portuguese);
+            ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+                ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+        END IF;
+    END
+    $$
+    """,
+    'ALTER TABLE investments ADD COLUMN IF NOT EXISTS busca tsvector',
+    f"""
+    CREATE OR REPLACE FUNCTION investments_busca_atualizar() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.busca := {VETOR_PG.format(linha='NEW.')};
+        RETURN NEW;
+    END
+    $$
+    """,
+    'DROP TRIGGER IF EXISTS investments_busca ON investments',
+    """
+    CREATE TRIGGER investments_busca BEFORE INSERT OR UPDATE OF titulo, descricao ON investments
+    FOR EACH ROW EXECUTE FUNCTION investments_busca_atualizar()
+    """,
+    f'UPDATE investments SET busca = {VETOR_PG.format(linha="")}',
+    'CREATE INDEX IF NOT EXISTS ix_investments_busca ON investments USING gin (busca)',
+]
+
+def upgrade(conn):
+    if conn.dialect.name == 'sqlite':
+        comandos = SQLITE
+    elif conn.dialect.name == 'postgresql':
+        comandos = POSTGRESQL
+    else:
+        return  # demais bancos ficam sem índice; a rota de busca responde 501
+    for comando in comandos:
+        conn.exec_driver_sql(comando)
@@ -0,0 +1,33 @@
+"""Tabela annual_statements, com os informes de rendimentos consolidados por ano
+
+DDL congelado nesta migração, independente do modelo AnnualStatement.
+"""
+from sqlalchemy import (DECIMAL, Boolean, Column, DateTime, Enum, ForeignKey, Integer, MetaData, Table,
+                        UniqueConstraint)
+from app.migrations.versoes.v0001_esquema_base import CATEGORIAS
+
+metadata = MetaData()
+
+# Apenas o alvo da chave estrangeira; a tabela é da v0001
+Table('users', metadata, Column('id', Integer, primary_key=True))
+
+annual_statements = Table(
+    'annual_statements', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('ano', Integer, nullable=False),
+    Column('user_id', Integer, ForeignKey('users.id'), nullable=False),
+    Column('categoria', Enum(*CATEGORIAS, name='investmentcategory'), nullable=False),
+    Column('isencao_ir', Boolean, nullable=False),
+    Column('quantidade', Integer, nullable=False),
+    Column('saldo_anterior', DECIMAL(15, 2), nullable=False),
+    Column('saldo_final', DECIMAL(15, 2), nullable=False),
+    Column('aplicado_no_ano', DECIMAL(15, 2), nullable=False),
+    Column('resgatado_no_ano', DECIMAL(15, 2), nullable=False),
+    Column('rendimento_bruto', DECIMAL(15, 2), nullable=False),
+    Column('imposto_retido', DECIMAL(15, 2), nullable=False),
+    Column('data_atualizacao', DateTime),
+    UniqueConstraint('ano', 'user_id', 'categoria', 'isencao_ir', name='uq_annual_statements_chave'),
+)
+
+def upgrade(conn):
+    annual_statements.create(conn, checkfirst=True)
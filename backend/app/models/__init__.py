@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
+from app.database import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # Os modelos serão importados após a inicialização do db
 
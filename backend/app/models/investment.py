@@ -22,6 +22,16 @@ class InvestmentStatus(Enum):
 
 class Investment(db.Model):
     __tablename__ = 'investments'
+    __table_args__ = (
+        # Índices compostos para a paginação por cursor do catálogo:
+        # filtros por igualdade à esquerda, coluna de ordenação e id à direita
+        db.Index('ix_investments_status_categoria_id', 'status', 'categoria', 'id'),
+        db.Index('ix_investments_categoria_taxa_id', 'categoria', 'taxa_retorno', 'id'),
+        db.Index('ix_investments_taxa_id', 'taxa_retorno', 'id'),
+        db.Index('ix_investments_prazo_id', 'prazo', 'id'),
+        db.Index('ix_investments_valor_minimo_id', 'valor_minimo', 'id'),
+        db.Index('ix_investments_data_criacao_id', 'data_criacao', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     titulo = db.Column(db.String(200), nullable=False)
@@ -44,24 +54,34 @@ class Investment(db.Model):
         return f'<Investment {self.titulo}>'
     
     def to_dict(self):
-        return {
-            'id': self.id,
-            'titulo': self.titulo,
-            'descricao': self.descricao,
-            'categoria': self.categoria.value if self.categoria else None,
-            'valor_minimo': float(self.valor_minimo),
-            'taxa_retorno': float(self.taxa_retorno),
-            'prazo': self.prazo,
-            'status': self.status.value if self.status else None,
-            'isencao_ir': self.isencao_ir,
-            'valor_total': float(self.valor_total) if self.valor_total else None,
-            'valor_captado': float(self.valor_captado),
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
-            'data_vencimento': self.data_vencimento.isoformat() if self.data_vencimento else None
-        }
+        # DECIMAL e datas seguem como objetos; o provedor JSON da aplicação
+        # serializa decimais como string exata e datas em ISO 8601
+        return {coluna.key: getattr(self, coluna.key) for coluna in INVESTMENT_COLUMNS}
+
+# Colunas serializadas, na ordem da resposta; as listagens consultam apenas
+# essas colunas e montam os dicts direto das tuplas, sem objetos ORM
+INVESTMENT_COLUMNS = [
+    Investment.id,
+    Investment.titulo,
+    Investment.descricao,
+    Investment.categoria,
+    Investment.valor_minimo,
+    Investment.taxa_retorno,
+    Investment.prazo,
+    Investment.status,
+    Investment.isencao_ir,
+    Investment.valor_total,
+    Investment.valor_captado,
+    Investment.data_criacao,
+    Investment.data_vencimento,
+]
 
 class UserInvestment(db.Model):
     __tablename__ = 'user_investments'
+    __table_args__ = (
+        # Aplicações do usuário (meus_investimentos, carteira e projeção)
+        db.Index('ix_user_investments_user_id', 'user_id', 'investment_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -77,7 +97,7 @@ class UserInvestment(db.Model):
             'id': self.id,
             'user_id': self.user_id,
             'investment_id': self.investment_id,
-            'valor_aplicado': float(self.valor_aplicado),
-            'data_aplicacao': self.data_aplicacao.isoformat() if self.data_aplicacao else None
+            'valor_aplicado': self.valor_aplicado,
+            'data_aplicacao': self.data_aplicacao
         }
 
@@ -0,0 +1,42 @@
+from datetime import datetime
+from sqlalchemy.types import DECIMAL
+from app.models import db
+
+class LedgerEntry(db.Model):
+    """Lançamento imutável do razão de partidas dobradas
+
+    Cada Transaction gera ao menos duas pernas cuja soma é zero: a da conta
+    do usuário (conta 'usuario', com user_id) e a da contrapartida do sistema.
+    """
+    __tablename__ = 'ledger_entries'
+    __table_args__ = (
+        # Saldo corrente: soma dos lançamentos do usuário após o último snapshot
+        db.Index('ix_ledger_entries_user_id_id', 'user_id', 'id'),
+        db.Index('ix_ledger_entries_transaction_id', 'transaction_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    transaction_id = db.Column(db.Integer, db.ForeignKey('transactions.id'), nullable=False)
+    conta = db.Column(db.String(30), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    valor = db.Column(DECIMAL(15, 2), nullable=False)  # Positivo credita, negativo debita
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<LedgerEntry {self.id} - {self.conta} {self.valor}>'
+
+class BalanceSnapshot(db.Model):
+    """Saldo consolidado de um usuário até o lançamento ultimo_lancamento_id"""
+    __tablename__ = 'balance_snapshots'
+    __table_args__ = (
+        db.Index('ix_balance_snapshots_user_id_id', 'user_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    ultimo_lancamento_id = db.Column(db.Integer, nullable=False)
+    saldo = db.Column(DECIMAL(15, 2), nullable=False)
+    data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<BalanceSnapshot {self.user_id} - {self.saldo}>'
@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy.types import DECIMAL
+from app.models import db
+from app.models.investment import InvestmentCategory
+
+class PortfolioSummary(db.Model):
+    """Agregado da carteira por usuário, categoria e mês de vencimento
+    
+    Mantido incrementalmente dentro da transação de /api/investir, para que o
+    resumo da carteira custe O(categorias) e não O(aplicações).
+    """
+    __tablename__ = 'portfolio_summaries'
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'categoria', 'mes_vencimento', name='uq_portfolio_summaries_chave'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    categoria = db.Column(db.Enum(InvestmentCategory), nullable=False)
+    mes_vencimento = db.Column(db.Date, nullable=False)  # Primeiro dia do mês
+    quantidade = db.Column(db.Integer, default=0, nullable=False)
+    valor_aplicado = db.Column(DECIMAL(15, 2), default=0, nullable=False)
+    valor_taxa = db.Column(DECIMAL(20, 4), default=0, nullable=False)  # Soma de valor * taxa_retorno
+    rendimento_projetado = db.Column(DECIMAL(15, 2), default=0, nullable=False)
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<PortfolioSummary {self.user_id} - {self.categoria.value} - {self.mes_vencimento}>'
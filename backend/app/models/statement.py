@@ -0,0 +1,34 @@
+from datetime import datetime
+from sqlalchemy.types import DECIMAL
+from app.models import db
+from app.models.investment import InvestmentCategory
+
+class AnnualStatement(db.Model):
+    """Informe de rendimentos do ano por usuário, categoria e isenção de IR
+
+    Consolidado em lote (flask statements-build) depois do fechamento do ano,
+    para que a exportação de todos os usuários leia linhas prontas em vez de
+    recalcular cada aplicação.
+    """
+    __tablename__ = 'annual_statements'
+    __table_args__ = (
+        # Exportação do ano na ordem de user_id, sem ordenação em memória
+        db.UniqueConstraint('ano', 'user_id', 'categoria', 'isencao_ir', name='uq_annual_statements_chave'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    ano = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    categoria = db.Column(db.Enum(InvestmentCategory), nullable=False)
+    isencao_ir = db.Column(db.Boolean, nullable=False)
+    quantidade = db.Column(db.Integer, default=0, nullable=False)  # Aplicações com posição no ano
+    saldo_anterior = db.Column(DECIMAL(15, 2), default=0, nullable=False)  # Custo em 31/12 do ano anterior
+    saldo_final = db.Column(DECIMAL(15, 2), default=0, nullable=False)  # Custo em 31/12 (ou na data de corte)
+    aplicado_no_ano = db.Column(DECIMAL(15, 2), default=0, nullable=False)
+    resgatado_no_ano = db.Column(DECIMAL(15, 2), default=0, nullable=False)  # Principal vencido no ano
+    rendimento_bruto = db.Column(DECIMAL(15, 2), default=0, nullable=False)  # Rendimento dos vencimentos do ano
+    imposto_retido = db.Column(DECIMAL(15, 2), default=0, nullable=False)
+    data_atualizacao = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<AnnualStatement {self.ano} - {self.user_id} - {self.categoria.value}>'
@@ -24,7 +24,7 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     nome = db.Column(db.String(100), nullable=False)
     senha_hash = db.Column(db.String(255), nullable=False)
-    saldo = db.Column(DECIMAL(15, 2), default=0, nullable=False)
+    saldo = db.Column(DECIMAL(15, 2), default=0, nullable=False)  # Saldo de abertura; o corrente vem do razão
     data_criacao = db.Column(db.DateTime, default=datetime.utcnow)
     ativo = db.Column(db.Boolean, default=True)
     
@@ -38,34 +38,33 @@ class User(db.Model):
     def check_password(self, password):
         return check_password_hash(self.senha_hash, password)
     
-    def adicionar_saldo(self, valor):
-        """Adiciona valor ao saldo do usuário"""
-        self.saldo += valor
-        return self.saldo
-    
-    def debitar_saldo(self, valor):
-        """Debita valor do saldo do usuário se houver saldo suficiente"""
-        if self.saldo >= valor:
-            self.saldo -= valor
-            return True
-        return False
+    def saldo_atual(self):
+        """Saldo corrente: último snapshot mais os lançamentos posteriores no razão"""
+        from app.services import ledger
+        return ledger.saldo(self.id)
     
     def __repr__(self):
         return f'<User {self.email}>'
     
-    def to_dict(self):
+    def to_dict(self, saldo=None):
+        """Serializa o usuário; saldo evita recalcular o saldo quando já é conhecido"""
         return {
             'id': self.id,
             'cpf': self.cpf,
             'email': self.email,
             'nome': self.nome,
-            'saldo': float(self.saldo),
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
+            'saldo': self.saldo_atual() if saldo is None else saldo,
+            'data_criacao': self.data_criacao,
             'ativo': self.ativo
         }
 
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        db.Index('ix_transactions_pix_id', 'pix_id'),
+        # Histórico paginado do usuário, do mais recente para o mais antigo
+        db.Index('ix_transactions_user_data_id', 'user_id', 'data_criacao', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -78,22 +77,29 @@ class Transaction(db.Model):
     
     # Campos específicos para PIX
     pix_id = db.Column(db.String(100), nullable=True)
-    pix_qr_code = db.Column(db.Text, nullable=True)
+    # Carregada sob demanda: listagens não trazem colunas de texto grandes
+    pix_qr_code = db.deferred(db.Column(db.Text, nullable=True))  # Payload PIX (copia e cola) do QR Code
     
     def __repr__(self):
         return f'<Transaction {self.id} - {self.tipo.value}>'
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'user_id': self.user_id,
-            'tipo': self.tipo.value if self.tipo else None,
-            'valor': float(self.valor),
-            'status': self.status.value if self.status else None,
-            'descricao': self.descricao,
-            'data_criacao': self.data_criacao.isoformat() if self.data_criacao else None,
-            'data_aprovacao': self.data_aprovacao.isoformat() if self.data_aprovacao else None,
-            'pix_id': self.pix_id,
-            'pix_qr_code': self.pix_qr_code
-        }
+    def to_dict(self, campos=None):
+        """Serializa a transação; campos restringe as chaves retornadas"""
+        if campos is None:
+            campos = TRANSACTION_FIELDS
+        return {campo: getattr(self, campo) for campo in campos}
 
+# Campos serializáveis e suas colunas, usados para projetar apenas as colunas
+# pedidas; enums, DECIMAL e datas são convertidos pelo provedor JSON
+TRANSACTION_FIELDS = {
+    'id': Transaction.id,
+    'user_id': Transaction.user_id,
+    'tipo': Transaction.tipo,
+    'valor': Transaction.valor,
+    'status': Transaction.status,
+    'descricao': Transaction.descricao,
+    'data_criacao': Transaction.data_criacao,
+    'data_aprovacao': Transaction.data_aprovacao,
+    'pix_id': Transaction.pix_id,
+    'pix_qr_code': Transaction.pix_qr_code
+}
@@ -0,0 +1,32 @@
+import importlib
+
+# Dependências pesadas que as rotas só importam no primeiro uso. No modo
+# preload do gunicorn o processo mestre as importa uma única vez e os workers
+# herdam os módulos já carregados pelo fork (memória compartilhada por
+# copy-on-write e nenhum custo de import na primeira requisição).
+MODULOS_PESADOS = (
+    'numpy',
+    'app.services.projection',
+    'qrcode',
+    'qrcode.image.svg',
+    'PIL.Image',
+    'PIL.PngImagePlugin',
+)
+
+def aquecer():
+    """Importa os módulos pesados disponíveis e retorna os que foram carregados"""
+    carregados = []
+    for nome in MODULOS_PESADOS:
+        try:
+            importlib.import_module(nome)
+        except ImportError:
+            continue
+        carregados.append(nome)
+    return carregados
+
+def apos_fork(app):
+    """Descarta as conexões herdadas do mestre; cada worker abre as suas"""
+    from app.models import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,110 @@
+from flask import Blueprint, request, jsonify, current_app
+from functools import wraps
+from app.models import db
+from app.services import importer, settlement, statements
+import hmac
+import io
+
+admin_bp = Blueprint('admin', __name__)
+
+def admin_required(fn):
+    """Exige o cabeçalho X-Admin-Token igual a ADMIN_TOKEN (rotas desativadas sem ele)"""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        esperado = current_app.config.get('ADMIN_TOKEN')
+        recebido = request.headers.get('X-Admin-Token', '')
+        if not esperado or not hmac.compare_digest(recebido, esperado):
+            return jsonify({'error': 'Acesso restrito a administradores'}), 403
+        return fn(*args, **kwargs)
+    return wrapper
+
+@admin_bp.route('/api/admin/investments/import', methods=['POST'])
+@admin_required
+def import_investments():
+    """Importa investimentos em lote a partir de CSV ou JSON lines"""
+    try:
+        formato = request.args.get('formato', 'csv')
+        if formato not in importer.FORMATOS:
+            return jsonify({'error': 'Formato deve ser csv ou jsonl'}), 400
+        
+        # Arquivo enviado como multipart (campo "arquivo") ou no corpo da requisição
+        if 'arquivo' in request.files:
+            stream = request.files['arquivo'].stream
+        else:
+            stream = request.stream
+        
+        arquivo = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        resultado = importer.importar(arquivo, formato)
+        
+        return jsonify(resultado), 200
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/api/admin/pix/webhook', methods=['POST'])
+@admin_required
+def pix_webhook():
+    """Recebe notificações de PIX recebidos e liquida os depósitos pendentes"""
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('pix'), list):
+            return jsonify({'error': 'Lista pix é obrigatória'}), 400
+        
+        relatorio = settlement.liquidar(
+            settlement.lancamento(registro) for registro in data['pix'] if isinstance(registro, dict)
+        )
+        relatorio['valor_liquidado'] = float(relatorio['valor_liquidado'])
+        
+        return jsonify(relatorio), 200
+    
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/api/admin/extrato', methods=['GET'])
+@admin_required
+def exportar_extratos():
+    """Exporta as transações de todos os usuários (ou de ?user_id=) em fluxo"""
+    try:
+        formato = request.args.get('formato', 'csv')
+        if formato not in statements.FORMATOS:
+            return jsonify({'error': 'Formato deve ser csv ou jsonl'}), 400
+        
+        try:
+            user_id = int(request.args['user_id']) if request.args.get('user_id') else None
+            de, ate = statements.periodo(request.args)
+        except ValueError:
+            return jsonify({'error': 'Parâmetros user_id ou período inválidos'}), 400
+        
+        blocos = statements.exportar(statements.extrato(user_id, de, ate), statements.COLUNAS_EXTRATO, formato)
+        return statements.resposta(blocos, 'extratos', formato)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@admin_bp.route('/api/admin/informe/<int:ano>', methods=['GET'])
+@admin_required
+def exportar_informes(ano):
+    """Exporta os informes de rendimentos do ano de todos os usuários (ou de ?user_id=)
+    
+    Lê os informes consolidados por "flask statements-build" quando o ano já
+    terminou e foi consolidado; caso contrário (inclusive no ano corrente),
+    calcula-os em fluxo a partir das aplicações.
+    """
+    try:
+        formato = request.args.get('formato', 'csv')
+        if formato not in statements.FORMATOS:
+            return jsonify({'error': 'Formato deve ser csv ou jsonl'}), 400
+        
+        try:
+            user_id = int(request.args['user_id']) if request.args.get('user_id') else None
+        except ValueError:
+            return jsonify({'error': 'Parâmetro user_id inválido'}), 400
+        
+        blocos = statements.exportar(statements.informe(ano, user_id), statements.COLUNAS_INFORME, formato)
+        return statements.resposta(blocos, f'informes-{ano}', formato)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
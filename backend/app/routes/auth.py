@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required
 from app.models.user import User
 from app.models import db
+from app.services import identity, passwords
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -32,13 +33,17 @@ def register():
             email=data['email'],
             nome=data['nome']
         )
-        user.set_password(data['senha'])
+        passwords.definir_senha(user, data['senha'])
         
         db.session.add(user)
         db.session.commit()
         
         return jsonify({'message': 'Usuário criado com sucesso'}), 201
     
+    except passwords.HashIndisponivel as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503
+    
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -54,12 +59,16 @@ def login():
         
         user = User.query.filter_by(cpf=data['cpf']).first()
         
-        if not user or not user.check_password(data['senha']):
+        if not user or not passwords.verificar_senha(user, data['senha']):
             return jsonify({'error': 'CPF ou senha inválidos'}), 401
         
         if not user.ativo:
             return jsonify({'error': 'Usuário inativo'}), 401
         
+        # Persistir o hash refeito quando o algoritmo ou o custo mudaram
+        if db.session.is_modified(user):
+            db.session.commit()
+        
         access_token = create_access_token(identity=str(user.id))
         
         return jsonify({
@@ -67,7 +76,11 @@ def login():
             'user': user.to_dict()
         })
     
+    except passwords.HashIndisponivel as e:
+        return jsonify({'error': str(e)}), 503
+    
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
 @auth_bp.route('/api/profile', methods=['GET'])
@@ -75,8 +88,7 @@ def login():
 def get_profile():
     """Retorna o perfil do usuário logado"""
     try:
-        user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
+        user = identity.current_user()
         
         if not user:
             return jsonify({'error': 'Usuário não encontrado'}), 404
@@ -1,73 +1,312 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, url_for
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models.investment import Investment, UserInvestment, InvestmentCategory, InvestmentStatus
-from app.models.user import User, Transaction, TransactionType, TransactionStatus
+from app.models.investment import Investment, UserInvestment, InvestmentCategory, InvestmentStatus, INVESTMENT_COLUMNS
+from app.models.user import Transaction, TransactionType, TransactionStatus, TRANSACTION_FIELDS
 from app.models import db
-import qrcode
-import io
+from app.database import somente_leitura
+from sqlalchemy.orm import undefer
+from app.services import allocation, catalog, fundraising, identity, pix_qr, portfolio, search, statements
+from app.services.idempotency import idempotente
+from app.services.ratelimit import limitar
+from app.utils.pagination import paginate_keyset, parse_limit, CursorInvalido
+from app.utils.serialization import linhas
 import base64
+import threading
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+from decimal import Decimal
 
 investments_bp = Blueprint('investments', __name__)
 
+# Colunas aceitas no parâmetro "ordenar" da listagem de investimentos
+SORTABLE_COLUMNS = {
+    'id': Investment.id,
+    'taxa_retorno': Investment.taxa_retorno,
+    'prazo': Investment.prazo,
+    'valor_minimo': Investment.valor_minimo,
+    'data_criacao': Investment.data_criacao,
+}
+
+# Filtros de faixa: parâmetro -> (coluna, conversor, operador)
+RANGE_FILTERS = {
+    'taxa_min': (Investment.taxa_retorno, Decimal, '>='),
+    'taxa_max': (Investment.taxa_retorno, Decimal, '<='),
+    'prazo_min': (Investment.prazo, int, '>='),
+    'prazo_max': (Investment.prazo, int, '<='),
+    'valor_min': (Investment.valor_minimo, Decimal, '>='),
+    'valor_max': (Investment.valor_minimo, Decimal, '<='),
+}
+
+def _parse_bool(value):
+    if value.lower() in ('true', '1', 'sim'):
+        return True
+    if value.lower() in ('false', '0', 'nao', 'não'):
+        return False
+    raise ValueError(value)
+
+class FiltroInvalido(ValueError):
+    """Parâmetro de consulta inválido na listagem de investimentos"""
+
+def _filtrar_investimentos(query, args):
+    """Aplica os filtros estruturados da query string à consulta de investimentos"""
+    categoria = args.get('categoria')
+    if categoria:
+        try:
+            query = query.filter(Investment.categoria == InvestmentCategory(categoria))
+        except ValueError:
+            raise FiltroInvalido('Categoria inválida')
+    
+    status = args.get('status')
+    if status:
+        try:
+            query = query.filter(Investment.status == InvestmentStatus(status))
+        except ValueError:
+            raise FiltroInvalido('Status inválido')
+    
+    isencao_ir = args.get('isencao_ir')
+    if isencao_ir:
+        try:
+            query = query.filter(Investment.isencao_ir == _parse_bool(isencao_ir))
+        except ValueError:
+            raise FiltroInvalido('Parâmetro isencao_ir inválido')
+    
+    for param, (column, convert, operator) in RANGE_FILTERS.items():
+        value = args.get(param)
+        if not value:
+            continue
+        try:
+            value = convert(value)
+        except (ValueError, ArithmeticError):
+            raise FiltroInvalido(f'Parâmetro {param} inválido')
+        query = query.filter(column >= value if operator == '>=' else column <= value)
+    
+    return query
+
+def _listar_investimentos(args):
+    query = _filtrar_investimentos(db.session.query(*INVESTMENT_COLUMNS), args)
+    
+    ordenar = args.get('ordenar', 'id')
+    if ordenar not in SORTABLE_COLUMNS:
+        raise FiltroInvalido('Campo de ordenação inválido')
+    
+    ordem = args.get('ordem', 'asc')
+    if ordem not in ('asc', 'desc'):
+        raise FiltroInvalido('Ordem deve ser asc ou desc')
+    
+    try:
+        limit = parse_limit(args.get('limit'))
+    except ValueError:
+        raise FiltroInvalido('Parâmetro limit inválido')
+    
+    try:
+        investments, next_cursor = paginate_keyset(
+            query,
+            SORTABLE_COLUMNS[ordenar],
+            Investment.id,
+            cursor=args.get('cursor'),
+            limit=limit,
+            descending=(ordem == 'desc')
+        )
+    except CursorInvalido as e:
+        raise FiltroInvalido(str(e))
+    
+    return {
+        'investments': linhas(investments),
+        'next_cursor': next_cursor
+    }
+
+def _buscar_investimentos(args):
+    """Busca textual combinada aos filtros estruturados, por relevância ou SORTABLE_COLUMNS"""
+    dialeto = db.session.get_bind().dialect.name
+    try:
+        query, relevancia = search.aplicar(db.session.query(*INVESTMENT_COLUMNS), args.get('q'), dialeto)
+    except ValueError as e:
+        raise FiltroInvalido(str(e))
+    query = _filtrar_investimentos(query, args)
+    
+    ordenar = args.get('ordenar', 'relevancia')
+    if ordenar != 'relevancia' and ordenar not in SORTABLE_COLUMNS:
+        raise FiltroInvalido('Campo de ordenação inválido')
+    
+    ordem = args.get('ordem', 'desc' if ordenar == 'relevancia' else 'asc')
+    if ordem not in ('asc', 'desc'):
+        raise FiltroInvalido('Ordem deve ser asc ou desc')
+    
+    try:
+        limit = parse_limit(args.get('limit'))
+    except ValueError:
+        raise FiltroInvalido('Parâmetro limit inválido')
+    
+    # A relevância vira uma coluna da subconsulta para que o cursor
+    # (relevância, id) funcione como o das demais ordenações
+    resultados = query.add_columns(relevancia.label('relevancia')).subquery()
+    try:
+        investments, next_cursor = paginate_keyset(
+            db.session.query(resultados),
+            resultados.c[ordenar],
+            resultados.c.id,
+            cursor=args.get('cursor'),
+            limit=limit,
+            descending=(ordem == 'desc')
+        )
+    except CursorInvalido as e:
+        raise FiltroInvalido(str(e))
+    
+    return {
+        'investments': linhas(investments),
+        'next_cursor': next_cursor
+    }
+
+def _cached_response(conteudo, etag):
+    """Resposta JSON já serializada com ETag, respondendo 304 quando possível"""
+    response = Response(conteudo, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f"private, max-age={current_app.config.get('CATALOG_MAX_AGE', 0)}, must-revalidate"
+    return response.make_conditional(request)
+
 @investments_bp.route('/api/investments', methods=['GET'])
 @jwt_required()
+@somente_leitura
 def get_investments():
-    """Lista todos os investimentos disponíveis"""
+    """Lista os investimentos com filtros e paginação por cursor"""
     try:
-        categoria = request.args.get('categoria')
+        args = request.args
+        chave = tuple(sorted(args.items(multi=True)))
         
-        query = Investment.query
+        try:
+            conteudo, etag = catalog.pagina(chave, lambda: _listar_investimentos(args))
+        except FiltroInvalido as e:
+            return jsonify({'error': str(e)}), 400
         
-        if categoria:
-            try:
-                categoria_enum = InvestmentCategory(categoria)
-                query = query.filter_by(categoria=categoria_enum)
-            except ValueError:
-                return jsonify({'error': 'Categoria inválida'}), 400
+        return _cached_response(conteudo, etag)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@investments_bp.route('/api/investments/search', methods=['GET'])
+@jwt_required()
+@somente_leitura
+def search_investments():
+    """Busca investimentos por texto no título e na descrição
+    
+    ?q= é obrigatório; aceita os mesmos filtros, limit e cursor da listagem.
+    A ordenação padrão é por relevância (campo "relevancia" de cada item).
+    """
+    try:
+        args = request.args
+        chave = ('busca',) + tuple(sorted(args.items(multi=True)))
+        
+        try:
+            conteudo, etag = catalog.pagina(chave, lambda: _buscar_investimentos(args))
+        except FiltroInvalido as e:
+            return jsonify({'error': str(e)}), 400
+        except search.BuscaIndisponivel as e:
+            return jsonify({'error': str(e)}), 501
         
-        investments = query.all()
-        return jsonify([investment.to_dict() for investment in investments])
+        return _cached_response(conteudo, etag)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @investments_bp.route('/api/investments/categories', methods=['GET'])
 @jwt_required()
+@somente_leitura
 def get_categories():
-    """Lista todas as categorias de investimento"""
+    """Lista as categorias de investimento com contagens por disponibilidade"""
     try:
-        categories = [
-            {
-                'value': category.value,
-                'label': category.value.replace('_', ' ').title()
-            }
-            for category in InvestmentCategory
-        ]
-        return jsonify(categories)
+        conteudo, etag = catalog.categorias()
+        return _cached_response(conteudo, etag)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@investments_bp.route('/api/investments/stream', methods=['GET'])
+@jwt_required(locations=['headers', 'query_string'])
+def stream_captacao():
+    """Acompanha a captação em tempo real por server-sent events
+
+    Cada ordem confirmada gera um evento "captacao" com os deltas
+    (id, valor_captado, valor_total, status); ?ids=1,2,3 restringe aos
+    investimentos exibidos e envia o estado atual deles ao conectar. O
+    EventSource do navegador não envia cabeçalhos, então o token também é
+    aceito em ?jwt=. Fora do modo ASGI cada conexão ocupa um worker
+    síncrono, então a resposta é um long-poll: termina no primeiro lote de
+    deltas ou após FUNDRAISING_LONG_POLL segundos (abaixo do timeout do
+    gunicorn) e o EventSource reconecta.
+    """
+    try:
+        try:
+            ids = fundraising.parse_ids(request.args.get('ids'))
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        iniciais = []
+        if ids:
+            iniciais = fundraising.deltas_iniciais(db.session.execute(fundraising.consulta_estado(ids)))
+        
+        hub = fundraising.hub()
+        sinal = threading.Event()
+        try:
+            assinatura = hub.assinar(ids, sinal.set)
+        except fundraising.HubLotado as e:
+            return jsonify({'error': str(e)}), 503
+        keepalive = current_app.config.get('FUNDRAISING_KEEPALIVE', fundraising.DEFAULT_KEEPALIVE)
+        limite = time.monotonic() + current_app.config.get('FUNDRAISING_LONG_POLL', fundraising.DEFAULT_LONG_POLL)
+        
+        def eventos():
+            try:
+                yield 'retry: 3000\n\n'
+                if iniciais:
+                    yield fundraising.evento_sse(iniciais)
+                while (restante := limite - time.monotonic()) > 0:
+                    if not sinal.wait(min(keepalive, restante)):
+                        yield fundraising.KEEPALIVE_SSE
+                        continue
+                    sinal.clear()
+                    deltas = hub.retirar(assinatura)
+                    if deltas:
+                        yield fundraising.evento_sse(deltas)
+                        return
+            finally:
+                hub.cancelar(assinatura)
+        
+        return Response(eventos(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@investments_bp.route('/api/config', methods=['GET'])
+def get_config():
+    """Recursos do servidor que o cliente precisa conhecer antes de usá-los
+
+    captacao_tempo_real só é verdadeiro no modo ASGI: nos workers síncronos
+    o SSE da captação é um long-poll e o cliente não deve mantê-lo aberto.
+    """
+    return jsonify({'captacao_tempo_real': current_app.config['SERVIDOR_ASGI']})
+
 @investments_bp.route('/api/saldo', methods=['GET'])
 @jwt_required()
 def get_saldo():
     """Retorna o saldo do usuário logado"""
     try:
-        user_id = int(get_jwt_identity())
-        user = User.query.get(user_id)
+        user = identity.current_user()
         
         if not user:
             return jsonify({'error': 'Usuário não encontrado'}), 404
         
-        return jsonify({'saldo': float(user.saldo)})
+        return jsonify({'saldo': user.saldo})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @investments_bp.route('/api/depositar', methods=['POST'])
 @jwt_required()
+@idempotente
+@limitar
 def depositar():
     """Adiciona saldo ao usuário logado (após aprovação)"""
     try:
@@ -82,8 +321,7 @@ def depositar():
         if valor <= 0:
             return jsonify({'error': 'Valor deve ser positivo'}), 400
         
-        user = User.query.get(user_id)
-        if not user:
+        if not identity.current_user():
             return jsonify({'error': 'Usuário não encontrado'}), 404
         
         # Criar transação de depósito
@@ -109,6 +347,8 @@ def depositar():
 
 @investments_bp.route('/api/gerar_pix', methods=['POST'])
 @jwt_required()
+@idempotente
+@limitar
 def gerar_pix():
     """Gera dados PIX para depósito"""
     try:
@@ -123,33 +363,15 @@ def gerar_pix():
         if valor <= 0:
             return jsonify({'error': 'Valor deve ser positivo'}), 400
         
-        # Dados bancários simulados
-        dados_bancarios = {
-            'favorecido': 'PeerBR Investimentos LTDA',
-            'cnpj': '12.345.678/0001-90',
-            'banco': '341 - Itaú Unibanco S.A.',
-            'agencia': '1234',
-            'conta': '12345-6',
-            'chave_pix': 'pix@peerbr.com.br'
-        }
+        formato = data.get('formato', 'png')
+        if formato not in pix_qr.FORMATOS:
+            return jsonify({'error': 'Formato deve ser png ou svg'}), 400
         
         # Gerar ID único para o PIX
         pix_id = str(uuid.uuid4())
         
-        # Criar string para QR Code (simulado)
-        pix_string = f"00020126580014BR.GOV.BCB.PIX0136{dados_bancarios['chave_pix']}520400005303986540{valor:.2f}5802BR5925{dados_bancarios['favorecido']}6009SAO PAULO62070503***6304"
-        
-        # Gerar QR Code
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(pix_string)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Converter para base64
-        buffer = io.BytesIO()
-        img.save(buffer, format='PNG')
-        qr_code_base64 = base64.b64encode(buffer.getvalue()).decode()
+        # A transação guarda apenas o payload; a imagem é servida por /api/pix/<pix_id>/qr
+        payload = pix_qr.montar_payload(valor)
         
         # Criar transação PIX
         transaction = Transaction(
@@ -159,26 +381,68 @@ def gerar_pix():
             status=TransactionStatus.PENDENTE,
             descricao=f'Depósito PIX de R$ {valor:.2f}',
             pix_id=pix_id,
-            pix_qr_code=qr_code_base64
+            pix_qr_code=payload
         )
         
         db.session.add(transaction)
         db.session.commit()
         
-        return jsonify({
+        response = {
             'pix_id': pix_id,
-            'dados_bancarios': dados_bancarios,
-            'qr_code': qr_code_base64,
+            'dados_bancarios': pix_qr.DADOS_BANCARIOS,
+            'pix_copia_e_cola': payload,
+            'qr_code_url': _qr_code_url(pix_id, payload, formato),
             'valor': valor,
             'transaction_id': transaction.id
-        })
+        }
+        
+        # Imagem embutida em base64 apenas quando solicitada explicitamente
+        if data.get('inline'):
+            response['qr_code'] = base64.b64encode(pix_qr.gerar_qr_code(payload, formato)).decode()
+        
+        return jsonify(response)
     
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+def _qr_code_url(pix_id, payload, formato):
+    return url_for('investments.get_pix_qr_code', pix_id=pix_id,
+                   digest=pix_qr.digest(payload), formato=formato)
+
+@investments_bp.route('/api/pix/<pix_id>/qr/<digest>.<formato>', methods=['GET'])
+def get_pix_qr_code(pix_id, digest, formato):
+    """Serve a imagem do QR Code PIX endereçada pelo hash do payload"""
+    try:
+        if formato not in pix_qr.FORMATOS:
+            return jsonify({'error': 'Formato deve ser png ou svg'}), 400
+        
+        etag = f'"{digest}.{formato}"'
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=304, headers={'ETag': etag})
+        
+        transaction = Transaction.query.options(
+            undefer(Transaction.pix_qr_code)
+        ).filter_by(pix_id=pix_id).first()
+        if not transaction or not transaction.pix_qr_code:
+            return jsonify({'error': 'QR Code não encontrado'}), 404
+        
+        imagem = pix_qr.imagem(transaction.pix_qr_code, digest, formato)
+        if imagem is None:
+            return jsonify({'error': 'QR Code não encontrado'}), 404
+        
+        return Response(imagem, mimetype=pix_qr.FORMATOS[formato], headers={
+            'ETag': etag,
+            'Cache-Control': 'public, max-age=31536000, immutable'
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @investments_bp.route('/api/investir/<int:investment_id>', methods=['POST'])
 @jwt_required()
+@idempotente
+@limitar
 def investir(investment_id):
     """Aplica saldo em um investimento"""
     try:
@@ -193,54 +457,15 @@ def investir(investment_id):
         if valor <= 0:
             return jsonify({'error': 'Valor deve ser positivo'}), 400
         
-        # Buscar usuário e investimento
-        user = User.query.get(user_id)
-        investment = Investment.query.get(investment_id)
-        
-        if not user:
-            return jsonify({'error': 'Usuário não encontrado'}), 404
-        
-        if not investment:
-            return jsonify({'error': 'Investimento não encontrado'}), 404
-        
-        # Validações
-        if investment.status != InvestmentStatus.DISPONIVEL:
-            return jsonify({'error': 'Investimento não está disponível'}), 400
-        
-        if valor < investment.valor_minimo:
-            return jsonify({'error': f'Valor mínimo para este investimento é R$ {investment.valor_minimo:.2f}'}), 400
-        
-        if not user.debitar_saldo(valor):
-            return jsonify({'error': 'Saldo insuficiente'}), 400
-        
-        # Criar aplicação
-        user_investment = UserInvestment(
-            user_id=user_id,
-            investment_id=investment_id,
-            valor_aplicado=valor
-        )
-        
-        # Atualizar valor captado do investimento
-        investment.valor_captado += valor
-        
-        # Criar transação de investimento
-        transaction = Transaction(
-            user_id=user_id,
-            tipo=TransactionType.INVESTIMENTO,
-            valor=valor,
-            status=TransactionStatus.APROVADO,
-            descricao=f'Investimento em {investment.titulo}',
-            data_aprovacao=datetime.utcnow()
-        )
-        
-        db.session.add(user_investment)
-        db.session.add(transaction)
-        db.session.commit()
+        try:
+            user_investment, saldo_restante = allocation.investir(user_id, investment_id, valor)
+        except allocation.AlocacaoErro as e:
+            return jsonify({'error': str(e)}), e.status_code
         
         return jsonify({
             'message': 'Investimento realizado com sucesso',
             'investment': user_investment.to_dict(),
-            'saldo_restante': float(user.saldo)
+            'saldo_restante': saldo_restante
         })
     
     except Exception as e:
@@ -253,36 +478,231 @@ def meus_investimentos():
     """Lista os investimentos do usuário logado"""
     try:
         user_id = int(get_jwt_identity())
+        return jsonify(linhas(_consulta_meus_investimentos(user_id)))
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _consulta_meus_investimentos(user_id):
+    return db.session.query(
+        *INVESTMENT_COLUMNS, UserInvestment.valor_aplicado, UserInvestment.data_aplicacao
+    ).join(
+        Investment, UserInvestment.investment_id == Investment.id
+    ).filter(UserInvestment.user_id == user_id)
+
+@investments_bp.route('/api/portfolio/resumo', methods=['GET'])
+@jwt_required()
+def get_portfolio_resumo():
+    """Retorna o resumo consolidado da carteira do usuário logado"""
+    try:
+        user_id = int(get_jwt_identity())
+        return jsonify(portfolio.resumo(user_id))
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@investments_bp.route('/api/portfolio/projecao', methods=['GET'])
+@jwt_required()
+def get_portfolio_projecao():
+    """Projeta o valor bruto e líquido de IR das aplicações do usuário logado"""
+    try:
+        user_id = int(get_jwt_identity())
+        
+        # Importado no primeiro uso: o numpy pesa na inicialização dos workers
+        from app.services import projection
+        
+        meses = request.args.get('meses')
+        try:
+            meses = int(meses) if meses else None
+        except ValueError:
+            return jsonify({'error': 'Parâmetro meses inválido'}), 400
+        if meses is not None and not 0 <= meses <= projection.MAX_MESES:
+            return jsonify({'error': f'Parâmetro meses deve estar entre 0 e {projection.MAX_MESES}'}), 400
         
-        user_investments = db.session.query(UserInvestment, Investment).join(
-            Investment, UserInvestment.investment_id == Investment.id
-        ).filter(UserInvestment.user_id == user_id).all()
+        ids, proj = projection.projetar_carteira(user_id, meses=meses)
         
-        result = []
-        for user_inv, investment in user_investments:
-            investment_data = investment.to_dict()
-            investment_data['valor_aplicado'] = float(user_inv.valor_aplicado)
-            investment_data['data_aplicacao'] = user_inv.data_aplicacao.isoformat()
-            result.append(investment_data)
+        posicoes = [
+            {
+                'id': int(ids[i]),
+                'data_vencimento': str(proj['data_vencimento'][i]),
+                'valor_bruto': round(float(proj['valor_bruto'][i]), 2),
+                'rendimento_bruto': round(float(proj['rendimento_bruto'][i]), 2),
+                'aliquota_ir': float(proj['aliquota_ir'][i]),
+                'imposto': round(float(proj['imposto'][i]), 2),
+                'valor_liquido': round(float(proj['valor_liquido'][i]), 2)
+            }
+            for i in range(len(ids))
+        ]
         
-        return jsonify(result)
+        return jsonify({
+            'posicoes': posicoes,
+            'total_bruto': round(float(proj['valor_bruto'].sum()), 2),
+            'total_liquido': round(float(proj['valor_liquido'].sum()), 2),
+            'curva': [
+                {'mes': mes, 'valor_bruto': round(float(bruto), 2), 'valor_liquido': round(float(liquido), 2)}
+                for mes, (bruto, liquido) in enumerate(zip(proj['curva_bruta'], proj['curva_liquida']))
+            ]
+        })
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Campos retornados por padrão no histórico; pix_qr_code só quando pedido
+TRANSACTION_DEFAULT_FIELDS = [campo for campo in TRANSACTION_FIELDS if campo != 'pix_qr_code']
+
+def _consulta_transacoes(user_id, campos):
+    # Consultar apenas as colunas projetadas (id e data_criacao sustentam o cursor)
+    colunas = campos + [coluna for coluna in ('id', 'data_criacao') if coluna not in campos]
+    return db.session.query(
+        *[TRANSACTION_FIELDS[coluna] for coluna in colunas]
+    ).filter(Transaction.user_id == user_id)
+
+def _pagina_transacoes(query, campos, limit, cursor=None):
+    transactions, next_cursor = paginate_keyset(
+        query,
+        Transaction.data_criacao,
+        Transaction.id,
+        cursor=cursor,
+        limit=limit,
+        descending=True
+    )
+    return {
+        'transacoes': linhas(transactions, campos),
+        'next_cursor': next_cursor
+    }
+
+def _parse_date(value, fim_do_dia=False):
+    data = datetime.fromisoformat(value)
+    if fim_do_dia and len(value) == 10:
+        data += timedelta(days=1) - timedelta(microseconds=1)
+    return data
+
 @investments_bp.route('/api/transacoes', methods=['GET'])
 @jwt_required()
 def get_transacoes():
-    """Lista as transações do usuário logado"""
+    """Lista as transações do usuário logado com paginação por cursor"""
     try:
         user_id = int(get_jwt_identity())
+        args = request.args
+        
+        campos = TRANSACTION_DEFAULT_FIELDS
+        if args.get('campos'):
+            campos = [campo.strip() for campo in args['campos'].split(',') if campo.strip()]
+            invalidos = [campo for campo in campos if campo not in TRANSACTION_FIELDS]
+            if invalidos:
+                return jsonify({'error': f'Campos inválidos: {", ".join(invalidos)}'}), 400
+        
+        query = _consulta_transacoes(user_id, campos)
+        
+        try:
+            if args.get('de'):
+                query = query.filter(Transaction.data_criacao >= _parse_date(args['de']))
+            if args.get('ate'):
+                query = query.filter(Transaction.data_criacao <= _parse_date(args['ate'], fim_do_dia=True))
+        except ValueError:
+            return jsonify({'error': 'Datas devem estar no formato AAAA-MM-DD'}), 400
+        
+        try:
+            limit = parse_limit(args.get('limit'))
+        except ValueError:
+            return jsonify({'error': 'Parâmetro limit inválido'}), 400
+        
+        try:
+            return jsonify(_pagina_transacoes(query, campos, limit, cursor=args.get('cursor')))
+        except CursorInvalido as e:
+            return jsonify({'error': str(e)}), 400
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@investments_bp.route('/api/extrato', methods=['GET'])
+@jwt_required()
+def exportar_extrato():
+    """Exporta todas as transações do usuário logado em CSV ou JSON lines
+    
+    ?ano= ou ?de=&ate= restringem o período; a resposta é gerada em fluxo.
+    """
+    try:
+        user_id = int(get_jwt_identity())
+        formato = request.args.get('formato', 'csv')
+        if formato not in statements.FORMATOS:
+            return jsonify({'error': 'Formato deve ser csv ou jsonl'}), 400
+        
+        try:
+            de, ate = statements.periodo(request.args)
+        except ValueError:
+            return jsonify({'error': 'Período inválido: use ano=AAAA ou datas AAAA-MM-DD'}), 400
+        
+        linhas_extrato = statements.extrato(user_id, de, ate)
+        blocos = statements.exportar(linhas_extrato, statements.COLUNAS_EXTRATO, formato)
+        return statements.resposta(blocos, 'extrato', formato)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@investments_bp.route('/api/informe/<int:ano>', methods=['GET'])
+@jwt_required()
+def exportar_informe(ano):
+    """Informe de rendimentos do ano do usuário logado, por categoria e isenção de IR"""
+    try:
+        user_id = int(get_jwt_identity())
+        formato = request.args.get('formato', 'csv')
+        if formato not in statements.FORMATOS:
+            return jsonify({'error': 'Formato deve ser csv ou jsonl'}), 400
         
-        transactions = Transaction.query.filter_by(user_id=user_id).order_by(
-            Transaction.data_criacao.desc()
-        ).all()
-        
-        return jsonify([transaction.to_dict() for transaction in transactions])
+        blocos = statements.exportar(statements.informe(ano, user_id), statements.COLUNAS_INFORME, formato)
+        return statements.resposta(blocos, f'informe-{ano}', formato)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Seções do painel da conta, na ordem em que a página as exibe
+DASHBOARD_SECOES = ('perfil', 'saldo', 'investimentos', 'transacoes', 'resumo')
+
+@investments_bp.route('/api/dashboard', methods=['GET'])
+@jwt_required()
+def get_dashboard():
+    """Painel da conta em uma única chamada: perfil, saldo, aplicações,
+    transações recentes e resumo da carteira
+
+    ?secoes=perfil,saldo limita as seções retornadas (padrão: todas) e
+    transacoes_limit define o tamanho da primeira página de transações,
+    que continua em /api/transacoes pelo next_cursor.
+    """
+    try:
+        args = request.args
+        
+        secoes = DASHBOARD_SECOES
+        if args.get('secoes'):
+            secoes = [secao.strip() for secao in args['secoes'].split(',') if secao.strip()]
+            invalidas = [secao for secao in secoes if secao not in DASHBOARD_SECOES]
+            if invalidas:
+                return jsonify({'error': f'Seções inválidas: {", ".join(invalidas)}'}), 400
+        
+        try:
+            limit = parse_limit(args.get('transacoes_limit'))
+        except ValueError:
+            return jsonify({'error': 'Parâmetro transacoes_limit inválido'}), 400
+        
+        # Usuário e saldo carregados uma só vez (pelo cache de identidade)
+        user = identity.current_user()
+        if not user:
+            return jsonify({'error': 'Usuário não encontrado'}), 404
+        
+        painel = {}
+        if 'perfil' in secoes:
+            painel['perfil'] = user.to_dict()
+        if 'saldo' in secoes:
+            painel['saldo'] = user.saldo
+        if 'investimentos' in secoes:
+            painel['investimentos'] = linhas(_consulta_meus_investimentos(user.id))
+        if 'transacoes' in secoes:
+            campos = TRANSACTION_DEFAULT_FIELDS
+            painel['transacoes'] = _pagina_transacoes(_consulta_transacoes(user.id, campos), campos, limit)
+        if 'resumo' in secoes:
+            painel['resumo'] = portfolio.resumo(user.id)
+        
+        return jsonify(painel)
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1 @@
+# Regras de negócio compartilhadas entre as rotas
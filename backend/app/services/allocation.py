@@ -0,0 +1,136 @@
+import random
+import time
+from datetime import datetime
+from decimal import Decimal
+from flask import current_app
+from sqlalchemy import update, select
+from sqlalchemy.exc import OperationalError
+from app.models.investment import Investment, UserInvestment, InvestmentStatus
+from app.models.user import User, Transaction, TransactionType, TransactionStatus
+from app.models import db
+from app.services import fundraising, ledger, portfolio
+
+DEFAULT_MAX_TENTATIVAS = 3
+
+class AlocacaoErro(Exception):
+    """Ordem de investimento recusada por uma regra de negócio"""
+
+    def __init__(self, mensagem, status_code=400):
+        super().__init__(mensagem)
+        self.status_code = status_code
+
+def investir(user_id, investment_id, valor):
+    """Executa uma ordem de investimento de forma atômica
+
+    O débito é um lançamento no razão, feito com o usuário bloqueado até o
+    fim da transação, e a captação do investimento é um UPDATE condicional,
+    de modo que ordens concorrentes nunca deixam o saldo negativo nem
+    ultrapassam o valor_total do investimento. Conflitos de
+    bloqueio do banco (SQLite "database is locked", deadlock ou falha de
+    serialização no PostgreSQL) são repetidos um número limitado de vezes.
+
+    Retorna (user_investment, saldo_restante).
+    """
+    valor = Decimal(str(valor)).quantize(Decimal('0.01'))
+    max_tentativas = current_app.config.get('INVESTIR_MAX_TENTATIVAS', DEFAULT_MAX_TENTATIVAS)
+
+    for tentativa in range(1, max_tentativas + 1):
+        try:
+            return _executar_ordem(user_id, investment_id, valor)
+        except AlocacaoErro:
+            db.session.rollback()
+            raise
+        except OperationalError:
+            db.session.rollback()
+            if tentativa == max_tentativas:
+                raise
+            # Backoff exponencial com jitter para dispersar as retentativas
+            time.sleep(random.uniform(0, 0.01 * 2 ** tentativa))
+
+def _executar_ordem(user_id, investment_id, valor):
+    investment = db.session.get(Investment, investment_id)
+    if not investment:
+        raise AlocacaoErro('Investimento não encontrado', 404)
+
+    if investment.status != InvestmentStatus.DISPONIVEL:
+        raise AlocacaoErro('Investimento não está disponível')
+
+    if valor < investment.valor_minimo:
+        raise AlocacaoErro(f'Valor mínimo para este investimento é R$ {investment.valor_minimo:.2f}')
+
+    titulo = investment.titulo
+    data_aplicacao = datetime.utcnow()
+
+    # Débitos do mesmo usuário são serializados; o saldo vem do razão
+    ledger.bloquear(user_id)
+    saldo = ledger.saldo(user_id)
+    if saldo is None:
+        raise AlocacaoErro('Usuário não encontrado', 404)
+    if saldo < valor:
+        raise AlocacaoErro('Saldo insuficiente')
+
+    # Captação condicional: respeita o status e o teto de valor_total
+    captacao = db.session.execute(
+        update(Investment)
+        .where(
+            Investment.id == investment_id,
+            Investment.status == InvestmentStatus.DISPONIVEL,
+            (Investment.valor_total.is_(None)) | (Investment.valor_captado + valor <= Investment.valor_total)
+        )
+        .values(valor_captado=Investment.valor_captado + valor)
+        .returning(Investment.valor_captado, Investment.valor_total)
+        .execution_options(synchronize_session=False, captacao=investment_id)
+    ).first()
+    if captacao is None:
+        status, valor_total, valor_captado = db.session.execute(
+            select(Investment.status, Investment.valor_total, Investment.valor_captado)
+            .where(Investment.id == investment_id)
+        ).one()
+        if status != InvestmentStatus.DISPONIVEL:
+            raise AlocacaoErro('Investimento não está disponível')
+        restante = valor_total - valor_captado
+        raise AlocacaoErro(f'Valor excede o disponível para captação (R$ {restante:.2f} restantes)')
+
+    # Encerrar a captação automaticamente quando o teto for atingido; a linha
+    # já está travada pelo UPDATE acima, então o valor retornado é o atual
+    valor_captado, valor_total = captacao
+    esgotado = valor_total is not None and valor_captado >= valor_total
+    if esgotado:
+        db.session.execute(
+            update(Investment)
+            .where(Investment.id == investment_id)
+            .values(status=InvestmentStatus.ESGOTADO)
+            .execution_options(synchronize_session=False, captacao=investment_id, esgotou=True)
+        )
+
+    user_investment = UserInvestment(
+        user_id=user_id,
+        investment_id=investment_id,
+        valor_aplicado=valor,
+        data_aplicacao=data_aplicacao
+    )
+
+    portfolio.registrar_aplicacao(user_id, investment, valor, data_aplicacao)
+
+    transaction = Transaction(
+        user_id=user_id,
+        tipo=TransactionType.INVESTIMENTO,
+        valor=valor,
+        status=TransactionStatus.APROVADO,
+        descricao=f'Investimento em {titulo}',
+        data_aprovacao=datetime.utcnow()
+    )
+
+    db.session.add(user_investment)
+    db.session.add(transaction)
+    db.session.flush()
+
+    ledger.lancar([(transaction.id, user_id, -valor, ledger.CONTA_INVESTIMENTOS)])
+
+    db.session.commit()
+
+    # Um único delta por ordem para quem acompanha a captação em tempo real
+    fundraising.publicar(investment_id, valor_captado, valor_total,
+                         InvestmentStatus.ESGOTADO if esgotado else InvestmentStatus.DISPONIVEL)
+
+    return user_investment, saldo - valor
@@ -0,0 +1,175 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from app.models.investment import Investment, InvestmentCategory, InvestmentStatus
+from app.models import db
+from app.database import primario
+
+DEFAULT_TTL = 30
+MAX_PAGINAS = 256
+
+# Cache em processo dos metadados e das páginas serializadas do catálogo.
+# Escritas em Investment feitas neste processo invalidam na hora; o TTL limita
+# o tempo que outros workers levam para enxergar escritas feitas fora dele.
+# As ordens (captação) descartam só as páginas que contêm o investimento, e,
+# quando ele esgota, também as filtradas por status e os metadados. Logo
+# depois de uma invalidação o cache é reabastecido pelo banco principal, para
+# que uma réplica atrasada não volte a guardar a linha antiga por um TTL.
+_lock = threading.Lock()
+_geracao = 0
+_metadados = None
+_paginas = OrderedDict()
+_primario_ate = 0.0
+
+def _apos_escrita():
+    global _geracao, _primario_ate
+    _geracao += 1
+    _primario_ate = time.monotonic() + current_app.config.get('DB_REPLICA_LAG', 0)
+
+def invalidar():
+    """Descarta o cache do catálogo e avança a geração"""
+    global _metadados
+    with _lock:
+        _apos_escrita()
+        _metadados = None
+        _paginas.clear()
+
+def invalidar_captacoes(captacoes):
+    """Descarta o que as ordens afetaram; captacoes é {investment_id: esgotou}"""
+    global _metadados
+    ids = set(captacoes)
+    esgotou = any(captacoes.values())
+    with _lock:
+        _apos_escrita()
+        if esgotou:
+            _metadados = None
+        for chave, entrada in list(_paginas.items()):
+            if entrada[3] & ids or (esgotou and _filtra_status(chave)):
+                del _paginas[chave]
+
+def _filtra_status(chave):
+    return any(isinstance(par, tuple) and par[0] == 'status' for par in chave)
+
+def _construir(funcao):
+    """Executa funcao, no banco principal se houve escrita há menos de DB_REPLICA_LAG"""
+    with _lock:
+        recente = time.monotonic() < _primario_ate
+    if recente:
+        with primario():
+            return funcao()
+    return funcao()
+
+def _ttl():
+    return current_app.config.get('CATALOG_CACHE_TTL', DEFAULT_TTL)
+
+def _etag(conteudo):
+    return hashlib.sha1(conteudo).hexdigest()
+
+def _carregar_metadados():
+    contagens = db.session.query(
+        Investment.categoria, Investment.status, func.count(Investment.id)
+    ).group_by(Investment.categoria, Investment.status).all()
+
+    por_categoria = {categoria: {'total': 0, 'disponiveis': 0} for categoria in InvestmentCategory}
+    for categoria, status, quantidade in contagens:
+        por_categoria[categoria]['total'] += quantidade
+        if status == InvestmentStatus.DISPONIVEL:
+            por_categoria[categoria]['disponiveis'] += quantidade
+
+    return [
+        {
+            'value': categoria.value,
+            'label': categoria.value.replace('_', ' ').title(),
+            'total': contagem['total'],
+            'disponiveis': contagem['disponiveis']
+        }
+        for categoria, contagem in por_categoria.items()
+    ]
+
+def categorias():
+    """Categorias com contagens pré-calculadas, como (json serializado, etag)"""
+    global _metadados
+    with _lock:
+        geracao = _geracao
+        if _metadados and time.monotonic() - _metadados[2] < _ttl():
+            return _metadados[0], _metadados[1]
+
+    conteudo = current_app.json.dumps(_construir(_carregar_metadados)).encode()
+    entrada = (conteudo, _etag(conteudo), time.monotonic())
+
+    with _lock:
+        # Não guardar um resultado calculado antes de uma invalidação
+        if geracao == _geracao:
+            _metadados = entrada
+    return entrada[0], entrada[1]
+
+def pagina(chave, construir):
+    """Página da listagem de investimentos, como (json serializado, etag)
+
+    construir() é chamado apenas em caso de falta no cache e deve retornar os
+    dados da página; exceções propagam sem que nada seja guardado.
+    """
+    with _lock:
+        geracao = _geracao
+        entrada = _paginas.get(chave)
+        if entrada and time.monotonic() - entrada[2] < _ttl():
+            _paginas.move_to_end(chave)
+            return entrada[0], entrada[1]
+
+    dados = _construir(construir)
+    conteudo = current_app.json.dumps(dados).encode()
+    # ids da página, para descartá-la quando um deles receber uma ordem
+    ids = frozenset(item['id'] for item in dados.get('investments', ()))
+    entrada = (conteudo, _etag(conteudo), time.monotonic(), ids)
+
+    with _lock:
+        if geracao == _geracao:
+            _paginas[chave] = entrada
+            _paginas.move_to_end(chave)
+            while len(_paginas) > MAX_PAGINAS:
+                _paginas.popitem(last=False)
+    return entrada[0], entrada[1]
+
+def _is_investment(mapper):
+    return mapper is not None and mapper.class_ is Investment
+
+def _marcar(session, investment_id=None, esgotou=False):
+    """Marca a sessão: investment_id None descarta tudo no commit; senão, só a captação dele"""
+    alterado = session.info.get('catalogo_alterado', {})
+    if investment_id is None or alterado is True:
+        session.info['catalogo_alterado'] = True
+    else:
+        alterado[investment_id] = alterado.get(investment_id, False) or esgotou
+        session.info['catalogo_alterado'] = alterado
+
+@event.listens_for(Session, 'before_flush')
+def _marcar_flush(session, flush_context, instances):
+    alterados = list(session.new) + list(session.dirty) + list(session.deleted)
+    if any(isinstance(obj, Investment) for obj in alterados):
+        _marcar(session)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _marcar_execucao(orm_execute_state):
+    # UPDATE/INSERT/DELETE em massa; os de allocation.investir informam a
+    # captação por execution_options e descartam só o que ela afeta
+    if orm_execute_state.is_select:
+        return
+    if _is_investment(orm_execute_state.bind_mapper):
+        opcoes = orm_execute_state.execution_options
+        _marcar(orm_execute_state.session, opcoes.get('captacao'), opcoes.get('esgotou', False))
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_apos_commit(session):
+    alterado = session.info.pop('catalogo_alterado', None)
+    if alterado is True:
+        invalidar()
+    elif alterado:
+        invalidar_captacoes(alterado)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _descartar_marcacao(session, previous_transaction):
+    session.info.pop('catalogo_alterado', None)
@@ -0,0 +1,188 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlparse
+from flask import current_app
+from sqlalchemy import select
+from app.models.investment import Investment
+
+try:
+    import redis
+except ImportError:  # broker Redis é opcional
+    redis = None
+
+DEFAULT_MAX_ASSINANTES = 10000
+DEFAULT_KEEPALIVE = 15
+# Duração máxima de uma conexão servida pelos workers síncronos (long-poll)
+DEFAULT_LONG_POLL = 20
+MAX_IDS = 200
+CANAL = 'fundraising'
+KEEPALIVE_SSE = ': keepalive\n\n'
+
+# Progresso da captação em tempo real. Cada ordem confirmada publica um
+# delta compacto (id, valor_captado, valor_total, status) uma única vez no
+# hub do processo, que o repassa a todos os assinantes interessados naquele
+# investimento. Os deltas trazem valores absolutos, então vários deltas do
+# mesmo investimento ainda não entregues a um assinante lento se reduzem ao
+# mais recente: a fila de cada assinante nunca passa do tamanho do catálogo.
+
+class HubLotado(Exception):
+    """Limite de assinantes do processo atingido"""
+
+class Assinatura:
+    def __init__(self, ids, avisar):
+        self.ids = ids
+        self.pendentes = OrderedDict()
+        self._avisar = avisar
+
+class Hub:
+    """Pub/sub em processo; avisar é chamado (de qualquer thread) quando há deltas"""
+
+    def __init__(self, max_assinantes=DEFAULT_MAX_ASSINANTES):
+        self._lock = threading.Lock()
+        self._assinaturas = set()
+        self._max_assinantes = max_assinantes
+
+    def assinar(self, ids=None, avisar=None):
+        """Nova assinatura dos investimentos em ids (todos, se None)"""
+        assinatura = Assinatura(frozenset(ids) if ids else None, avisar)
+        with self._lock:
+            if len(self._assinaturas) >= self._max_assinantes:
+                raise HubLotado('Limite de conexões de acompanhamento atingido')
+            self._assinaturas.add(assinatura)
+        return assinatura
+
+    def cancelar(self, assinatura):
+        with self._lock:
+            self._assinaturas.discard(assinatura)
+
+    def retirar(self, assinatura):
+        """Deltas pendentes da assinatura, do mais antigo ao mais recente"""
+        with self._lock:
+            deltas = list(assinatura.pendentes.values())
+            assinatura.pendentes.clear()
+        return deltas
+
+    def entregar(self, delta):
+        """Repassa o delta às assinaturas locais interessadas"""
+        avisos = []
+        with self._lock:
+            for assinatura in self._assinaturas:
+                if assinatura.ids is None or delta['id'] in assinatura.ids:
+                    assinatura.pendentes.pop(delta['id'], None)
+                    assinatura.pendentes[delta['id']] = delta
+                    avisos.append(assinatura._avisar)
+        for avisar in avisos:
+            avisar()
+        return len(avisos)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._assinaturas)
+
+class LocalBroker:
+    """Broker de um único processo: publicar é entregar direto ao hub"""
+
+    def __init__(self, hub):
+        self.hub = hub
+
+    def publicar(self, delta):
+        self.hub.entregar(delta)
+
+class RedisBroker:
+    """Broker entre workers via pub/sub de um servidor compatível com Redis
+
+    Cada processo mantém uma thread assinando o canal e entregando ao hub
+    local; publicar custa um PUBLISH por ordem, qualquer que seja o número
+    de assinantes.
+    """
+
+    def __init__(self, hub, url):
+        if redis is None:
+            raise RuntimeError('FUNDRAISING_BROKER_URL aponta para Redis, mas o pacote redis não está instalado')
+        self.hub = hub
+        self._cliente = redis.Redis.from_url(url)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _escutar(self):
+        while True:
+            try:
+                pubsub = self._cliente.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CANAL)
+                for mensagem in pubsub.listen():
+                    self.hub.entregar(json.loads(mensagem['data']))
+            except redis.RedisError:
+                # Reconecta; deltas perdidos nesse intervalo são corrigidos
+                # pelo estado inicial enviado na reconexão do cliente
+                time.sleep(1)
+
+    def iniciar(self):
+        # Thread criada no primeiro uso, já dentro do worker (depois do fork)
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._escutar, name='fundraising-broker', daemon=True)
+                    self._thread.start()
+
+    def publicar(self, delta):
+        self._cliente.publish(CANAL, json.dumps(delta))
+
+def criar_broker(url, hub):
+    esquema = urlparse(url).scheme
+    if esquema == 'memory':
+        return LocalBroker(hub)
+    if esquema in ('redis', 'rediss', 'unix'):
+        return RedisBroker(hub, url)
+    raise ValueError(f'FUNDRAISING_BROKER_URL inválida: {url}')
+
+def init_app(app):
+    hub = Hub(app.config.get('FUNDRAISING_MAX_ASSINANTES', DEFAULT_MAX_ASSINANTES))
+    app.extensions['fundraising'] = criar_broker(app.config['FUNDRAISING_BROKER_URL'], hub)
+
+def _broker(app=None):
+    return (app or current_app).extensions['fundraising']
+
+def hub(app=None):
+    broker = _broker(app)
+    if isinstance(broker, RedisBroker):
+        broker.iniciar()
+    return broker.hub
+
+def delta(investment_id, valor_captado, valor_total, status):
+    return {
+        'id': investment_id,
+        'valor_captado': str(valor_captado),
+        'valor_total': str(valor_total) if valor_total is not None else None,
+        'status': status.value,
+    }
+
+def publicar(investment_id, valor_captado, valor_total, status):
+    """Publica o novo estado da captação; falhas do broker não afetam a ordem"""
+    try:
+        _broker().publicar(delta(investment_id, valor_captado, valor_total, status))
+    except Exception as e:
+        current_app.logger.warning('Delta de captação não publicado: %s', e)
+
+def parse_ids(valor):
+    """Converte ?ids=1,2,3 no conjunto de ids acompanhados (None: todos)"""
+    if not valor:
+        return None
+    ids = {int(parte) for parte in valor.split(',') if parte.strip()}
+    if len(ids) > MAX_IDS:
+        raise ValueError(f'No máximo {MAX_IDS} ids por conexão')
+    return ids
+
+def consulta_estado(ids):
+    """Estado atual dos investimentos, enviado ao conectar para alinhar o cliente"""
+    return select(
+        Investment.id, Investment.valor_captado, Investment.valor_total, Investment.status
+    ).where(Investment.id.in_(ids))
+
+def deltas_iniciais(resultado):
+    return [delta(*linha) for linha in resultado]
+
+def evento_sse(deltas):
+    """Formata os deltas como um evento SSE "captacao" (lista JSON)"""
+    return f'event: captacao\ndata: {json.dumps(deltas, separators=(",", ":"))}\n\n'
@@ -0,0 +1,120 @@
+import base64
+import hashlib
+import json
+from functools import wraps
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity
+from app.services import kvstore
+
+# Chaves de idempotência (cabeçalho Idempotency-Key) para as rotas que movem
+# dinheiro: a primeira resposta é guardada e as repetições com a mesma chave
+# recebem a mesma resposta sem executar a rota de novo. Uma trava de curta
+# duração impede que duas tentativas simultâneas rodem em paralelo.
+DEFAULT_TTL = 24 * 3600
+DEFAULT_TTL_TRAVA = 60
+MAX_CHAVE = 255
+HEADER = 'Idempotency-Key'
+
+# Respostas que não são guardadas: erros do servidor e recusas temporárias
+# podem ter outro resultado na próxima tentativa
+NAO_GUARDAR = {409, 429}
+
+class IdempotenciaErro(Exception):
+    def __init__(self, mensagem, status_code):
+        super().__init__(mensagem)
+        self.status_code = status_code
+
+def chave(user_id, metodo, caminho, valor):
+    """Chave no store, por usuário e rota, sem expor o valor enviado pelo cliente"""
+    if not valor or len(valor) > MAX_CHAVE:
+        raise IdempotenciaErro(f'{HEADER} deve ter de 1 a {MAX_CHAVE} caracteres', 400)
+    resumo = hashlib.sha256(f'{metodo} {caminho} {valor}'.encode()).hexdigest()
+    return f'idem:{user_id}:{resumo}'
+
+def impressao(corpo):
+    return hashlib.sha256(corpo).hexdigest()
+
+def _ler(store, chave_store, impressao_pedido):
+    gravada = store.obter(chave_store)
+    if gravada is None:
+        return None
+    gravada = json.loads(gravada)
+    if gravada['impressao'] != impressao_pedido:
+        raise IdempotenciaErro(f'{HEADER} já usada com outro corpo de requisição', 422)
+    return gravada
+
+def iniciar(store, chave_store, impressao_pedido, ttl_trava=DEFAULT_TTL_TRAVA):
+    """Retorna a resposta gravada para a chave, ou None após travá-la para execução
+
+    Levanta IdempotenciaErro (409) se outra requisição com a mesma chave
+    ainda está em andamento, ou (422) se a chave veio com outro corpo.
+    """
+    gravada = _ler(store, chave_store, impressao_pedido)
+    if gravada is not None:
+        return gravada
+    if not store.reservar(f'{chave_store}:trava', ttl_trava):
+        raise IdempotenciaErro(f'Requisição com esta {HEADER} em andamento', 409)
+    try:
+        # A primeira tentativa pode ter terminado entre a leitura e a trava
+        gravada = _ler(store, chave_store, impressao_pedido)
+    except IdempotenciaErro:
+        store.remover(f'{chave_store}:trava')
+        raise
+    if gravada is not None:
+        store.remover(f'{chave_store}:trava')
+    return gravada
+
+def concluir(store, chave_store, impressao_pedido, status=None, content_type=None, corpo=b'', ttl=DEFAULT_TTL):
+    """Grava a resposta (quando cabível) e libera a trava; status None apenas libera"""
+    try:
+        if status is not None and status < 500 and status not in NAO_GUARDAR:
+            store.gravar(chave_store, json.dumps({
+                'impressao': impressao_pedido,
+                'status': status,
+                'content_type': content_type,
+                'corpo': base64.b64encode(corpo).decode(),
+            }).encode(), ttl)
+    finally:
+        store.remover(f'{chave_store}:trava')
+
+def corpo_gravado(gravada):
+    return base64.b64decode(gravada['corpo'])
+
+def idempotente(view):
+    """Repete a resposta guardada quando a requisição traz uma Idempotency-Key já usada"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        valor = request.headers.get(HEADER)
+        if valor is None:
+            return view(*args, **kwargs)
+
+        store = kvstore.obter_store()
+        try:
+            chave_store = chave(get_jwt_identity(), request.method, request.path, valor)
+            impressao_pedido = impressao(request.get_data())
+            gravada = iniciar(store, chave_store, impressao_pedido, current_app.config['IDEMPOTENCY_LOCK_TTL'])
+        except IdempotenciaErro as e:
+            return jsonify({'error': str(e)}), e.status_code
+        except kvstore.StoreIndisponivel as e:
+            current_app.logger.warning('%s ignorada: %s', HEADER, e)
+            return view(*args, **kwargs)
+
+        if gravada is not None:
+            return current_app.response_class(corpo_gravado(gravada), status=gravada['status'],
+                                              content_type=gravada['content_type'],
+                                              headers={'Idempotent-Replayed': 'true'})
+
+        resposta = None
+        try:
+            resposta = make_response(view(*args, **kwargs))
+            return resposta
+        finally:
+            try:
+                if resposta is None:
+                    concluir(store, chave_store, impressao_pedido)
+                else:
+                    concluir(store, chave_store, impressao_pedido, resposta.status_code, resposta.content_type,
+                             resposta.get_data(), current_app.config['IDEMPOTENCY_TTL'])
+            except kvstore.StoreIndisponivel as e:
+                current_app.logger.warning('Resposta idempotente não gravada: %s', e)
+    return wrapper
@@ -0,0 +1,167 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime
+from decimal import Decimal
+from flask import current_app, g, jsonify
+from flask_jwt_extended import get_current_user
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.models.user import User
+from app.models import db
+from app.services import ledger
+
+DEFAULT_TTL = 5
+MAX_USUARIOS = 10000
+
+@dataclass(frozen=True)
+class UsuarioAtual:
+    """Retrato somente leitura do usuário autenticado
+
+    O cache guarda apenas o perfil e ativo; saldo vem preenchido só em
+    current_user(), lido do razão a cada requisição.
+    """
+    id: int
+    cpf: str
+    email: str
+    nome: str
+    data_criacao: datetime
+    ativo: bool
+    versao: int = 0
+    saldo: Decimal = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'cpf': self.cpf,
+            'email': self.email,
+            'nome': self.nome,
+            'saldo': self.saldo,
+            'data_criacao': self.data_criacao,
+            'ativo': self.ativo
+        }
+
+COLUNAS = (User.id, User.cpf, User.email, User.nome, User.data_criacao, User.ativo)
+
+# Cache em processo: user_id -> (UsuarioAtual, expira_em). A versão de cada
+# usuário avança a cada invalidação, para que uma leitura feita antes de uma
+# alteração nunca seja guardada depois dela. A invalidação só alcança este
+# processo: nos demais workers e no CLI um perfil ou um ativo alterado vale
+# depois de no máximo IDENTITY_CACHE_TTL segundos, por isso o cache não
+# guarda o saldo, que não tolera esse atraso.
+_lock = threading.Lock()
+_usuarios = OrderedDict()
+_versoes = {}
+_geracao = 0
+
+def _ttl():
+    return current_app.config.get('IDENTITY_CACHE_TTL', DEFAULT_TTL)
+
+def invalidar(*user_ids):
+    """Descarta do cache os usuários informados (todos, se nenhum for informado)"""
+    global _geracao
+    with _lock:
+        if not user_ids:
+            _geracao += 1
+            _usuarios.clear()
+            return
+        for user_id in user_ids:
+            _versoes[user_id] = _versoes.get(user_id, 0) + 1
+            _usuarios.pop(user_id, None)
+
+def em_cache(user_id):
+    """(usuário em cache ou None, marca) — a marca vai para guardar() depois da consulta"""
+    agora = time.monotonic()
+    with _lock:
+        entrada = _usuarios.get(user_id)
+        if entrada and entrada[1] > agora:
+            _usuarios.move_to_end(user_id)
+            return entrada[0], None
+        return None, (user_id, _versoes.get(user_id, 0), _geracao)
+
+def guardar(linha, marca):
+    """Monta o usuário a partir de uma linha de COLUNAS e o guarda se nada mudou desde a marca"""
+    if linha is None:
+        return None
+    user_id, versao, geracao = marca
+    usuario = UsuarioAtual(
+        id=linha.id, cpf=linha.cpf, email=linha.email, nome=linha.nome,
+        data_criacao=linha.data_criacao, ativo=linha.ativo, versao=versao
+    )
+    expira_em = time.monotonic() + _ttl()
+    with _lock:
+        if _versoes.get(user_id, 0) == versao and _geracao == geracao:
+            _usuarios[user_id] = (usuario, expira_em)
+            _usuarios.move_to_end(user_id)
+            while len(_usuarios) > MAX_USUARIOS:
+                _usuarios.popitem(last=False)
+    return usuario
+
+def carregar(user_id):
+    """Carrega o usuário pelo cache de processo, consultando o banco em caso de falta"""
+    usuario, marca = em_cache(user_id)
+    if usuario is not None:
+        return usuario
+    return guardar(db.session.query(*COLUNAS).filter(User.id == user_id).first(), marca)
+
+def registrar(jwt):
+    """Faz o jwt_required carregar o usuário do token e recusar inexistentes e inativos"""
+
+    @jwt.user_lookup_loader
+    def _usuario_do_token(jwt_header, jwt_data):
+        usuario = carregar(int(jwt_data['sub']))
+        return usuario if usuario is not None and usuario.ativo else None
+
+    @jwt.user_lookup_error_loader
+    def _usuario_recusado(jwt_header, jwt_data):
+        return jsonify({'error': 'Usuário inativo ou inexistente'}), 401
+
+def current_user():
+    """Usuário ativo do JWT com o saldo atual do razão, carregado uma vez por requisição"""
+    if 'usuario_atual' not in g:
+        usuario = get_current_user()
+        g.usuario_atual = replace(usuario, saldo=ledger.saldo(usuario.id)) if usuario else None
+    return g.usuario_atual
+
+def _marcar(session, user_ids):
+    alterados = session.info.setdefault('identidades_alteradas', set())
+    if user_ids is None:
+        session.info['identidades_alteradas'] = None
+    elif alterados is not None:
+        alterados.update(user_ids)
+
+@event.listens_for(Session, 'before_flush')
+def _marcar_flush(session, flush_context, instances):
+    user_ids = [obj.id for obj in list(session.dirty) + list(session.deleted)
+                if isinstance(obj, User) and obj.id is not None]
+    if user_ids:
+        _marcar(session, user_ids)
+
+@event.listens_for(Session, 'do_orm_execute')
+def _marcar_execucao(orm_execute_state):
+    # UPDATEs em massa informam os usuários afetados por execution_options;
+    # sem essa informação, todo o cache é descartado
+    if orm_execute_state.is_select:
+        return
+    user_ids = orm_execute_state.execution_options.get('usuarios_afetados')
+    if user_ids is not None:
+        _marcar(orm_execute_state.session, user_ids)
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.class_ is User:
+        _marcar(orm_execute_state.session, None)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_apos_commit(session):
+    if 'identidades_alteradas' not in session.info:
+        return
+    user_ids = session.info.pop('identidades_alteradas')
+    if user_ids is None:
+        invalidar()
+    elif user_ids:
+        invalidar(*user_ids)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _descartar_marcacao(session, previous_transaction):
+    session.info.pop('identidades_alteradas', None)
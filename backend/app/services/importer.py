@@ -0,0 +1,149 @@
+import csv
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import insert
+from app.models.investment import Investment, InvestmentCategory, InvestmentStatus
+from app.models import db
+from app.services import catalog
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_ERROS = 1000
+
+FORMATOS = ('csv', 'jsonl')
+
+class LinhaInvalida(ValueError):
+    """Linha do arquivo de importação que não passa na validação"""
+
+def _decimal(valor, campo, obrigatorio=True):
+    if valor is None or valor == '':
+        if obrigatorio:
+            raise LinhaInvalida(f'Campo {campo} é obrigatório')
+        return None
+    try:
+        numero = Decimal(str(valor).replace(',', '.'))
+    except InvalidOperation:
+        raise LinhaInvalida(f'Campo {campo} inválido')
+    if not numero.is_finite() or numero < 0:
+        raise LinhaInvalida(f'Campo {campo} inválido')
+    return numero.quantize(Decimal('0.01'))
+
+def _bool(valor):
+    if isinstance(valor, bool):
+        return valor
+    if valor is None or str(valor).strip().lower() in ('', 'false', '0', 'nao', 'não'):
+        return False
+    if str(valor).strip().lower() in ('true', '1', 'sim'):
+        return True
+    raise LinhaInvalida('Campo isencao_ir inválido')
+
+def validar(linha):
+    """Valida e converte uma linha do arquivo para os valores de Investment"""
+    titulo = (linha.get('titulo') or '').strip()
+    if not titulo:
+        raise LinhaInvalida('Campo titulo é obrigatório')
+    if len(titulo) > 200:
+        raise LinhaInvalida('Campo titulo excede 200 caracteres')
+
+    try:
+        categoria = InvestmentCategory(linha.get('categoria'))
+    except ValueError:
+        raise LinhaInvalida('Categoria inválida')
+
+    try:
+        status = InvestmentStatus(linha.get('status') or InvestmentStatus.DISPONIVEL.value)
+    except ValueError:
+        raise LinhaInvalida('Status inválido')
+
+    try:
+        prazo = int(linha.get('prazo'))
+    except (TypeError, ValueError):
+        raise LinhaInvalida('Campo prazo inválido')
+    if prazo <= 0:
+        raise LinhaInvalida('Campo prazo deve ser positivo')
+
+    taxa_retorno = _decimal(linha.get('taxa_retorno'), 'taxa_retorno')
+    if taxa_retorno >= 1000:
+        raise LinhaInvalida('Campo taxa_retorno inválido')
+
+    data_vencimento = linha.get('data_vencimento') or None
+    if data_vencimento:
+        try:
+            data_vencimento = datetime.fromisoformat(data_vencimento)
+        except (TypeError, ValueError):
+            raise LinhaInvalida('Campo data_vencimento inválido')
+
+    return {
+        'titulo': titulo,
+        'descricao': linha.get('descricao') or None,
+        'categoria': categoria,
+        'valor_minimo': _decimal(linha.get('valor_minimo'), 'valor_minimo'),
+        'taxa_retorno': taxa_retorno,
+        'prazo': prazo,
+        'status': status,
+        'isencao_ir': _bool(linha.get('isencao_ir')),
+        'valor_total': _decimal(linha.get('valor_total'), 'valor_total', obrigatorio=False),
+        'valor_captado': Decimal('0'),
+        'data_criacao': datetime.utcnow(),
+        'data_vencimento': data_vencimento,
+    }
+
+def ler_linhas(arquivo, formato):
+    """Itera as linhas de um arquivo texto CSV (com cabeçalho) ou JSON lines"""
+    if formato == 'csv':
+        yield from csv.DictReader(arquivo)
+        return
+
+    for texto in arquivo:
+        texto = texto.strip()
+        if not texto:
+            continue
+        try:
+            linha = json.loads(texto)
+        except ValueError:
+            linha = None
+        yield linha if isinstance(linha, dict) else {'__erro__': 'JSON inválido'}
+
+def importar(arquivo, formato='csv', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Importa investimentos em lotes de INSERTs, com memória constante
+
+    Cada lote de chunk_size linhas válidas vira um único INSERT executemany,
+    confirmado na sequência. Linhas inválidas são reportadas com o número da
+    linha de dados (a partir de 1) e não interrompem a importação.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato inválido: {formato}')
+
+    resultado = {'inseridos': 0, 'rejeitados': 0, 'erros': []}
+    lote = []
+
+    def gravar():
+        # INSERT Core na tabela: um único executemany por lote, sem o
+        # agrupamento por colunas nulas do bulk insert do ORM
+        db.session.execute(insert(Investment.__table__), lote)
+        db.session.commit()
+        resultado['inseridos'] += len(lote)
+        lote.clear()
+
+    for numero, linha in enumerate(ler_linhas(arquivo, formato), start=1):
+        try:
+            if '__erro__' in linha:
+                raise LinhaInvalida(linha['__erro__'])
+            lote.append(validar(linha))
+        except LinhaInvalida as e:
+            resultado['rejeitados'] += 1
+            if len(resultado['erros']) < MAX_ERROS:
+                resultado['erros'].append({'linha': numero, 'erro': str(e)})
+            continue
+
+        if len(lote) >= chunk_size:
+            gravar()
+
+    if lote:
+        gravar()
+
+    # O INSERT direto na tabela não passa pelos eventos do ORM
+    if resultado['inseridos']:
+        catalog.invalidar()
+
+    return resultado
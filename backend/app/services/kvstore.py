@@ -0,0 +1,157 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlparse
+from flask import current_app
+
+try:
+    import redis
+except ImportError:  # backend Redis é opcional
+    redis = None
+
+MAX_CHAVES = 100000
+
+# Armazenamento chave-valor com expiração usado pelo rate limiting e pelas
+# chaves de idempotência. KV_STORE_URL=memory:// (padrão) guarda tudo no
+# processo, ou seja, por worker; redis://host:porta/db compartilha o estado
+# entre workers e aceita qualquer servidor compatível com o protocolo Redis.
+
+class StoreIndisponivel(Exception):
+    """Falha de comunicação com o store externo"""
+
+class MemoryStore:
+    """Store em processo, com expiração preguiçosa e limite de chaves (LRU)"""
+
+    def __init__(self, max_chaves=MAX_CHAVES):
+        self._lock = threading.Lock()
+        self._itens = OrderedDict()
+        self._max_chaves = max_chaves
+
+    def _vivo(self, chave, agora):
+        item = self._itens.get(chave)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= agora:
+            del self._itens[chave]
+            return None
+        self._itens.move_to_end(chave)
+        return item
+
+    def _guardar(self, chave, valor, ttl, agora):
+        self._itens[chave] = (valor, agora + ttl if ttl else None)
+        self._itens.move_to_end(chave)
+        while len(self._itens) > self._max_chaves:
+            self._itens.popitem(last=False)
+
+    def consumir(self, chave, capacidade, taxa):
+        """Retira uma ficha do balde; retorna 0 se permitido ou os segundos até a próxima ficha"""
+        agora = time.monotonic()
+        with self._lock:
+            item = self._vivo(chave, agora)
+            fichas, ultima = item[0] if item else (capacidade, agora)
+            fichas = min(capacidade, fichas + (agora - ultima) * taxa)
+            espera = 0.0
+            if fichas >= 1:
+                fichas -= 1
+            else:
+                espera = (1 - fichas) / taxa
+            self._guardar(chave, (fichas, agora), math.ceil(capacidade / taxa) + 1, agora)
+            return espera
+
+    def obter(self, chave):
+        with self._lock:
+            item = self._vivo(chave, time.monotonic())
+            return item[0] if item else None
+
+    def gravar(self, chave, valor, ttl):
+        with self._lock:
+            self._guardar(chave, valor, ttl, time.monotonic())
+
+    def reservar(self, chave, ttl):
+        """Grava a chave apenas se ela não existir (SET NX); retorna se conseguiu"""
+        agora = time.monotonic()
+        with self._lock:
+            if self._vivo(chave, agora) is not None:
+                return False
+            self._guardar(chave, b'1', ttl, agora)
+            return True
+
+    def remover(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+# Balde de fichas atômico no servidor: o estado (fichas, instante) fica em um
+# hash que expira quando o balde estaria cheio de novo
+_LUA_CONSUMIR = """
+local capacidade = tonumber(ARGV[1])
+local taxa = tonumber(ARGV[2])
+local agora = tonumber(ARGV[3])
+local estado = redis.call('HMGET', KEYS[1], 'fichas', 'ultima')
+local fichas = tonumber(estado[1]) or capacidade
+local ultima = tonumber(estado[2]) or agora
+fichas = math.min(capacidade, fichas + math.max(0, agora - ultima) * taxa)
+local espera = 0
+if fichas >= 1 then
+    fichas = fichas - 1
+else
+    espera = (1 - fichas) / taxa
+end
+redis.call('HSET', KEYS[1], 'fichas', tostring(fichas), 'ultima', tostring(agora))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacidade / taxa) + 1)
+return tostring(espera)
+"""
+
+def _traduzir_erros(metodo):
+    @wraps(metodo)
+    def wrapper(*args, **kwargs):
+        try:
+            return metodo(*args, **kwargs)
+        except redis.RedisError as e:
+            raise StoreIndisponivel(str(e)) from e
+    return wrapper
+
+class RedisStore:
+    """Store compartilhado entre workers em um servidor compatível com Redis"""
+
+    def __init__(self, url):
+        if redis is None:
+            raise RuntimeError('KV_STORE_URL aponta para Redis, mas o pacote redis não está instalado')
+        self._cliente = redis.Redis.from_url(url, socket_timeout=1, socket_connect_timeout=1)
+        self._consumir = self._cliente.register_script(_LUA_CONSUMIR)
+
+    @_traduzir_erros
+    def consumir(self, chave, capacidade, taxa):
+        return float(self._consumir(keys=[chave], args=[capacidade, taxa, time.time()]))
+
+    @_traduzir_erros
+    def obter(self, chave):
+        return self._cliente.get(chave)
+
+    @_traduzir_erros
+    def gravar(self, chave, valor, ttl):
+        self._cliente.set(chave, valor, ex=ttl)
+
+    @_traduzir_erros
+    def reservar(self, chave, ttl):
+        return bool(self._cliente.set(chave, b'1', ex=ttl, nx=True))
+
+    @_traduzir_erros
+    def remover(self, chave):
+        self._cliente.delete(chave)
+
+def criar(url):
+    """Store correspondente à URL (memory:// ou redis://, rediss://, unix://)"""
+    esquema = urlparse(url).scheme
+    if esquema == 'memory':
+        return MemoryStore()
+    if esquema in ('redis', 'rediss', 'unix'):
+        return RedisStore(url)
+    raise ValueError(f'KV_STORE_URL inválida: {url}')
+
+def init_app(app):
+    app.extensions['kvstore'] = criar(app.config['KV_STORE_URL'])
+
+def obter_store(app=None):
+    return (app or current_app).extensions['kvstore']
@@ -0,0 +1,233 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import func, insert, select, text
+from app.models.ledger import LedgerEntry, BalanceSnapshot
+from app.models.user import User
+from app.models import db
+
+# Contas de contrapartida do sistema
+CONTA_USUARIO = 'usuario'
+CONTA_PIX = 'caixa_pix'
+CONTA_INVESTIMENTOS = 'investimentos'
+
+DEFAULT_CHUNK_SIZE = 10000
+
+# Advisory lock do PostgreSQL (forma de duas chaves, que não se mistura com
+# as chaves de usuário de bloquear): compartilhado por quem lança, exclusivo
+# para consolidar
+TRAVA_RAZAO = (0x4C45, 0)
+
+# O saldo corrente é: users.saldo (saldo de abertura, não é mais alterado)
+# ou o último snapshot, mais a soma dos lançamentos posteriores a ele.
+
+def bloquear(user_id):
+    """Serializa débitos concorrentes do mesmo usuário até o fim da transação
+
+    No PostgreSQL usa um advisory lock, que não bloqueia a linha de users.
+    No SQLite, que só tem bloqueio do banco inteiro, abre a transação com
+    BEGIN IMMEDIATE: o pysqlite não inicia transação antes de SELECTs, e sem
+    isso a leitura do saldo ficaria fora da transação do débito.
+    """
+    conexao = db.session.connection()
+    dialeto = conexao.dialect.name
+    if dialeto == 'postgresql':
+        conexao.execute(text('SELECT pg_advisory_xact_lock(:chave)'), {'chave': user_id})
+    elif dialeto == 'sqlite':
+        iniciar_escrita()
+    else:
+        db.session.execute(select(User.id).where(User.id == user_id).with_for_update())
+
+def iniciar_escrita():
+    """No SQLite, abre a transação corrente com BEGIN IMMEDIATE (trava de escrita)
+
+    Leituras seguintes já ficam serializadas com os demais escritores; nos
+    outros bancos não faz nada, e quem chama usa os bloqueios de linha.
+    """
+    conexao = db.session.connection()
+    if conexao.dialect.name == 'sqlite' and not conexao.connection.dbapi_connection.in_transaction:
+        conexao.exec_driver_sql('BEGIN IMMEDIATE')
+
+def _base(user_ids, sessao):
+    """(saldo base, último lançamento coberto) por usuário: snapshot ou abertura"""
+    ultimos = select(
+        BalanceSnapshot.user_id, func.max(BalanceSnapshot.id).label('snapshot_id')
+    ).where(BalanceSnapshot.user_id.in_(user_ids)).group_by(BalanceSnapshot.user_id).subquery()
+
+    bases = {
+        user_id: (saldo, ultimo)
+        for user_id, saldo, ultimo in sessao.execute(
+            select(BalanceSnapshot.user_id, BalanceSnapshot.saldo, BalanceSnapshot.ultimo_lancamento_id)
+            .join(ultimos, BalanceSnapshot.id == ultimos.c.snapshot_id)
+        )
+    }
+
+    faltantes = [user_id for user_id in user_ids if user_id not in bases]
+    if faltantes:
+        for user_id, saldo in sessao.execute(
+            select(User.id, User.saldo).where(User.id.in_(faltantes))
+        ):
+            bases[user_id] = (saldo, 0)
+    return bases
+
+def saldos(user_ids, sessao=None):
+    """Saldos correntes de vários usuários; usuários inexistentes ficam de fora
+
+    sessao permite usar outra sessão que não db.session (ex.: a sessão
+    síncrona de uma AsyncSession, via run_sync, no modo ASGI).
+    """
+    sessao = sessao or db.session
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+
+    bases = _base(user_ids, sessao)
+    resultado = {user_id: saldo for user_id, (saldo, _) in bases.items()}
+
+    # Uma consulta por usuário usa o índice (user_id, id) a partir do snapshot
+    for user_id, (_, ultimo) in bases.items():
+        cauda = sessao.execute(
+            select(func.sum(LedgerEntry.valor))
+            .where(LedgerEntry.user_id == user_id, LedgerEntry.id > ultimo)
+        ).scalar()
+        if cauda:
+            resultado[user_id] += cauda
+    return resultado
+
+def saldo(user_id, sessao=None):
+    """Saldo corrente do usuário, ou None se ele não existir"""
+    return saldos([user_id], sessao).get(user_id)
+
+def lancar(postagens, data=None):
+    """Grava lançamentos de partidas dobradas, apenas com INSERTs
+
+    postagens é uma lista de (transaction_id, user_id, valor, contrapartida):
+    valor é creditado na conta do usuário e debitado da contrapartida.
+    """
+    if not postagens:
+        return
+    conexao = db.session.connection()
+    if conexao.dialect.name == 'postgresql':
+        # Mantido até o commit: consolidar espera os lançamentos em andamento
+        conexao.execute(text('SELECT pg_advisory_xact_lock_shared(:classe, :chave)'),
+                        dict(zip(('classe', 'chave'), TRAVA_RAZAO)))
+    data = data or datetime.utcnow()
+    pernas = []
+    for transaction_id, user_id, valor, contrapartida in postagens:
+        pernas.append({'transaction_id': transaction_id, 'conta': CONTA_USUARIO,
+                       'user_id': user_id, 'valor': valor, 'data_criacao': data})
+        pernas.append({'transaction_id': transaction_id, 'conta': contrapartida,
+                       'user_id': None, 'valor': -valor, 'data_criacao': data})
+
+    # INSERT Core na tabela: um único executemany, sem o INSERT por linha
+    # do bulk insert do ORM
+    db.session.execute(insert(LedgerEntry.__table__), pernas)
+
+def consolidar():
+    """Grava snapshots dos usuários com lançamentos novos desde o último
+
+    O limite é o maior id de lançamento visível com os escritores do razão
+    parados: no PostgreSQL sob o advisory lock exclusivo de TRAVA_RAZAO (que
+    espera o commit de todo lançar em andamento), no SQLite com a trava de
+    escrita do banco. Assim nenhum lançamento de id menor que o limite pode
+    confirmar depois do snapshot e ficar de fora dele.
+    Retorna o número de snapshots gravados.
+    """
+    conexao = db.session.connection()
+    if conexao.dialect.name == 'postgresql':
+        conexao.execute(text('SELECT pg_advisory_xact_lock(:classe, :chave)'),
+                        dict(zip(('classe', 'chave'), TRAVA_RAZAO)))
+    else:
+        iniciar_escrita()
+    limite = db.session.execute(select(func.max(LedgerEntry.id))).scalar()
+    if not limite:
+        db.session.commit()
+        return 0
+
+    ultimos = select(
+        BalanceSnapshot.user_id, func.max(BalanceSnapshot.id).label('snapshot_id')
+    ).group_by(BalanceSnapshot.user_id).subquery()
+    snapshots = select(
+        BalanceSnapshot.user_id, BalanceSnapshot.saldo, BalanceSnapshot.ultimo_lancamento_id
+    ).join(ultimos, BalanceSnapshot.id == ultimos.c.snapshot_id).subquery()
+
+    # Saldo base e cauda de cada usuário calculados em uma única consulta
+    linhas = db.session.execute(
+        select(
+            LedgerEntry.user_id,
+            func.coalesce(snapshots.c.saldo, User.saldo),
+            func.sum(LedgerEntry.valor),
+            func.max(LedgerEntry.id)
+        )
+        .join(User, User.id == LedgerEntry.user_id)
+        .outerjoin(snapshots, snapshots.c.user_id == LedgerEntry.user_id)
+        .where(
+            LedgerEntry.id > func.coalesce(snapshots.c.ultimo_lancamento_id, 0),
+            LedgerEntry.id <= limite
+        )
+        .group_by(LedgerEntry.user_id, snapshots.c.saldo, User.saldo)
+    ).all()
+
+    agora = datetime.utcnow()
+    novos = [
+        {'user_id': user_id, 'saldo': base + cauda, 'ultimo_lancamento_id': ultimo, 'data_criacao': agora}
+        for user_id, base, cauda, ultimo in linhas
+    ]
+    if novos:
+        db.session.execute(insert(BalanceSnapshot.__table__), novos)
+    db.session.commit()
+    return len(novos)
+
+def verificar(chunk_size=DEFAULT_CHUNK_SIZE):
+    """Reconstrói todos os saldos a partir do razão em uma única passada
+
+    Confere que as pernas de cada transação somam zero, que o saldo
+    reconstruído (abertura + todos os lançamentos) bate com o saldo servido
+    (snapshot + cauda) e que nenhum saldo ficou negativo.
+    """
+    ultimos = select(
+        BalanceSnapshot.user_id, func.max(BalanceSnapshot.id).label('snapshot_id')
+    ).group_by(BalanceSnapshot.user_id).subquery()
+    snapshots = {
+        user_id: (saldo, ultimo)
+        for user_id, saldo, ultimo in db.session.execute(
+            select(BalanceSnapshot.user_id, BalanceSnapshot.saldo, BalanceSnapshot.ultimo_lancamento_id)
+            .join(ultimos, BalanceSnapshot.id == ultimos.c.snapshot_id)
+        )
+    }
+
+    total = defaultdict(Decimal)
+    cauda = defaultdict(Decimal)
+    abertas = defaultdict(Decimal)
+    lancamentos = 0
+
+    resultado = db.session.execute(
+        select(LedgerEntry.transaction_id, LedgerEntry.user_id, LedgerEntry.valor, LedgerEntry.id)
+        .order_by(LedgerEntry.id)
+        .execution_options(yield_per=chunk_size)
+    )
+    for transaction_id, user_id, valor, lancamento_id in resultado:
+        lancamentos += 1
+        abertas[transaction_id] += valor
+        if not abertas[transaction_id]:
+            del abertas[transaction_id]
+        if user_id is not None:
+            total[user_id] += valor
+            if lancamento_id > snapshots.get(user_id, (None, 0))[1]:
+                cauda[user_id] += valor
+
+    divergencias = []
+    for user_id, abertura in db.session.execute(
+        select(User.id, User.saldo).execution_options(yield_per=chunk_size)
+    ):
+        reconstruido = abertura + total.get(user_id, Decimal('0'))
+        base = snapshots[user_id][0] if user_id in snapshots else abertura
+        servido = base + cauda.get(user_id, Decimal('0'))
+        if reconstruido != servido or reconstruido < 0:
+            divergencias.append({'user_id': user_id, 'reconstruido': reconstruido, 'servido': servido})
+
+    return {
+        'lancamentos': lancamentos,
+        'usuarios_divergentes': divergencias,
+        'transacoes_desbalanceadas': sorted(abertas),
+    }
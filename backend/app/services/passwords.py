@@ -0,0 +1,98 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, generate_password_hash, check_password_hash
+
+DEFAULT_METHOD = 'pbkdf2:sha256:600000'
+DEFAULT_WORKERS = 4
+DEFAULT_FILA = 64
+DEFAULT_TIMEOUT = 10
+
+class HashIndisponivel(Exception):
+    """Fila de hashing cheia ou tempo de espera esgotado"""
+
+# O hashlib libera o GIL durante o PBKDF2/scrypt, então um pool de threads
+# limita quantos hashes rodam ao mesmo tempo no processo. Quem chama continua
+# esperando o resultado: o pool limita a concorrência de CPU, não libera o
+# worker síncrono (no modo ASGI é o executor do event loop que faz isso).
+_executor = None
+_vagas = None
+_lock = threading.Lock()
+
+def _config(chave, padrao):
+    return current_app.config.get(chave, padrao)
+
+def _get_executor():
+    global _executor, _vagas
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                workers = _config('PASSWORD_HASH_WORKERS', DEFAULT_WORKERS)
+                _vagas = threading.BoundedSemaphore(workers + _config('PASSWORD_HASH_FILA', DEFAULT_FILA))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+    return _executor
+
+def executar(funcao, *args, **kwargs):
+    """Executa uma função de hashing no pool limitado e bloqueia até o resultado
+
+    Limita quantos hashes estão em andamento ou na fila, não libera a thread
+    de quem chama. A vaga só é devolvida quando o hash termina ou é
+    cancelado, então um tempo de espera esgotado não deixa trabalho
+    acumulando fora do limite.
+    """
+    executor = _get_executor()
+    timeout = _config('PASSWORD_HASH_TIMEOUT', DEFAULT_TIMEOUT)
+    if not _vagas.acquire(timeout=timeout):
+        raise HashIndisponivel('Serviço de autenticação ocupado, tente novamente')
+    try:
+        futuro = executor.submit(funcao, *args, **kwargs)
+    except BaseException:
+        _vagas.release()
+        raise
+    futuro.add_done_callback(lambda _: _vagas.release())
+    try:
+        return futuro.result(timeout=timeout)
+    except TimeoutError:
+        # Ainda na fila: cancela e a vaga volta agora; já rodando: volta ao terminar
+        futuro.cancel()
+        raise HashIndisponivel('Serviço de autenticação ocupado, tente novamente')
+
+def metodo():
+    """Algoritmo e custo configurados, no formato do Werkzeug (ex.: pbkdf2:sha256:600000)"""
+    return _config('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+
+def gerar_hash(senha):
+    return executar(generate_password_hash, senha, method=metodo())
+
+def prefixo(metodo):
+    """Prefixo que o Werkzeug grava no hash para o método configurado
+
+    O Werkzeug completa os parâmetros omitidos (scrypt vira scrypt:32768:8:1,
+    pbkdf2 vira pbkdf2:sha256:<iterações padrão>), então o método só pode ser
+    comparado com o hash depois de completado da mesma forma.
+    """
+    nome, *args = metodo.split(':')
+    if nome == 'scrypt' and not args:
+        return f'scrypt:{2 ** 15}:8:1'
+    if nome == 'pbkdf2' and len(args) < 2:
+        return f"pbkdf2:{args[0] if args else 'sha256'}:{DEFAULT_PBKDF2_ITERATIONS}"
+    return metodo
+
+def precisa_rehash(senha_hash):
+    """Indica se o hash foi gerado com parâmetros diferentes dos configurados"""
+    return senha_hash.split('$', 1)[0] != prefixo(metodo())
+
+def definir_senha(user, senha):
+    """Define a senha do usuário com o algoritmo e o custo configurados"""
+    user.senha_hash = gerar_hash(senha)
+
+def verificar_senha(user, senha):
+    """Confere a senha e, se correta, refaz o hash quando os parâmetros mudaram
+
+    O novo hash é apenas atribuído ao usuário; cabe a quem chama fazer o commit.
+    """
+    if not executar(check_password_hash, user.senha_hash, senha):
+        return False
+    if precisa_rehash(user.senha_hash):
+        definir_senha(user, senha)
+    return True
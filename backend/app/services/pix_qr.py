@@ -0,0 +1,108 @@
+import base64
+import hashlib
+import io
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from flask import current_app
+
+# Dados bancários simulados
+DADOS_BANCARIOS = {
+    'favorecido': 'PeerBR Investimentos LTDA',
+    'cnpj': '12.345.678/0001-90',
+    'banco': '341 - Itaú Unibanco S.A.',
+    'agencia': '1234',
+    'conta': '12345-6',
+    'chave_pix': 'pix@peerbr.com.br'
+}
+
+# Formatos suportados: extensão -> mimetype
+FORMATOS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',  # Vetorial: escala sem perda e dispensa o Pillow
+}
+
+DEFAULT_WORKERS = 2
+DEFAULT_TIMEOUT = 5
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def montar_payload(valor):
+    """Monta a string PIX (copia e cola) codificada no QR Code (simulado)"""
+    return (
+        f"00020126580014BR.GOV.BCB.PIX0136{DADOS_BANCARIOS['chave_pix']}"
+        f"520400005303986540{valor:.2f}5802BR5925{DADOS_BANCARIOS['favorecido']}"
+        f"6009SAO PAULO62070503***6304"
+    )
+
+def is_payload(valor):
+    """Indica se o conteúdo salvo é um payload PIX e não um PNG legado em base64"""
+    return bool(valor) and valor.startswith('000201')
+
+def digest(payload):
+    """Endereço de conteúdo do QR Code: muda sempre que o payload muda"""
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+def render(payload, formato='png'):
+    """Renderiza o QR Code do payload; executado nos processos do pool"""
+    # qrcode (e o Pillow, para PNG) só é importado na primeira renderização
+    import qrcode
+    import qrcode.image.svg
+
+    if formato == 'svg':
+        img = qrcode.make(payload, image_factory=qrcode.image.svg.SvgPathImage, box_size=10, border=5)
+    else:
+        qr = qrcode.QRCode(version=1, box_size=10, border=5)
+        qr.add_data(payload)
+        qr.make(fit=True)
+        img = qr.make_image(fill_color="black", back_color="white")
+
+    buffer = io.BytesIO()
+    if formato == 'svg':
+        img.save(buffer)
+    else:
+        img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+def _get_executor(workers):
+    global _executor
+    # Criado sob demanda para que cada worker do gunicorn tenha o seu pool após o fork
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor(max_workers=workers)
+    return _executor
+
+@lru_cache(maxsize=1024)
+def _render_cached(payload, formato, workers, timeout):
+    if workers <= 0:
+        return render(payload, formato)
+    return _get_executor(workers).submit(render, payload, formato).result(timeout=timeout)
+
+def gerar_qr_code(payload, formato='png'):
+    """Retorna os bytes do QR Code, usando o cache LRU e o pool de processos
+
+    Configurável por PIX_QR_WORKERS (0 renderiza no próprio processo) e
+    PIX_QR_TIMEOUT (segundos de espera pelo pool).
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f'Formato inválido: {formato}')
+
+    workers = current_app.config.get('PIX_QR_WORKERS', DEFAULT_WORKERS)
+    timeout = current_app.config.get('PIX_QR_TIMEOUT', DEFAULT_TIMEOUT)
+    return _render_cached(payload, formato, workers, timeout)
+
+def imagem(conteudo, digest_pedido, formato):
+    """Bytes da imagem de uma transação PIX, ou None se o endereço não confere
+
+    conteudo é o pix_qr_code salvo: o payload, ou o PNG em base64 das
+    transações antigas (servido apenas como png).
+    """
+    if is_payload(conteudo):
+        if digest(conteudo) != digest_pedido:
+            return None
+        return gerar_qr_code(conteudo, formato)
+    if formato == 'png' and digest(conteudo) == digest_pedido:
+        return base64.b64decode(conteudo)
+    return None
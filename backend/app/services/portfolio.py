@@ -0,0 +1,171 @@
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.investment import Investment, UserInvestment
+from app.models.portfolio import PortfolioSummary
+from app.models import db
+
+# Faixas da escada de vencimentos: (rótulo, meses até o vencimento, exclusivo)
+FAIXAS_VENCIMENTO = [
+    ('vencidos', 0),
+    ('ate_3_meses', 3),
+    ('3_a_6_meses', 6),
+    ('6_a_12_meses', 12),
+    ('1_a_2_anos', 24),
+    ('acima_de_2_anos', None),
+]
+
+CENTAVOS = Decimal('0.01')
+
+def adicionar_meses(data, meses):
+    """Soma meses a uma data, retornando o primeiro dia do mês resultante"""
+    total = data.year * 12 + data.month - 1 + meses
+    return date(total // 12, total % 12 + 1, 1)
+
+def mes_vencimento(investment, data_aplicacao):
+    """Mês de vencimento da aplicação: data_vencimento do ativo ou aplicação + prazo"""
+    if investment.data_vencimento:
+        return adicionar_meses(investment.data_vencimento, 0)
+    return adicionar_meses(data_aplicacao, investment.prazo)
+
+def rendimento_projetado(valor, taxa_retorno, prazo):
+    """Rendimento bruto no vencimento, com capitalização anual composta"""
+    fator = (1 + Decimal(taxa_retorno) / 100) ** (Decimal(prazo) / 12)
+    return (Decimal(valor) * (fator - 1)).quantize(CENTAVOS)
+
+def registrar_aplicacao(user_id, investment, valor, data_aplicacao=None):
+    """Acumula uma aplicação no agregado da carteira, na transação corrente"""
+    valores = {
+        'user_id': user_id,
+        'categoria': investment.categoria,
+        'mes_vencimento': mes_vencimento(investment, data_aplicacao or datetime.utcnow()),
+        'quantidade': 1,
+        'valor_aplicado': valor,
+        'valor_taxa': valor * investment.taxa_retorno,
+        'rendimento_projetado': rendimento_projetado(valor, investment.taxa_retorno, investment.prazo),
+        'data_atualizacao': datetime.utcnow(),
+    }
+    _acumular(valores)
+
+def _acumular(valores):
+    incrementos = {
+        'quantidade': PortfolioSummary.quantidade + valores['quantidade'],
+        'valor_aplicado': PortfolioSummary.valor_aplicado + valores['valor_aplicado'],
+        'valor_taxa': PortfolioSummary.valor_taxa + valores['valor_taxa'],
+        'rendimento_projetado': PortfolioSummary.rendimento_projetado + valores['rendimento_projetado'],
+        'data_atualizacao': valores['data_atualizacao'],
+    }
+    dialeto = db.session.get_bind().dialect.name
+
+    if dialeto in ('postgresql', 'sqlite'):
+        dialect_insert = postgresql.insert if dialeto == 'postgresql' else sqlite.insert
+        stmt = dialect_insert(PortfolioSummary).values(**valores).on_conflict_do_update(
+            index_elements=['user_id', 'categoria', 'mes_vencimento'],
+            set_=incrementos
+        )
+        db.session.execute(stmt)
+        return
+
+    # Demais bancos: UPDATE e, se a linha ainda não existir, INSERT
+    resultado = db.session.execute(
+        update(PortfolioSummary)
+        .where(
+            PortfolioSummary.user_id == valores['user_id'],
+            PortfolioSummary.categoria == valores['categoria'],
+            PortfolioSummary.mes_vencimento == valores['mes_vencimento']
+        )
+        .values(**incrementos)
+        .execution_options(synchronize_session=False)
+    )
+    if resultado.rowcount == 0:
+        db.session.execute(insert(PortfolioSummary).values(**valores))
+
+def _faixa(mes, hoje):
+    meses = (mes.year - hoje.year) * 12 + mes.month - hoje.month
+    for rotulo, limite in FAIXAS_VENCIMENTO:
+        if limite is None or meses < limite:
+            return rotulo
+
+def resumo(user_id, hoje=None):
+    """Resumo da carteira: totais por categoria, taxa média ponderada,
+    escada de vencimentos e rendimento projetado"""
+    hoje = hoje or date.today()
+    linhas = PortfolioSummary.query.filter_by(user_id=user_id).all()
+
+    categorias = defaultdict(lambda: defaultdict(Decimal))
+    faixas = {rotulo: Decimal('0') for rotulo, _ in FAIXAS_VENCIMENTO}
+
+    for linha in linhas:
+        categoria = categorias[linha.categoria.value]
+        categoria['quantidade'] += linha.quantidade
+        categoria['valor_aplicado'] += linha.valor_aplicado
+        categoria['valor_taxa'] += linha.valor_taxa
+        categoria['rendimento_projetado'] += linha.rendimento_projetado
+        faixas[_faixa(linha.mes_vencimento, hoje)] += linha.valor_aplicado
+
+    total = sum((c['valor_aplicado'] for c in categorias.values()), Decimal('0'))
+    total_taxa = sum((c['valor_taxa'] for c in categorias.values()), Decimal('0'))
+
+    def taxa_media(valor_taxa, valor_aplicado):
+        return float(valor_taxa / valor_aplicado) if valor_aplicado else 0.0
+
+    return {
+        'total_aplicado': float(total),
+        'quantidade': int(sum(c['quantidade'] for c in categorias.values())),
+        'taxa_media_ponderada': round(taxa_media(total_taxa, total), 4),
+        'rendimento_projetado': float(sum((c['rendimento_projetado'] for c in categorias.values()), Decimal('0'))),
+        'categorias': [
+            {
+                'categoria': nome,
+                'quantidade': int(c['quantidade']),
+                'valor_aplicado': float(c['valor_aplicado']),
+                'percentual': round(float(c['valor_aplicado'] / total * 100), 2) if total else 0.0,
+                'taxa_media_ponderada': round(taxa_media(c['valor_taxa'], c['valor_aplicado']), 4),
+                'rendimento_projetado': float(c['rendimento_projetado'])
+            }
+            for nome, c in sorted(categorias.items(), key=lambda item: -item[1]['valor_aplicado'])
+        ],
+        'vencimentos': [
+            {'faixa': rotulo, 'valor_aplicado': float(faixas[rotulo])}
+            for rotulo, _ in FAIXAS_VENCIMENTO
+        ]
+    }
+
+def reconstruir(user_id=None, chunk_size=1000):
+    """Recalcula o agregado a partir de user_investments em uma única passada
+
+    Usado para popular a tabela em bases existentes ou corrigir divergências.
+    Retorna o número de aplicações processadas.
+    """
+    remocao = delete(PortfolioSummary)
+    query = db.session.query(UserInvestment, Investment).join(
+        Investment, UserInvestment.investment_id == Investment.id
+    )
+    if user_id is not None:
+        remocao = remocao.where(PortfolioSummary.user_id == user_id)
+        query = query.filter(UserInvestment.user_id == user_id)
+
+    agregados = {}
+    processadas = 0
+    for user_inv, investment in query.yield_per(chunk_size):
+        chave = (user_inv.user_id, investment.categoria, mes_vencimento(investment, user_inv.data_aplicacao))
+        linha = agregados.setdefault(chave, {
+            'user_id': chave[0], 'categoria': chave[1], 'mes_vencimento': chave[2],
+            'quantidade': 0, 'valor_aplicado': Decimal('0'), 'valor_taxa': Decimal('0'),
+            'rendimento_projetado': Decimal('0'), 'data_atualizacao': datetime.utcnow()
+        })
+        linha['quantidade'] += 1
+        linha['valor_aplicado'] += user_inv.valor_aplicado
+        linha['valor_taxa'] += user_inv.valor_aplicado * investment.taxa_retorno
+        linha['rendimento_projetado'] += rendimento_projetado(
+            user_inv.valor_aplicado, investment.taxa_retorno, investment.prazo
+        )
+        processadas += 1
+
+    db.session.execute(remocao)
+    if agregados:
+        db.session.execute(insert(PortfolioSummary), list(agregados.values()))
+    db.session.commit()
+    return processadas
@@ -0,0 +1,170 @@
+from datetime import datetime
+import numpy as np
+from app.models.investment import Investment, UserInvestment
+from app.models import db
+
+# Tabela regressiva do IR sobre renda fixa: dias de aplicação (inclusive) -> alíquota
+IR_LIMITES_DIAS = np.array([180, 360, 720])
+IR_ALIQUOTAS = np.array([0.225, 0.20, 0.175, 0.15])
+
+DIAS_POR_MES = 365.0 / 12
+
+DEFAULT_CHUNK_SIZE = 65536
+MAX_MESES = 600
+
+def aliquota_ir(dias, isento):
+    """Alíquota regressiva de IR por posição (zero para ativos isentos)"""
+    aliquotas = IR_ALIQUOTAS[np.searchsorted(IR_LIMITES_DIAS, dias, side='left')]
+    return np.where(isento, 0.0, aliquotas)
+
+def data_vencimento(data_aplicacao, prazo):
+    """Soma prazo (meses) a datas datetime64[D], limitando ao último dia do mês"""
+    mes_inicial = data_aplicacao.astype('datetime64[M]')
+    dia = (data_aplicacao - mes_inicial.astype('datetime64[D]')).astype(np.int64)
+    mes_final = mes_inicial + prazo.astype('timedelta64[M]')
+    dias_no_mes = ((mes_final + 1).astype('datetime64[D]') - mes_final.astype('datetime64[D]')).astype(np.int64)
+    return mes_final.astype('datetime64[D]') + np.minimum(dia, dias_no_mes - 1).astype('timedelta64[D]')
+
+def meses_completos(inicio, fim):
+    """Meses inteiros de inicio até fim (datetime64[D]), zero se fim vier antes"""
+    meses = (fim.astype('datetime64[M]') - inicio.astype('datetime64[M]')).astype(np.int64)
+    dia_inicio = (inicio - inicio.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64)
+    dia_fim = (fim - fim.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64)
+    return np.maximum(meses - (dia_fim < dia_inicio), 0)
+
+def projetar(valor, taxa_retorno, prazo, isencao_ir, data_aplicacao=None, meses=None,
+             vencimento=None, chunk_size=DEFAULT_CHUNK_SIZE, hoje=None):
+    """Projeta um conjunto de posições de uma só vez com operações vetoriais
+
+    Recebe arrays paralelos (valor aplicado, taxa anual em %, prazo em meses,
+    isenção de IR, data de aplicação e, opcionalmente, a data de vencimento
+    do ativo, com NaT onde ela não existir) e retorna, por posição, o vencimento,
+    os valores brutos e líquidos no vencimento e, para a carteira inteira, a
+    curva mensal do valor acumulado bruto e líquido. O mês 0 da curva é hoje:
+    cada posição entra com os meses já decorridos desde a aplicação e as
+    vencidas ficam estáveis no valor líquido de vencimento. A curva é
+    calculada em blocos de chunk_size posições para manter a memória limitada.
+    """
+    valor = np.asarray(valor, dtype=np.float64)
+    taxa = np.asarray(taxa_retorno, dtype=np.float64) / 100
+    prazo = np.asarray(prazo, dtype=np.int64)
+    isento = np.asarray(isencao_ir, dtype=bool)
+
+    hoje = np.datetime64(hoje or datetime.utcnow().date(), 'D')
+    if data_aplicacao is None:
+        data_aplicacao = np.full(valor.shape, hoje)
+    else:
+        data_aplicacao = np.asarray(data_aplicacao, dtype='datetime64[D]')
+
+    if vencimento is None:
+        vencimento = data_vencimento(data_aplicacao, prazo)
+    else:
+        # Ativos com vencimento definido contam o prazo até essa data
+        vencimento = np.asarray(vencimento, dtype='datetime64[D]')
+        sem_vencimento = np.isnat(vencimento)
+        vencimento = np.where(sem_vencimento, data_vencimento(data_aplicacao, prazo), vencimento)
+        prazo = np.where(
+            sem_vencimento,
+            prazo,
+            np.maximum((vencimento.astype('datetime64[M]') - data_aplicacao.astype('datetime64[M]')).astype(np.int64), 0)
+        )
+    dias = (vencimento - data_aplicacao).astype(np.int64)
+
+    # Capitalização anual composta, proporcional ao prazo em meses
+    crescimento = np.log1p(taxa) / 12
+    valor_bruto = valor * np.exp(crescimento * prazo)
+    rendimento_bruto = valor_bruto - valor
+    aliquota = aliquota_ir(dias, isento)
+    imposto = rendimento_bruto * aliquota
+    rendimento_liquido = rendimento_bruto - imposto
+
+    # Meses de cada posição já decorridos até hoje
+    passados = np.minimum(meses_completos(data_aplicacao, np.full(data_aplicacao.shape, hoje)), prazo)
+
+    if meses is None:
+        meses = int((prazo - passados).max()) if prazo.size else 0
+    meses = min(meses, MAX_MESES)
+
+    curva_bruta = np.zeros(meses + 1)
+    curva_liquida = np.zeros(meses + 1)
+    passos = np.arange(meses + 1)
+
+    for inicio in range(0, valor.size, chunk_size):
+        fim = inicio + chunk_size
+        # Matriz (posições x meses) contada desde a aplicação; após o
+        # vencimento o valor fica estável, com o IR pelos dias reais do prazo
+        decorrido = np.clip(passos[np.newaxis, :] + passados[inicio:fim, np.newaxis], 0,
+                            prazo[inicio:fim, np.newaxis])
+        acumulado = valor[inicio:fim, np.newaxis] * np.exp(crescimento[inicio:fim, np.newaxis] * decorrido)
+        ganho = acumulado - valor[inicio:fim, np.newaxis]
+        dias_mes = np.where(decorrido == prazo[inicio:fim, np.newaxis], dias[inicio:fim, np.newaxis],
+                            np.rint(decorrido * DIAS_POR_MES))
+        aliquota_mes = aliquota_ir(dias_mes, isento[inicio:fim, np.newaxis])
+        curva_bruta += acumulado.sum(axis=0)
+        curva_liquida += (acumulado - ganho * aliquota_mes).sum(axis=0)
+
+    return {
+        'data_vencimento': vencimento,
+        'dias': dias,
+        'valor_bruto': valor_bruto,
+        'rendimento_bruto': rendimento_bruto,
+        'aliquota_ir': aliquota,
+        'imposto': imposto,
+        'rendimento_liquido': rendimento_liquido,
+        'valor_liquido': valor + rendimento_liquido,
+        'curva_bruta': curva_bruta,
+        'curva_liquida': curva_liquida,
+    }
+
+def _colunas(linhas, quantidade, hoje):
+    valor = np.empty(quantidade)
+    taxa = np.empty(quantidade)
+    prazo = np.empty(quantidade, dtype=np.int64)
+    isento = np.empty(quantidade, dtype=bool)
+    data = np.empty(quantidade, dtype='datetime64[D]')
+    vencimento = np.full(quantidade, np.datetime64('NaT'), dtype='datetime64[D]')
+    for i, (v, t, p, ir, d, venc) in enumerate(linhas):
+        valor[i], taxa[i], prazo[i], isento[i] = v, t, p, bool(ir)
+        data[i] = np.datetime64(d.date() if d else hoje, 'D')
+        if venc:
+            vencimento[i] = np.datetime64(venc.date(), 'D')
+    return dict(valor=valor, taxa_retorno=taxa, prazo=prazo, isencao_ir=isento,
+                data_aplicacao=data, vencimento=vencimento)
+
+def projetar_carteira(user_id=None, meses=None, hoje=None):
+    """Projeta as aplicações de um usuário (ou de todos, se user_id for None)
+
+    Lê apenas as colunas necessárias, sem hidratar objetos do ORM.
+    Retorna (ids das aplicações, projeção).
+    """
+    query = db.session.query(
+        UserInvestment.id, UserInvestment.valor_aplicado, Investment.taxa_retorno,
+        Investment.prazo, Investment.isencao_ir, UserInvestment.data_aplicacao,
+        Investment.data_vencimento
+    ).join(Investment, UserInvestment.investment_id == Investment.id)
+    if user_id is not None:
+        query = query.filter(UserInvestment.user_id == user_id)
+
+    linhas = query.all()
+    ids = np.array([linha[0] for linha in linhas], dtype=np.int64)
+    hoje = hoje or datetime.utcnow().date()
+    colunas = _colunas((linha[1:] for linha in linhas), len(linhas), hoje)
+    return ids, projetar(**colunas, meses=meses, hoje=hoje)
+
+def projetar_catalogo(valor=1000, meses=None):
+    """Simula a aplicação de um mesmo valor em todo o catálogo de investimentos
+
+    Retorna (ids dos investimentos, projeção).
+    """
+    linhas = db.session.query(
+        Investment.id, Investment.taxa_retorno, Investment.prazo, Investment.isencao_ir
+    ).all()
+    ids = np.array([linha[0] for linha in linhas], dtype=np.int64)
+    quantidade = len(linhas)
+    return ids, projetar(
+        np.full(quantidade, float(valor)),
+        np.array([float(linha[1]) for linha in linhas]),
+        np.array([linha[2] for linha in linhas], dtype=np.int64),
+        np.array([bool(linha[3]) for linha in linhas]),
+        meses=meses
+    )
@@ -0,0 +1,56 @@
+import math
+from functools import lru_cache, wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from app.services import kvstore
+
+# Balde de fichas por rota, em dois escopos: o usuário do JWT e o IP de
+# origem. Os limites têm o formato "capacidade/segundos" (ex.: 30/60 permite
+# rajadas de 30 requisições e repõe 30 fichas a cada minuto).
+DEFAULT_LIMITE_USUARIO = '30/60'
+DEFAULT_LIMITE_IP = '120/60'
+
+@lru_cache(maxsize=None)
+def parse_limite(limite):
+    """Converte "capacidade/segundos" em (capacidade, fichas por segundo)"""
+    capacidade, periodo = limite.split('/')
+    capacidade, periodo = int(capacidade), float(periodo)
+    if capacidade <= 0 or periodo <= 0:
+        raise ValueError(f'Limite inválido: {limite}')
+    return capacidade, capacidade / periodo
+
+def consumir(store, config, endpoint, user_id, ip):
+    """Retira uma ficha dos baldes do IP e do usuário
+
+    Retorna 0 quando a requisição pode seguir, ou os segundos de espera.
+    """
+    baldes = [(f'rl:{endpoint}:ip:{ip}', config['RATE_LIMIT_IP'])]
+    if user_id is not None:
+        baldes.append((f'rl:{endpoint}:u:{user_id}', config['RATE_LIMIT_USER']))
+    for chave, limite in baldes:
+        espera = store.consumir(chave, *parse_limite(limite))
+        if espera:
+            return espera
+    return 0
+
+def resposta_excedida(espera):
+    return {'error': 'Muitas requisições, tente novamente em instantes'}, {'Retry-After': str(math.ceil(espera))}
+
+def limitar(view):
+    """Aplica o rate limiting à rota (depois de jwt_required); 429 com Retry-After ao exceder"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        config = current_app.config
+        if config['RATE_LIMIT_ENABLED']:
+            try:
+                espera = consumir(kvstore.obter_store(), config, request.endpoint,
+                                  get_jwt_identity(), request.remote_addr)
+            except kvstore.StoreIndisponivel as e:
+                # Sem o store a rota continua disponível, apenas sem limite
+                current_app.logger.warning('Rate limiting desativado: %s', e)
+                espera = 0
+            if espera:
+                corpo, headers = resposta_excedida(espera)
+                return jsonify(corpo), 429, headers
+        return view(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,55 @@
+import re
+from sqlalchemy import Float, Integer, column, func, literal_column, table
+from app.models.investment import Investment
+
+MAX_TERMOS = 8
+CONFIG_PG = 'portuguese_unaccent'
+
+# Peso do título em relação à descrição no bm25 do SQLite; no PostgreSQL o
+# mesmo papel é feito pelos pesos A/B do tsvector (migração v0003)
+PESO_TITULO = 10.0
+
+# Busca textual sobre título e descrição do catálogo. O texto digitado vira
+# uma consulta de termos com E implícito e o último termo como prefixo
+# ("debent" já encontra "Debêntures"), montada aqui a partir de palavras
+# extraídas do texto: nenhum operador da sintaxe de FTS5 ou tsquery passa.
+
+_investments_fts = table('investments_fts', column('rowid', Integer))
+
+class BuscaIndisponivel(Exception):
+    """Banco sem índice de busca textual"""
+
+def termos(texto):
+    """Palavras do texto de busca, no máximo MAX_TERMOS"""
+    palavras = re.findall(r'\w+', texto or '')
+    if not palavras:
+        raise ValueError('Informe o texto da busca')
+    return palavras[:MAX_TERMOS]
+
+def _consulta_fts5(palavras):
+    return ' '.join(f'"{p}"' for p in palavras[:-1]) + f' "{palavras[-1]}"*'
+
+def _consulta_tsquery(palavras):
+    return ' & '.join(palavras[:-1] + [f'{palavras[-1]}:*'])
+
+def aplicar(query, texto, dialeto):
+    """Restringe a consulta de investimentos aos que correspondem ao texto
+
+    Retorna (consulta, relevância), com a relevância como expressão em que
+    valores maiores indicam maior relevância nos dois bancos.
+    """
+    palavras = termos(texto)
+
+    if dialeto == 'sqlite':
+        fts = literal_column('investments_fts')
+        query = query.join(_investments_fts, _investments_fts.c.rowid == Investment.id) \
+            .filter(fts.op('MATCH')(_consulta_fts5(palavras)))
+        # bm25 é menor para documentos mais relevantes
+        return query, -func.bm25(fts, PESO_TITULO, 1.0, type_=Float)
+
+    if dialeto == 'postgresql':
+        busca = literal_column('investments.busca')
+        consulta = func.to_tsquery(CONFIG_PG, _consulta_tsquery(palavras))
+        return query.filter(busca.op('@@')(consulta)), func.ts_rank_cd(busca, consulta, type_=Float)
+
+    raise BuscaIndisponivel(f'Busca textual não suportada para {dialeto}')
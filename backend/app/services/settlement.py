@@ -0,0 +1,121 @@
+import csv
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import select, update
+from app.models.user import Transaction, TransactionType, TransactionStatus
+from app.models import db
+from app.services import ledger
+
+DEFAULT_BATCH_SIZE = 500
+
+FORMATOS = ('csv', 'jsonl')
+
+def lancamento(registro):
+    """Normaliza um lançamento do extrato ou do webhook para (pix_id, valor)"""
+    pix_id = registro.get('pix_id') or registro.get('txid')
+    try:
+        valor = Decimal(str(registro.get('valor'))).quantize(Decimal('0.01'))
+    except (InvalidOperation, ValueError):
+        valor = None
+    return pix_id, valor
+
+def ler_extrato(arquivo, formato):
+    """Itera os lançamentos de um extrato CSV (pix_id,valor) ou JSON lines"""
+    if formato == 'csv':
+        for registro in csv.DictReader(arquivo):
+            yield lancamento(registro)
+        return
+
+    for texto in arquivo:
+        texto = texto.strip()
+        if texto:
+            yield lancamento(json.loads(texto))
+
+def _novo_relatorio():
+    return {
+        'liquidados': 0,
+        'valor_liquidado': Decimal('0'),
+        'ja_liquidados': 0,
+        'nao_encontrados': 0,
+        'divergentes': 0,
+        'invalidos': 0,
+    }
+
+def liquidar_lote(lancamentos, relatorio=None):
+    """Liquida um lote de depósitos PIX em uma única transação
+
+    Os depósitos pendentes são localizados pelo índice de pix_id, aprovados
+    com um UPDATE condicional (status ainda PENDENTE) e os créditos viram
+    lançamentos no razão gravados em um único INSERT, apenas para os ids que
+    o UPDATE retornou. Lançamentos repetidos ou já liquidados são ignorados,
+    o que torna o reprocessamento idempotente mesmo com lotes concorrentes.
+    """
+    relatorio = relatorio if relatorio is not None else _novo_relatorio()
+
+    esperados = {}
+    for pix_id, valor in lancamentos:
+        if not pix_id or valor is None:
+            relatorio['invalidos'] += 1
+        elif pix_id in esperados:
+            relatorio['ja_liquidados'] += 1
+        else:
+            esperados[pix_id] = valor
+
+    if not esperados:
+        return relatorio
+
+    # No SQLite o with_for_update não bloqueia nada: a trava de escrita vem antes da leitura
+    ledger.iniciar_escrita()
+    pendentes = db.session.execute(
+        select(Transaction.id, Transaction.user_id, Transaction.valor, Transaction.pix_id, Transaction.status)
+        .where(Transaction.pix_id.in_(list(esperados)), Transaction.tipo == TransactionType.DEPOSITO)
+        .with_for_update()
+    ).all()
+
+    encontrados = set()
+    candidatos = {}
+    for transaction_id, user_id, valor, pix_id, status in pendentes:
+        encontrados.add(pix_id)
+        if status != TransactionStatus.PENDENTE:
+            relatorio['ja_liquidados'] += 1
+        elif valor != esperados[pix_id]:
+            relatorio['divergentes'] += 1
+        else:
+            candidatos[transaction_id] = (user_id, valor)
+
+    relatorio['nao_encontrados'] += len(esperados) - len(encontrados)
+
+    postagens = []
+    if candidatos:
+        # Só os depósitos que este UPDATE de fato aprovou viram crédito no razão
+        aprovados = db.session.execute(
+            update(Transaction)
+            .where(Transaction.id.in_(list(candidatos)), Transaction.status == TransactionStatus.PENDENTE)
+            .values(status=TransactionStatus.APROVADO, data_aprovacao=datetime.utcnow())
+            .returning(Transaction.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+        postagens = [(transaction_id, *candidatos[transaction_id], ledger.CONTA_PIX)
+                     for transaction_id in sorted(aprovados)]
+        relatorio['ja_liquidados'] += len(candidatos) - len(postagens)
+        ledger.lancar(postagens)
+
+    db.session.commit()
+
+    relatorio['liquidados'] += len(postagens)
+    relatorio['valor_liquidado'] += sum((valor for _, _, valor, _ in postagens), Decimal('0'))
+    return relatorio
+
+def liquidar(lancamentos, batch_size=DEFAULT_BATCH_SIZE):
+    """Liquida um fluxo de lançamentos em lotes de batch_size"""
+    relatorio = _novo_relatorio()
+    lote = []
+    for lancamento in lancamentos:
+        lote.append(lancamento)
+        if len(lote) >= batch_size:
+            liquidar_lote(lote, relatorio)
+            lote = []
+    if lote:
+        liquidar_lote(lote, relatorio)
+    return relatorio
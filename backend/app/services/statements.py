@@ -0,0 +1,260 @@
+import calendar
+import csv
+import io
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from flask import Response, current_app, stream_with_context
+from sqlalchemy import delete, exists, insert, select
+from app.models.investment import Investment, UserInvestment
+from app.models.statement import AnnualStatement
+from app.models.user import Transaction, TRANSACTION_FIELDS
+from app.models import db
+from app.services.portfolio import rendimento_projetado
+
+FORMATOS = ('csv', 'jsonl')
+DEFAULT_CHUNK_SIZE = 1000
+
+# Extratos e informes de rendimentos exportados em fluxo: as linhas vêm do
+# banco em blocos de chunk_size (cursor do lado do servidor no PostgreSQL,
+# via yield_per) e saem formatadas bloco a bloco, então a memória não cresce
+# com o número de transações ou de usuários exportados.
+
+CAMPOS_EXTRATO = ['id', 'user_id', 'tipo', 'valor', 'status', 'descricao', 'data_criacao', 'data_aprovacao', 'pix_id']
+CAMPOS_INFORME = [
+    'ano', 'user_id', 'categoria', 'isencao_ir', 'quantidade', 'saldo_anterior', 'saldo_final',
+    'aplicado_no_ano', 'resgatado_no_ano', 'rendimento_bruto', 'imposto_retido',
+]
+VALORES_INFORME = CAMPOS_INFORME[4:]
+COLUNAS_EXTRATO = [TRANSACTION_FIELDS[campo] for campo in CAMPOS_EXTRATO]
+COLUNAS_INFORME = [getattr(AnnualStatement, campo) for campo in CAMPOS_INFORME]
+
+# Tabela regressiva do IR sobre renda fixa: (dias de aplicação, inclusive, alíquota).
+# Mesmos valores de projection.IR_*, sem importar o numpy.
+ALIQUOTAS_IR = [(180, Decimal('0.225')), (360, Decimal('0.20')), (720, Decimal('0.175')), (None, Decimal('0.15'))]
+
+CENTAVOS = Decimal('0.01')
+
+def aliquota_ir(dias):
+    for limite, aliquota in ALIQUOTAS_IR:
+        if limite is None or dias <= limite:
+            return aliquota
+
+def somar_meses(data, meses):
+    """Soma meses a uma data, limitando ao último dia do mês resultante"""
+    total = data.year * 12 + data.month - 1 + meses
+    ano, mes = total // 12, total % 12 + 1
+    return date(ano, mes, min(data.day, calendar.monthrange(ano, mes)[1]))
+
+def _meses_entre(inicio, fim):
+    return max((fim.year - inicio.year) * 12 + fim.month - inicio.month, 0)
+
+def consulta_extrato(user_id=None, de=None, ate=None):
+    """Transações em ordem de (user_id, data_criacao, id), a ordem do índice do histórico"""
+    consulta = select(*COLUNAS_EXTRATO)
+    if user_id is not None:
+        consulta = consulta.where(Transaction.user_id == user_id)
+    if de is not None:
+        consulta = consulta.where(Transaction.data_criacao >= de)
+    if ate is not None:
+        consulta = consulta.where(Transaction.data_criacao <= ate)
+    return consulta.order_by(Transaction.user_id, Transaction.data_criacao, Transaction.id)
+
+def extrato(user_id=None, de=None, ate=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Linhas do extrato (na ordem de CAMPOS_EXTRATO), lidas em blocos"""
+    return db.session.execute(consulta_extrato(user_id, de, ate).execution_options(yield_per=chunk_size))
+
+def _aplicacoes(ano, user_id, chunk_size):
+    consulta = select(
+        UserInvestment.user_id, UserInvestment.valor_aplicado, UserInvestment.data_aplicacao,
+        Investment.categoria, Investment.isencao_ir, Investment.taxa_retorno, Investment.prazo,
+        Investment.data_vencimento
+    ).join(
+        Investment, UserInvestment.investment_id == Investment.id
+    ).where(UserInvestment.data_aplicacao < datetime(ano + 1, 1, 1))
+    if user_id is not None:
+        consulta = consulta.where(UserInvestment.user_id == user_id)
+    return db.session.execute(consulta.order_by(UserInvestment.user_id).execution_options(yield_per=chunk_size))
+
+def calcular_informe(ano, user_id=None, hoje=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Calcula o informe de rendimentos do ano direto das aplicações
+
+    Gera um dict por (usuário, categoria, isenção de IR), um usuário por vez:
+    as aplicações chegam ordenadas por user_id e só o usuário corrente fica em
+    memória. Posições valem pelo custo (valor aplicado); o rendimento do ano é
+    o das aplicações que venceram nele, com o IR regressivo retido na fonte
+    quando o ativo não é isento. No ano corrente o corte é a data de hoje.
+    """
+    hoje = hoje or date.today()
+    fim_anterior = date(ano - 1, 12, 31)
+    corte = min(date(ano, 12, 31), hoje)
+
+    atual, agregados = None, {}
+    for (dono, valor, data_aplicacao, categoria, isento, taxa, prazo, data_vencimento) in _aplicacoes(ano, user_id, chunk_size):
+        if dono != atual:
+            yield from _linhas_informe(ano, atual, agregados)
+            atual, agregados = dono, {}
+
+        aplicacao = data_aplicacao.date()
+        if data_vencimento:
+            vencimento = data_vencimento.date()
+            meses = _meses_entre(aplicacao, vencimento)
+        else:
+            vencimento = somar_meses(aplicacao, prazo)
+            meses = prazo
+        if aplicacao > corte or vencimento <= fim_anterior:
+            continue
+
+        linha = agregados.setdefault((categoria, bool(isento)), dict.fromkeys(VALORES_INFORME, Decimal('0')))
+        linha['quantidade'] += 1
+        if aplicacao <= fim_anterior:
+            linha['saldo_anterior'] += valor
+        else:
+            linha['aplicado_no_ano'] += valor
+        if vencimento > corte:
+            linha['saldo_final'] += valor
+        else:
+            rendimento = rendimento_projetado(valor, taxa, meses)
+            linha['resgatado_no_ano'] += valor
+            linha['rendimento_bruto'] += rendimento
+            if not isento:
+                linha['imposto_retido'] += (rendimento * aliquota_ir((vencimento - aplicacao).days)).quantize(CENTAVOS)
+    yield from _linhas_informe(ano, atual, agregados)
+
+def _linhas_informe(ano, user_id, agregados):
+    for (categoria, isento), valores in sorted(agregados.items(), key=lambda item: (item[0][0].name, item[0][1])):
+        valores = {campo: valor.quantize(CENTAVOS) for campo, valor in valores.items()}
+        valores['quantidade'] = int(valores['quantidade'])
+        yield {'ano': ano, 'user_id': user_id, 'categoria': categoria, 'isencao_ir': isento, **valores}
+
+def consolidado(ano, user_id=None):
+    """Se o ano já foi consolidado em annual_statements (para o usuário, se informado)"""
+    consulta = select(AnnualStatement.id).where(AnnualStatement.ano == ano)
+    if user_id is not None:
+        consulta = consulta.where(AnnualStatement.user_id == user_id)
+    return db.session.execute(select(exists(consulta))).scalar()
+
+def ler_informe(ano, user_id=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Linhas consolidadas do informe (na ordem de CAMPOS_INFORME), lidas em blocos"""
+    consulta = select(*COLUNAS_INFORME).where(AnnualStatement.ano == ano)
+    if user_id is not None:
+        consulta = consulta.where(AnnualStatement.user_id == user_id)
+    consulta = consulta.order_by(AnnualStatement.user_id, AnnualStatement.categoria, AnnualStatement.isencao_ir)
+    return db.session.execute(consulta.execution_options(yield_per=chunk_size))
+
+def informe(ano, user_id=None, hoje=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Linhas do informe na ordem de CAMPOS_INFORME: as consolidadas, se o ano
+    já terminou e foi consolidado, ou calculadas na hora a partir das aplicações
+
+    O ano corrente é sempre calculado: uma consolidação feita no meio do ano
+    não enxerga as aplicações e vencimentos posteriores a ela.
+    """
+    hoje = hoje or date.today()
+    if ano < hoje.year and consolidado(ano, user_id):
+        return ler_informe(ano, user_id, chunk_size)
+    return ([linha[campo] for campo in CAMPOS_INFORME]
+            for linha in calcular_informe(ano, user_id, hoje=hoje, chunk_size=chunk_size))
+
+def consolidar(ano, user_id=None, hoje=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Recalcula e grava o informe do ano em annual_statements
+
+    Substitui as linhas do ano (do usuário, se informado) em uma transação,
+    gravando em lotes de chunk_size. Retorna o número de linhas gravadas.
+    """
+    remocao = delete(AnnualStatement).where(AnnualStatement.ano == ano)
+    if user_id is not None:
+        remocao = remocao.where(AnnualStatement.user_id == user_id)
+    db.session.execute(remocao)
+
+    gravadas, lote = 0, []
+    agora = datetime.utcnow()
+    for linha in calcular_informe(ano, user_id, hoje=hoje, chunk_size=chunk_size):
+        lote.append({**linha, 'data_atualizacao': agora})
+        if len(lote) >= chunk_size:
+            db.session.execute(insert(AnnualStatement), lote)
+            gravadas += len(lote)
+            lote = []
+    if lote:
+        db.session.execute(insert(AnnualStatement), lote)
+        gravadas += len(lote)
+    db.session.commit()
+    return gravadas
+
+def periodo(args):
+    """(de, ate) do extrato a partir de ?ano= ou de ?de=&ate= (AAAA-MM-DD)"""
+    if args.get('ano'):
+        ano = int(args['ano'])
+        return datetime(ano, 1, 1), datetime(ano + 1, 1, 1) - timedelta(microseconds=1)
+    de = datetime.fromisoformat(args['de']) if args.get('de') else None
+    ate = None
+    if args.get('ate'):
+        ate = datetime.fromisoformat(args['ate'])
+        if len(args['ate']) == 10:
+            ate += timedelta(days=1) - timedelta(microseconds=1)
+    return de, ate
+
+def _conversor_csv(colunas):
+    """Converte enums e datas das linhas para o CSV; as demais células vão como estão
+
+    Os tipos vêm das colunas, então a decisão é tomada uma vez por exportação
+    e não célula a célula.
+    """
+    enums = [i for i, coluna in enumerate(colunas) if issubclass(coluna.type.python_type, Enum)]
+    datas = [i for i, coluna in enumerate(colunas) if coluna.type.python_type is datetime]
+    if not enums and not datas:
+        return lambda linha: linha
+
+    def converter(linha):
+        linha = list(linha)
+        for i in enums:
+            if linha[i] is not None:
+                linha[i] = linha[i].value
+        for i in datas:
+            if linha[i] is not None:
+                linha[i] = linha[i].isoformat()
+        return linha
+    return converter
+
+def exportar(linhas, colunas, formato='csv', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Formata as linhas (sequências na ordem de colunas) em blocos de texto
+
+    CSV com cabeçalho ou JSON lines (um objeto por linha, serializado pelo
+    provedor JSON da aplicação); cada bloco reúne até chunk_size linhas.
+    """
+    if formato not in FORMATOS:
+        raise ValueError('Formato deve ser csv ou jsonl')
+    campos = [coluna.key for coluna in colunas]
+    if formato == 'jsonl':
+        dumps = current_app.json.dumps
+        bloco = []
+        for linha in linhas:
+            bloco.append(dumps(dict(zip(campos, linha))))
+            if len(bloco) >= chunk_size:
+                yield '\n'.join(bloco) + '\n'
+                bloco = []
+        if bloco:
+            yield '\n'.join(bloco) + '\n'
+        return
+
+    converter = _conversor_csv(colunas)
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(campos)
+    pendentes = 0
+    for linha in linhas:
+        escritor.writerow(converter(linha))
+        pendentes += 1
+        if pendentes >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pendentes = 0
+    yield buffer.getvalue()
+
+def resposta(blocos, nome, formato):
+    """Resposta em fluxo para download; os blocos são gerados dentro do contexto da requisição"""
+    return Response(
+        stream_with_context(blocos),
+        mimetype='text/csv' if formato == 'csv' else 'application/x-ndjson',
+        headers={'Content-Disposition': f'attachment; filename="{nome}.{formato}"'}
+    )
@@ -0,0 +1,305 @@
+import bisect
+import heapq
+import math
+import random
+import unicodedata
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import bindparam, exists, insert, select, text, update
+from app.models.investment import Investment, UserInvestment, InvestmentCategory, InvestmentStatus
+from app.models.ledger import LedgerEntry
+from app.models.user import User, Transaction, TransactionType, TransactionStatus
+from app.models import db
+from app.services import ledger, passwords, portfolio
+from app.services.statements import somar_meses
+
+DEFAULT_SEED = 42
+DEFAULT_CHUNK_SIZE = 5000
+DEFAULT_ANOS = 3
+
+# Senha de todos os usuários gerados: o hash é calculado uma vez e repetido,
+# então o login continua pagando o custo real de verificação
+SENHA = 'senha-sintetica'
+
+# Massa de dados sintética e determinística: a mesma semente e a mesma data
+# final geram exatamente as mesmas linhas. Cada usuário é simulado em ordem
+# cronológica (depósitos, aplicações e resgates no vencimento), então os
+# saldos nunca ficam negativos, as captações respeitam o teto das ofertas e
+# o razão fecha com as transações aprovadas.
+
+CATEGORIAS = {
+    # categoria: (peso no catálogo, faixa de taxa anual em %, isenta de IR)
+    InvestmentCategory.CRI: (18, (9.5, 14.0), True),
+    InvestmentCategory.CRA: (14, (9.0, 13.5), True),
+    InvestmentCategory.DEBENTURES: (20, (10.0, 16.0), False),
+    InvestmentCategory.NOTAS_FISCAIS: (12, (14.0, 22.0), False),
+    InvestmentCategory.RECEBIVEIS_JUDICIAIS: (8, (15.0, 24.0), False),
+    InvestmentCategory.OPERACOES_ESTRUTURADAS: (10, (12.0, 20.0), False),
+    InvestmentCategory.PRECATORIOS_FEDERAL: (8, (11.0, 15.0), False),
+    InvestmentCategory.PRECATORIOS_ESTADUAL: (6, (13.0, 18.0), False),
+    InvestmentCategory.PRECATORIOS_MUNICIPAL: (4, (15.0, 21.0), False),
+}
+PRAZOS = {6: 15, 12: 30, 18: 10, 24: 25, 36: 15, 48: 5}
+VALORES_MINIMOS = {100: 40, 500: 30, 1000: 25, 5000: 5}
+
+PRIMEIROS_NOMES = ['Ana', 'João', 'Maria', 'José', 'Francisca', 'Antônio', 'Juliana', 'Carlos', 'Mariana',
+                   'Paulo', 'Fernanda', 'Lucas', 'Patrícia', 'Marcos', 'Aline', 'Rafael', 'Camila', 'Gabriel',
+                   'Letícia', 'Luiz', 'Beatriz', 'Pedro', 'Larissa', 'Thiago', 'Vitória', 'Sérgio', 'Débora',
+                   'André', 'Luíza', 'Raimundo']
+SOBRENOMES = ['Silva', 'Santos', 'Oliveira', 'Souza', 'Rodrigues', 'Ferreira', 'Alves', 'Pereira', 'Lima',
+              'Gomes', 'Costa', 'Ribeiro', 'Martins', 'Carvalho', 'Araújo', 'Melo', 'Barbosa', 'Cardoso',
+              'Rocha', 'Dias', 'Nascimento', 'Andrade', 'Moreira', 'Nunes', 'Marques', 'Machado', 'Mendes',
+              'Freitas', 'Cavalcanti', 'Monteiro']
+DOMINIOS = ['gmail.com', 'hotmail.com', 'outlook.com', 'yahoo.com.br', 'uol.com.br', 'bol.com.br']
+
+RAMOS = ['Energética', 'Construtora', 'Agropecuária', 'Logística', 'Saneamento', 'Incorporadora', 'Usina',
+         'Transmissora', 'Hospital', 'Varejo', 'Cooperativa', 'Mineração', 'Frigorífico', 'Educação']
+EMISSORES = ['Horizonte', 'Cerrado', 'Atlântico', 'Paraná', 'Vitória', 'Nordeste', 'Santa Luzia', 'Guaíba',
+             'São Francisco', 'Tocantins', 'Maringá', 'Xingu', 'Ipê', 'Aroeira', 'Jatobá', 'Iguaçu', 'Pantanal']
+DEVEDORES = {
+    InvestmentCategory.PRECATORIOS_FEDERAL: ['União', 'INSS'],
+    InvestmentCategory.PRECATORIOS_ESTADUAL: ['Estado de São Paulo', 'Estado do Paraná', 'Estado da Bahia'],
+    InvestmentCategory.PRECATORIOS_MUNICIPAL: ['Município de Belém', 'Município de Niterói', 'Município de Campinas'],
+}
+SETORES = ['energia solar', 'infraestrutura', 'agronegócio', 'imobiliário residencial', 'saúde', 'varejo',
+           'saneamento básico', 'logística', 'transmissão elétrica']
+CIDADES = ['São Paulo', 'Brasília', 'Goiânia', 'Curitiba', 'Belém', 'Ribeirão Preto', 'Florianópolis', 'Maceió']
+GARANTIAS = ['alienação fiduciária', 'cessão fiduciária de recebíveis', 'aval dos sócios', 'fundo de reserva',
+             'fiança bancária']
+
+CENTAVOS = Decimal('0.01')
+
+class BancoNaoVazio(Exception):
+    """A massa sintética só é gerada em um banco sem usuários, ofertas e transações"""
+
+def cpf(user_id):
+    """CPF válido e único do usuário sintético, formatado como no cadastro (000.000.000-00)
+
+    A base é uma permutação de user_id módulo 10^9, então ids diferentes nunca
+    colidem e os CPFs não saem em sequência.
+    """
+    digitos = [int(c) for c in f'{(user_id * 7919 + 12345) % 10 ** 9:09d}']
+    for _ in range(2):
+        soma = sum(d * p for d, p in zip(digitos, range(len(digitos) + 1, 1, -1)))
+        digitos.append(0 if soma % 11 < 2 else 11 - soma % 11)
+    numero = ''.join(map(str, digitos))
+    return f'{numero[:3]}.{numero[3:6]}.{numero[6:9]}-{numero[9:]}'
+
+def _sem_acentos(texto):
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode()
+
+def _reais(centavos):
+    return Decimal(centavos).scaleb(-2)
+
+def _escolher(rng, pesos):
+    return rng.choices(list(pesos), weights=list(pesos.values()))[0]
+
+def _lognormal(rng, mediana, sigma, minimo, maximo, multiplo):
+    """Valor em centavos com distribuição log-normal: muitos valores pequenos, poucos grandes"""
+    valor = min(max(math.exp(rng.gauss(math.log(mediana), sigma)), minimo), maximo)
+    return int(valor // multiplo * multiplo) * 100
+
+def _investimento(rng, i, data_criacao):
+    categoria = rng.choices(list(CATEGORIAS), weights=[peso for peso, _, _ in CATEGORIAS.values()])[0]
+    _, (taxa_min, taxa_max), isento = CATEGORIAS[categoria]
+    if categoria in DEVEDORES:
+        titulo = f'Precatório {rng.choice(DEVEDORES[categoria])} {i}'
+    else:
+        titulo = f'{categoria.value.upper()} {rng.choice(RAMOS)} {rng.choice(EMISSORES)} {rng.randint(1, 30)}ª série'
+    descricao = (f'Operação de {rng.choice(SETORES)} em {rng.choice(CIDADES)} '
+                 f'com {rng.choice(GARANTIAS)} e amortização {rng.choice(["mensal", "semestral", "no vencimento"])}')
+    # Algumas ofertas não têm teto de captação
+    valor_total = None if rng.random() < 0.05 else _lognormal(rng, 500000, 1.0, 50000, 50000000, 1000)
+    return {
+        'id': i, 'titulo': titulo, 'descricao': descricao, 'categoria': categoria,
+        'valor_minimo': Decimal(_escolher(rng, VALORES_MINIMOS)),
+        'taxa_retorno': Decimal(rng.uniform(taxa_min, taxa_max)).quantize(CENTAVOS),
+        'prazo': _escolher(rng, PRAZOS), 'status': InvestmentStatus.DISPONIVEL, 'isencao_ir': isento,
+        'valor_total': valor_total, 'valor_captado': 0, 'data_criacao': data_criacao,
+    }
+
+def _quantidades(rng, usuarios, transacoes):
+    """Transações por usuário, somando exatamente transacoes
+
+    Pesos log-normais (poucos usuários muito ativos) proporcionais ao tempo
+    de conta: cadastros antigos acumulam mais movimentação.
+    """
+    pesos = [rng.lognormvariate(0, 1.2) * (1 - math.sqrt((i - 0.5) / usuarios)) for i in range(1, usuarios + 1)]
+    total = sum(pesos) or 1
+    quantidades, acumulado, anterior = [], 0.0, 0
+    for peso in pesos:
+        acumulado += peso
+        atual = round(acumulado * transacoes / total)
+        quantidades.append(atual - anterior)
+        anterior = atual
+    return quantidades
+
+def _vazio():
+    return not db.session.execute(select(
+        exists(select(User.id)) | exists(select(Investment.id)) | exists(select(Transaction.id))
+    )).scalar()
+
+def _ajustar_sequencias():
+    """No PostgreSQL as sequências dos ids avançam até os ids gravados explicitamente"""
+    if db.engine.dialect.name != 'postgresql':
+        return
+    for tabela in ('users', 'investments', 'transactions', 'user_investments', 'ledger_entries'):
+        db.session.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{tabela}', 'id'), coalesce(max(id), 0) + 1, false) FROM {tabela}"
+        ))
+
+def gerar(usuarios, investimentos, transacoes, seed=DEFAULT_SEED, ate=None, anos=DEFAULT_ANOS,
+          chunk_size=DEFAULT_CHUNK_SIZE, progresso=None):
+    """Gera a massa sintética em um banco vazio e retorna a contagem de linhas por tabela
+
+    Usuários se cadastram ao longo de anos anos até ate (mais cadastros nos
+    meses recentes), as ofertas entram no catálogo em ritmo constante e as
+    aplicações preferem as ofertas mais novas. Depósitos têm valores
+    log-normais, quase todos via PIX e aprovados; os dos últimos dias ficam
+    em boa parte pendentes. Aplicações vencidas voltam como resgate com o
+    rendimento projetado. As linhas são gravadas com INSERTs em lote de
+    chunk_size, com commit por lote; progresso, se informado, é chamado com
+    o número de usuários já gerados.
+    """
+    if not _vazio():
+        raise BancoNaoVazio('O banco já tem usuários, ofertas ou transações')
+
+    rng = random.Random(seed)
+    ate = ate or datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    inicio = ate - timedelta(days=365 * anos)
+    periodo = (ate - inicio).total_seconds()
+    recentes = ate - timedelta(days=3)
+    senha_hash = passwords.gerar_hash(SENHA)
+
+    # Catálogo: ofertas entram em ritmo constante desde um mês antes do início
+    abertura = inicio - timedelta(days=30)
+    datas_ofertas = [abertura + timedelta(seconds=(periodo + 30 * 86400) * i / investimentos)
+                     for i in range(investimentos)]
+    ofertas = [_investimento(rng, i + 1, data) for i, data in enumerate(datas_ofertas)]
+    captado = [0] * investimentos
+    tetos = [None if oferta['valor_total'] is None else int(oferta['valor_total']) for oferta in ofertas]
+    minimos = [int(oferta['valor_minimo']) * 100 for oferta in ofertas]
+    for oferta in ofertas:
+        if oferta['valor_total'] is not None:
+            oferta['valor_total'] = _reais(oferta['valor_total'])
+    for lote in range(0, investimentos, chunk_size):
+        db.session.execute(insert(Investment.__table__), ofertas[lote:lote + chunk_size])
+    db.session.commit()
+
+    contagem = {'usuarios': usuarios, 'investimentos': investimentos, 'transacoes': 0, 'aplicacoes': 0,
+                'lancamentos': 0}
+    lotes = {User: [], Transaction: [], UserInvestment: [], LedgerEntry: []}
+
+    def gravar():
+        # Ordem das chaves estrangeiras: usuários antes das transações e aplicações
+        for modelo, linhas in lotes.items():
+            if linhas:
+                db.session.execute(insert(modelo.__table__), linhas)
+                linhas.clear()
+        db.session.commit()
+
+    def lancar(transaction_id, user_id, valor, contrapartida, data):
+        contagem['lancamentos'] += 2
+        lotes[LedgerEntry].append({'transaction_id': transaction_id, 'conta': ledger.CONTA_USUARIO,
+                                   'user_id': user_id, 'valor': valor, 'data_criacao': data})
+        lotes[LedgerEntry].append({'transaction_id': transaction_id, 'conta': contrapartida,
+                                   'user_id': None, 'valor': -valor, 'data_criacao': data})
+
+    def transacao(user_id, tipo, centavos, status, descricao, data, aprovacao=None, pix_id=None):
+        contagem['transacoes'] += 1
+        transaction_id = contagem['transacoes']
+        lotes[Transaction].append({'id': transaction_id, 'user_id': user_id, 'tipo': tipo, 'valor': _reais(centavos),
+                                   'status': status, 'descricao': descricao, 'data_criacao': data,
+                                   'data_aprovacao': aprovacao, 'pix_id': pix_id})
+        return transaction_id
+
+    for user_id, quantidade in enumerate(_quantidades(rng, usuarios, transacoes), start=1):
+        # Cadastros crescem com o tempo: densidade maior perto de ate
+        cadastro = inicio + timedelta(seconds=periodo * math.sqrt((user_id - rng.random()) / usuarios))
+        nome, sobrenome = rng.choice(PRIMEIROS_NOMES), rng.choice(SOBRENOMES)
+        lotes[User].append({
+            'id': user_id, 'cpf': cpf(user_id), 'nome': f'{nome} {sobrenome}',
+            'email': f'{_sem_acentos(nome).lower()}.{_sem_acentos(sobrenome).lower()}{user_id}@{rng.choice(DOMINIOS)}',
+            'senha_hash': senha_hash, 'saldo': Decimal('0'), 'ativo': rng.random() > 0.01,
+            'data_criacao': cadastro,
+        })
+
+        saldo = 0
+        vencimentos = []  # (vencimento, valor com rendimento em centavos, título)
+        restante = (ate - cadastro).total_seconds()
+        for fracao in sorted(rng.random() for _ in range(quantidade)):
+            data = cadastro + timedelta(seconds=restante * fracao)
+
+            if vencimentos and vencimentos[0][0] <= data:
+                vencimento, centavos, titulo = heapq.heappop(vencimentos)
+                transaction_id = transacao(user_id, TransactionType.RESGATE, centavos, TransactionStatus.APROVADO,
+                                           f'Resgate de {titulo}', vencimento, aprovacao=vencimento)
+                lancar(transaction_id, user_id, _reais(centavos), ledger.CONTA_INVESTIMENTOS, vencimento)
+                saldo += centavos
+                continue
+
+            disponiveis = bisect.bisect_right(datas_ofertas, data)
+            if disponiveis and saldo >= 10000 and rng.random() < 0.6:
+                # Ofertas novas concentram a captação; as antigas recebem a cauda
+                indice = disponiveis - 1 - int(disponiveis * rng.random() ** 3)
+                oferta = ofertas[indice]
+                centavos = min(_lognormal(rng, 1500, 0.9, 100, 200000, 50), saldo)
+                if tetos[indice] is not None:
+                    centavos = min(centavos, tetos[indice] - captado[indice])
+                if centavos >= minimos[indice]:
+                    captado[indice] += centavos
+                    saldo -= centavos
+                    valor = _reais(centavos)
+                    transaction_id = transacao(user_id, TransactionType.INVESTIMENTO, centavos,
+                                               TransactionStatus.APROVADO, f"Investimento em {oferta['titulo']}",
+                                               data, aprovacao=data)
+                    lancar(transaction_id, user_id, -valor, ledger.CONTA_INVESTIMENTOS, data)
+                    contagem['aplicacoes'] += 1
+                    lotes[UserInvestment].append({'id': contagem['aplicacoes'], 'user_id': user_id,
+                                                  'investment_id': oferta['id'], 'valor_aplicado': valor,
+                                                  'data_aplicacao': data})
+                    vencimento = datetime.combine(somar_meses(data.date(), oferta['prazo']), data.time())
+                    rendimento = portfolio.rendimento_projetado(valor, oferta['taxa_retorno'], oferta['prazo'])
+                    heapq.heappush(vencimentos, (vencimento, centavos + int(rendimento * 100), oferta['titulo']))
+                    continue
+
+            centavos = _lognormal(rng, 800, 1.0, 20, 200000, 10)
+            sorteio = rng.random()
+            if (data >= recentes and sorteio < 0.4) or sorteio < 0.01:
+                status = TransactionStatus.PENDENTE
+            elif sorteio < 0.05:
+                status = TransactionStatus.REJEITADO
+            else:
+                status = TransactionStatus.APROVADO
+            pix = rng.random() < 0.85
+            pix_id = str(uuid.UUID(int=rng.getrandbits(128), version=4)) if pix else None
+            descricao = f"Depósito {'PIX ' if pix else ''}de R$ {centavos / 100:.2f}"
+            aprovacao = data + timedelta(seconds=rng.randint(5, 900)) if status == TransactionStatus.APROVADO else None
+            transaction_id = transacao(user_id, TransactionType.DEPOSITO, centavos, status, descricao, data,
+                                       aprovacao=aprovacao, pix_id=pix_id)
+            if status == TransactionStatus.APROVADO:
+                lancar(transaction_id, user_id, _reais(centavos), ledger.CONTA_PIX, aprovacao)
+                saldo += centavos
+
+        if max(map(len, lotes.values())) >= chunk_size:
+            gravar()
+            if progresso:
+                progresso(user_id)
+    gravar()
+
+    # Captação acumulada das ofertas; as que atingiram o teto encerram
+    db.session.execute(
+        update(Investment.__table__).where(Investment.__table__.c.id == bindparam('oferta'))
+        .values(valor_captado=bindparam('captado'), status=bindparam('situacao')),
+        [{'oferta': i + 1, 'captado': _reais(valor),
+          'situacao': InvestmentStatus.ESGOTADO if tetos[i] is not None and valor >= tetos[i]
+          else InvestmentStatus.DISPONIVEL}
+         for i, valor in enumerate(captado)]
+    )
+    _ajustar_sequencias()
+    db.session.commit()
+
+    portfolio.reconstruir(chunk_size=chunk_size)
+    ledger.consolidar()
+    return contagem
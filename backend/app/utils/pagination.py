@@ -0,0 +1,89 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from sqlalchemy import and_, or_
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+
+class CursorInvalido(ValueError):
+    """Cursor de paginação malformado ou adulterado"""
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """Converte o parâmetro limit da query string respeitando o máximo"""
+    if value is None or value == '':
+        return default
+    
+    limit = int(value)
+    if limit <= 0:
+        raise ValueError('limit deve ser positivo')
+    
+    return min(limit, maximum)
+
+def _dump(value):
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _load(value, column):
+    python_type = column.type.python_type
+    if value is None:
+        return None
+    if python_type is Decimal:
+        return Decimal(value)
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    return python_type(value)
+
+def encode_cursor(sort_value, last_id):
+    """Codifica a posição (valor de ordenação, id) do último item da página"""
+    payload = json.dumps([_dump(sort_value), last_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, column):
+    """Decodifica um cursor gerado por encode_cursor para a coluna informada"""
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        sort_value, last_id = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        return _load(sort_value, column), int(last_id)
+    except (ValueError, TypeError, ArithmeticError):
+        raise CursorInvalido('Cursor inválido')
+
+def keyset_filter(column, id_column, sort_value, last_id, descending=False):
+    """Condição que seleciona os registros posteriores ao cursor (column, id)"""
+    if column is id_column:
+        return id_column < last_id if descending else id_column > last_id
+    
+    if descending:
+        return or_(column < sort_value, and_(column == sort_value, id_column < last_id))
+    return or_(column > sort_value, and_(column == sort_value, id_column > last_id))
+
+def paginate_keyset(query, column, id_column, cursor=None, limit=DEFAULT_LIMIT, descending=False):
+    """Aplica paginação por cursor e retorna (itens, próximo cursor)
+    
+    A consulta é ordenada por (column, id) para que cada página seja resolvida
+    com uma busca no índice composto correspondente, sem OFFSET.
+    """
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor, column)
+        query = query.filter(keyset_filter(column, id_column, sort_value, last_id, descending))
+    
+    if column is id_column:
+        order = [id_column.desc() if descending else id_column.asc()]
+    elif descending:
+        order = [column.desc(), id_column.desc()]
+    else:
+        order = [column.asc(), id_column.asc()]
+    
+    rows = query.order_by(*order).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, column.key), getattr(last, id_column.key))
+    
+    return rows, next_cursor
@@ -0,0 +1,75 @@
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # Backend rápido opcional; sem ele usa o json da stdlib
+    orjson = None
+
+BACKENDS = ('auto', 'orjson', 'json')
+
+def default(obj):
+    """Tipos que os backends JSON não serializam sozinhos
+
+    DECIMAL vira string para não perder precisão em valores monetários.
+    """
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if hasattr(obj, 'tolist'):  # Arrays e escalares do NumPy
+        return obj.tolist()
+    raise TypeError(f'Objeto do tipo {type(obj).__name__} não é serializável em JSON')
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+def _json_dumps(obj):
+    return json.dumps(obj, default=default, ensure_ascii=False, separators=(',', ':')).encode()
+
+def resolver_backend(nome='auto'):
+    """Função obj -> bytes do backend pedido ('auto' usa o orjson se instalado)"""
+    if nome not in BACKENDS:
+        raise ValueError(f'Backend JSON inválido: {nome}')
+    if nome == 'orjson' and orjson is None:
+        raise RuntimeError('JSON_BACKEND=orjson, mas o orjson não está instalado')
+    if nome == 'json' or orjson is None:
+        return _json_dumps
+    return _orjson_dumps
+
+def linhas(resultado, campos=None):
+    """Converte linhas de consultas por colunas em dicts, sem hidratar objetos ORM
+
+    Com campos, apenas as primeiras len(campos) colunas de cada linha entram
+    no dict; colunas extras (como as que sustentam o cursor) ficam de fora.
+    """
+    if campos is None:
+        return [linha._asdict() for linha in resultado]
+    return [dict(zip(campos, linha)) for linha in resultado]
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Provedor JSON do Flask com backend plugável (JSON_BACKEND: auto, orjson ou json)"""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.backend = app.config.get('JSON_BACKEND', 'auto')
+        self._dumps_bytes = resolver_backend(self.backend)
+
+    def dumps_bytes(self, obj):
+        return self._dumps_bytes(obj)
+
+    def dumps(self, obj, **kwargs):
+        # Opções explícitas (indent, sort_keys...) seguem pelo json da stdlib
+        if kwargs:
+            kwargs.setdefault('default', default)
+            return json.dumps(obj, **kwargs)
+        return self._dumps_bytes(obj).decode()
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._dumps_bytes(obj), mimetype=self.mimetype)
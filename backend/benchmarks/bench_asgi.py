@@ -0,0 +1,183 @@
+"""Benchmark de capacidade de conexões concorrentes: WSGI (gunicorn) x ASGI (uvicorn)
+
+Sobe cada servidor como subprocesso sobre o mesmo banco SQLite, abre N
+conexões keep-alive simultâneas e, durante alguns segundos, cada conexão
+repete requisições autenticadas (saldo e perfil). Para cada nível de
+concorrência mede a vazão, a latência p50/p99 e as falhas (erros de conexão,
+timeouts e respostas 5xx).
+
+Uso:
+    python benchmarks/bench_asgi.py
+    python benchmarks/bench_asgi.py --modos wsgi --concorrencia 10 100 500 --duracao 10
+    python benchmarks/bench_asgi.py --workers 2 --threads 4
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from decimal import Decimal
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND)
+
+ROTAS = ['/api/saldo', '/api/profile']
+
+def preparar(args):
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import insert
+    from app import create_app, migrations
+    from app.models import db
+    from app.models.user import User
+
+    app = create_app()
+    with app.app_context():
+        migrations.aplicar(db.engine)
+        db.session.execute(insert(User.__table__), [
+            {'cpf': f'bench-{i}', 'email': f'bench-{i}@bench', 'nome': f'Bench {i}',
+             'senha_hash': '-', 'saldo': Decimal('1000.00'), 'ativo': True}
+            for i in range(args.usuarios)
+        ])
+        db.session.commit()
+        return [create_access_token(identity=str(i + 1)) for i in range(args.usuarios)]
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def comando(modo, porta, args):
+    if modo == 'wsgi':
+        return ['gunicorn', '--bind', f'127.0.0.1:{porta}', '--workers', str(args.workers),
+                '--threads', str(args.threads), '--backlog', '2048', 'run:app']
+    return ['uvicorn', 'asgi:app', '--host', '127.0.0.1', '--port', str(porta), '--workers', str(args.workers),
+            '--backlog', '2048', '--no-access-log']
+
+def aguardar(porta, processo, timeout=30):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError('Servidor encerrou durante a inicialização')
+        try:
+            with socket.create_connection(('127.0.0.1', porta), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('Servidor não respondeu a tempo')
+
+async def _ler_resposta(leitor):
+    linha_status = await leitor.readline()
+    if not linha_status:
+        raise ConnectionError('conexão encerrada pelo servidor')
+    status = int(linha_status.split()[1])
+    tamanho = 0
+    fechar = False
+    while True:
+        linha = await leitor.readline()
+        if linha in (b'\r\n', b'\n', b''):
+            break
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        nome = nome.strip().lower()
+        if nome == 'content-length':
+            tamanho = int(valor)
+        elif nome == 'connection' and valor.strip().lower() == 'close':
+            fechar = True
+    await leitor.readexactly(tamanho)
+    return status, fechar
+
+async def cliente(porta, tokens, fim, args, rng, latencias, falhas):
+    conexao = None
+    while time.monotonic() < fim:
+        rota = rng.choice(ROTAS)
+        pedido = (f'GET {rota} HTTP/1.1\r\nHost: 127.0.0.1\r\n'
+                  f'Authorization: Bearer {rng.choice(tokens)}\r\n\r\n').encode()
+        inicio = time.perf_counter()
+        try:
+            if conexao is None:
+                conexao = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', porta), args.timeout)
+            leitor, escritor = conexao
+            escritor.write(pedido)
+            await escritor.drain()
+            status, fechar = await asyncio.wait_for(_ler_resposta(leitor), args.timeout)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            falhas.append(time.perf_counter() - inicio)
+            if conexao is not None:
+                conexao[1].close()
+            conexao = None
+            continue
+        latencias.append(time.perf_counter() - inicio)
+        if status >= 500:
+            falhas.append(0)
+        if fechar:
+            escritor.close()
+            conexao = None
+    if conexao is not None:
+        conexao[1].close()
+
+async def carga(porta, tokens, concorrencia, args):
+    latencias, falhas = [], []
+    fim = time.monotonic() + args.duracao
+    await asyncio.gather(*(
+        cliente(porta, tokens, fim, args, random.Random(args.seed + i), latencias, falhas)
+        for i in range(concorrencia)
+    ))
+    return latencias, falhas
+
+def executar(modo, tokens, args):
+    porta = porta_livre()
+    processo = subprocess.Popen(comando(modo, porta, args), cwd=BACKEND, env=os.environ.copy(),
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+    try:
+        aguardar(porta, processo)
+        for concorrencia in args.concorrencia:
+            latencias, falhas = asyncio.run(carga(porta, tokens, concorrencia, args))
+            if not latencias:
+                print(f'{modo:5} {concorrencia:6}  nenhuma resposta   falhas {len(falhas)}')
+                continue
+            latencias.sort()
+            p99 = latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))]
+            print(f'{modo:5} {concorrencia:6}  {len(latencias) / args.duracao:8.0f} req/s'
+                  f'   p50 {statistics.median(latencias) * 1000:8.1f} ms   p99 {p99 * 1000:8.1f} ms'
+                  f'   falhas {len(falhas)}')
+    finally:
+        os.killpg(processo.pid, signal.SIGTERM)
+        processo.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modos', nargs='+', default=['wsgi', 'asgi'], choices=['wsgi', 'asgi'])
+    parser.add_argument('--concorrencia', nargs='+', type=int, default=[10, 50, 200, 500])
+    parser.add_argument('--duracao', type=float, default=5, help='Segundos de carga por nível')
+    parser.add_argument('--timeout', type=float, default=10, help='Timeout por requisição (s)')
+    parser.add_argument('--workers', type=int, default=2, help='Processos do servidor')
+    parser.add_argument('--threads', type=int, default=1, help='Threads por worker do gunicorn')
+    parser.add_argument('--usuarios', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f'sqlite:///{diretorio}/bench_asgi.db'
+    os.environ['IDENTITY_CACHE_TTL'] = '0'
+    tokens = preparar(args)
+
+    print(f'{args.workers} workers, {args.duracao:.0f}s por nível')
+    print('modo  conexões')
+    try:
+        for modo in args.modos:
+            if shutil.which('gunicorn' if modo == 'wsgi' else 'uvicorn') is None:
+                print(f'{modo:5} servidor não instalado, ignorado')
+                continue
+            executar(modo, tokens, args)
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
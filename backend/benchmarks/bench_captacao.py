@@ -0,0 +1,171 @@
+"""Benchmark do acompanhamento da captação: polling do catálogo x hub SSE
+
+Para cada ordem de investimento compara o custo de atualizar N
+acompanhantes:
+
+- polling: cada acompanhante repete GET /api/investments (a ordem invalida
+  o cache do catálogo, então a primeira consulta reconstrói a página e as
+  demais recebem a página inteira do cache);
+- hub: a ordem publica um delta uma única vez e o hub o entrega a N
+  assinantes, aqui corrotinas em um event loop, como no modo ASGI.
+
+Reporta, por ordem, o tempo de servidor e os bytes enviados no polling e,
+no hub, o tempo da publicação até o último assinante receber o delta.
+
+Uso:
+    python benchmarks/bench_captacao.py
+    python benchmarks/bench_captacao.py --acompanhantes 100 1000 5000 --ordens 50
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+def preparar(app, args):
+    from sqlalchemy import insert
+    from app import migrations
+    from app.models import db
+    from app.models.investment import Investment, InvestmentCategory, InvestmentStatus
+    from app.models.user import User
+
+    rng = random.Random(args.seed)
+    with app.app_context():
+        migrations.aplicar(db.engine)
+        db.session.execute(insert(User.__table__), [
+            {'cpf': 'bench', 'email': 'bench@bench', 'nome': 'Bench', 'senha_hash': '-',
+             'saldo': Decimal('100000000.00'), 'ativo': True}
+        ])
+        db.session.execute(insert(Investment.__table__), [
+            {'titulo': f'Investimento {i}', 'descricao': 'Descrição ' * 10,
+             'categoria': rng.choice(list(InvestmentCategory)), 'status': InvestmentStatus.DISPONIVEL,
+             'valor_minimo': Decimal('10.00'), 'taxa_retorno': Decimal(rng.randint(800, 2000)) / 100,
+             'prazo': rng.choice([6, 12, 24]), 'isencao_ir': bool(i % 2),
+             'valor_total': Decimal('10000000.00'), 'valor_captado': Decimal('0')}
+            for i in range(args.investimentos)
+        ])
+        db.session.commit()
+
+def medir_polling(app, cliente, headers, acompanhantes, args, rng):
+    tempos, tamanhos = [], []
+    for _ in range(args.ordens):
+        cliente.post(f'/api/investir/{rng.randint(1, args.investimentos)}', json={'valor': 10}, headers=headers)
+        inicio = time.perf_counter()
+        enviados = 0
+        for _ in range(acompanhantes):
+            enviados += len(cliente.get(f'/api/investments?limit={args.limit}', headers=headers).data)
+        tempos.append(time.perf_counter() - inicio)
+        tamanhos.append(enviados)
+    return statistics.median(tempos), statistics.median(tamanhos)
+
+def medir_hub(app, cliente, headers, acompanhantes, args, rng):
+    from app.services import fundraising
+
+    hub = fundraising.hub(app)
+    loop = asyncio.new_event_loop()
+    recebidos = []
+    lock = threading.Lock()
+    prontos = threading.Event()
+    parar = asyncio.Event()
+
+    async def assinante():
+        sinal = asyncio.Event()
+        assinatura = hub.assinar(None, lambda: loop.call_soon_threadsafe(sinal.set))
+        try:
+            while not parar.is_set():
+                await sinal.wait()
+                sinal.clear()
+                deltas = hub.retirar(assinatura)
+                if deltas:
+                    agora = time.perf_counter()
+                    with lock:
+                        recebidos.append((agora, sum(len(fundraising.evento_sse([d])) for d in deltas)))
+        finally:
+            hub.cancelar(assinatura)
+
+    async def principal():
+        tarefas = [asyncio.ensure_future(assinante()) for _ in range(acompanhantes)]
+        await asyncio.sleep(0)
+        prontos.set()
+        await parar.wait()
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await asyncio.gather(*tarefas, return_exceptions=True)
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(principal(),))
+    thread.start()
+    prontos.wait()
+    while len(hub) < acompanhantes:
+        time.sleep(0.01)
+
+    publicacao = []
+    original = fundraising.publicar
+
+    def publicar(*argumentos):
+        publicacao.append(time.perf_counter())
+        original(*argumentos)
+
+    fundraising.publicar = publicar
+    tempos, tamanhos = [], []
+    try:
+        for _ in range(args.ordens):
+            with lock:
+                recebidos.clear()
+            publicacao.clear()
+            cliente.post(f'/api/investir/{rng.randint(1, args.investimentos)}', json={'valor': 10}, headers=headers)
+            limite = time.perf_counter() + 10
+            while time.perf_counter() < limite:
+                with lock:
+                    if len(recebidos) >= acompanhantes:
+                        break
+                time.sleep(0.0005)
+            with lock:
+                tempos.append(max(t for t, _ in recebidos) - publicacao[0])
+                tamanhos.append(sum(tamanho for _, tamanho in recebidos))
+    finally:
+        fundraising.publicar = original
+        loop.call_soon_threadsafe(parar.set)
+        thread.join()
+        loop.close()
+    return statistics.median(tempos), statistics.median(tamanhos)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--acompanhantes', nargs='+', type=int, default=[100, 1000])
+    parser.add_argument('--ordens', type=int, default=20)
+    parser.add_argument('--investimentos', type=int, default=500)
+    parser.add_argument('--limit', type=int, default=50, help='Tamanho da página do polling')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/bench_captacao.db'
+    os.environ['RATE_LIMIT_ENABLED'] = '0'
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+
+    app = create_app()
+    preparar(app, args)
+    with app.app_context():
+        headers = {'Authorization': f"Bearer {create_access_token(identity='1')}"}
+    cliente = app.test_client()
+    rng = random.Random(args.seed)
+
+    print(f'{args.ordens} ordens, catálogo de {args.investimentos} investimentos, página de {args.limit}')
+    print(f"{'acompanhantes':>13} {'polling ms':>11} {'polling KB':>11} {'hub ms':>8} {'hub KB':>8}")
+    for acompanhantes in args.acompanhantes:
+        polling, bytes_polling = medir_polling(app, cliente, headers, acompanhantes, args, rng)
+        hub, bytes_hub = medir_hub(app, cliente, headers, acompanhantes, args, rng)
+        print(f'{acompanhantes:13} {polling * 1000:11.1f} {bytes_polling / 1024:11.0f} '
+              f'{hub * 1000:8.2f} {bytes_hub / 1024:8.0f}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
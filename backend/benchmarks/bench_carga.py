@@ -0,0 +1,346 @@
+"""Teste de carga ponta a ponta da API com cenários mistos
+
+Sem --url, gera uma massa sintética (flask seed) em um SQLite temporário e
+sobe o gunicorn com o limite de requisições desligado; com --url, usa um
+servidor já populado por flask seed com a mesma --usuarios. Cada processo
+cliente roda --clientes usuários virtuais em threads, cada um com sua
+conexão HTTP, que fazem login com um usuário sintético e repetem cenários
+sorteados pelos pesos de CENARIOS:
+
+- login: novo login (verificação de senha);
+- navegar: catálogo, categorias, busca textual e a página seguinte;
+- investir: ofertas disponíveis e aplicação do valor mínimo em uma delas;
+- pix: geração de cobrança PIX para depósito;
+- historico: transações, dashboard e saldo.
+
+Reporta, por rota, requisições por segundo e latências p50/p95/p99 medidas
+depois do aquecimento, além das respostas 4xx (saldo insuficiente, oferta
+esgotada) e 5xx. --salvar grava essas métricas em um arquivo de baseline;
+--comparar confronta a rodada com um baseline e termina com erro quando
+alguma rota ficou mais lenta ou com menos vazão que a tolerância permite.
+
+Uso:
+    python benchmarks/bench_carga.py
+    python benchmarks/bench_carga.py --duracao 60 --processos 4 --clientes 8 --salvar baseline.json
+    python benchmarks/bench_carga.py --comparar baseline.json --tolerancia 0.15
+    python benchmarks/bench_carga.py --url http://127.0.0.1:5000 --usuarios 10000
+"""
+import argparse
+import http.client
+import json
+import math
+import multiprocessing
+import os
+import random
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND)
+
+# cenário: peso no sorteio
+CENARIOS = {'login': 5, 'navegar': 40, 'investir': 15, 'pix': 15, 'historico': 25}
+BUSCAS = ['cri', 'energia', 'horizonte', 'precatório união', 'saneamento', 'sao paulo', 'constru', 'agro']
+PERCENTIS = (50, 95, 99)
+# Abaixo disso p95/p99 variam demais entre rodadas para apontar regressão
+MIN_AMOSTRAS = 200
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def percentil(ordenadas, p):
+    """Percentil pelo método do posto mais próximo"""
+    return ordenadas[max(0, math.ceil(len(ordenadas) * p / 100) - 1)]
+
+class Cliente:
+    """Usuário virtual: uma conexão HTTP mantida entre as requisições"""
+
+    def __init__(self, url, rng, usuarios, medicoes, inicio_medicao):
+        partes = urllib.parse.urlsplit(url)
+        self.conexao = http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=30)
+        self.rng = rng
+        self.usuarios = usuarios
+        self.medicoes = medicoes
+        self.inicio_medicao = inicio_medicao
+        self.token = None
+
+    def requisitar(self, metodo, caminho, rota, corpo=None):
+        """Faz a requisição e registra latência e status em rota; retorna (status, JSON)"""
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        inicio = time.perf_counter()
+        try:
+            self.conexao.request(metodo, caminho, body=json.dumps(corpo) if corpo is not None else None,
+                                 headers=headers)
+            resposta = self.conexao.getresponse()
+            conteudo = resposta.read()
+            status = resposta.status
+            if resposta.will_close:
+                self.conexao.close()
+        except (OSError, http.client.HTTPException):
+            self.conexao.close()
+            status, conteudo = 0, b''
+        fim = time.perf_counter()
+
+        if inicio >= self.inicio_medicao:
+            medicao = self.medicoes.setdefault(rota, {'latencias': [], 'status': {}})
+            medicao['latencias'].append((fim - inicio) * 1000)
+            classe = f'{status // 100}xx' if status else 'falha'
+            medicao['status'][classe] = medicao['status'].get(classe, 0) + 1
+        try:
+            return status, json.loads(conteudo) if conteudo else None
+        except ValueError:
+            return status, None
+
+    def login(self):
+        from app.services import synthetic
+        self.token = None
+        for _ in range(5):
+            corpo = {'cpf': synthetic.cpf(self.rng.randint(1, self.usuarios)), 'senha': synthetic.SENHA}
+            status, dados = self.requisitar('POST', '/api/login', 'POST /api/login', corpo)
+            if status == 200:
+                self.token = dados['access_token']
+                return True
+        return False
+
+    def navegar(self):
+        status, dados = self.requisitar('GET', '/api/investments?limit=20', 'GET /api/investments')
+        self.requisitar('GET', '/api/investments/categories', 'GET /api/investments/categories')
+        busca = urllib.parse.urlencode({'q': self.rng.choice(BUSCAS), 'limit': 20})
+        self.requisitar('GET', f'/api/investments/search?{busca}', 'GET /api/investments/search')
+        if status == 200 and dados.get('next_cursor'):
+            cursor = urllib.parse.quote(dados['next_cursor'])
+            self.requisitar('GET', f'/api/investments?limit=20&cursor={cursor}', 'GET /api/investments')
+
+    def investir(self):
+        status, dados = self.requisitar('GET', '/api/investments?status=disponivel&ordenar=taxa_retorno&ordem=desc'
+                                        '&limit=20', 'GET /api/investments')
+        if status != 200 or not dados['investments']:
+            return
+        oferta = self.rng.choice(dados['investments'])
+        self.requisitar('POST', f"/api/investir/{oferta['id']}", 'POST /api/investir/<id>',
+                        {'valor': float(oferta['valor_minimo'])})
+
+    def pix(self):
+        self.requisitar('POST', '/api/gerar_pix', 'POST /api/gerar_pix',
+                        {'valor': round(math.exp(self.rng.gauss(math.log(800), 1.0)), 2)})
+
+    def historico(self):
+        self.requisitar('GET', '/api/transacoes?limit=20', 'GET /api/transacoes')
+        self.requisitar('GET', '/api/dashboard', 'GET /api/dashboard')
+        self.requisitar('GET', '/api/saldo', 'GET /api/saldo')
+
+    def rodar(self, fim, pausa):
+        if not self.login():
+            return
+        nomes, pesos = list(CENARIOS), list(CENARIOS.values())
+        while time.perf_counter() < fim:
+            cenario = self.rng.choices(nomes, weights=pesos)[0]
+            if cenario == 'login':
+                if not self.login():
+                    return
+            else:
+                getattr(self, cenario)()
+            if pausa:
+                time.sleep(self.rng.expovariate(1000 / pausa))
+
+def processo_cliente(indice, args, inicio_medicao, fim):
+    """Executado em cada processo cliente: roda os usuários virtuais e devolve as medições"""
+    medicoes = [{} for _ in range(args.clientes)]
+    # Relógios monotônicos não são comparáveis entre processos: os limites chegam em tempo de parede
+    agora = time.perf_counter() - time.time()
+    clientes = [
+        Cliente(args.url, random.Random(f'{args.seed}-{indice}-{i}'), args.usuarios, medicoes[i],
+                inicio_medicao + agora)
+        for i in range(args.clientes)
+    ]
+    threads = [threading.Thread(target=cliente.rodar, args=(fim + agora, args.pausa)) for cliente in clientes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return juntar(medicoes)
+
+def juntar(partes):
+    """Reúne as medições de vários usuários virtuais ou processos"""
+    juntas = {}
+    for medicao in partes:
+        for rota, dados in medicao.items():
+            destino = juntas.setdefault(rota, {'latencias': [], 'status': {}})
+            destino['latencias'].extend(dados['latencias'])
+            for classe, total in dados['status'].items():
+                destino['status'][classe] = destino['status'].get(classe, 0) + total
+    return juntas
+
+def resumir(medicoes, segundos):
+    """Métricas por rota (e do total) a partir das latências em ms"""
+    resumo = {}
+    todas = []
+    for rota, dados in sorted(medicoes.items()):
+        latencias = sorted(dados['latencias'])
+        todas.extend(latencias)
+        resumo[rota] = {
+            'requisicoes': len(latencias),
+            'rps': len(latencias) / segundos,
+            **{f'p{p}': percentil(latencias, p) for p in PERCENTIS},
+            'status': dados['status'],
+        }
+    todas.sort()
+    if todas:
+        status = {}
+        for dados in medicoes.values():
+            for classe, total in dados['status'].items():
+                status[classe] = status.get(classe, 0) + total
+        resumo['total'] = {'requisicoes': len(todas), 'rps': len(todas) / segundos,
+                           **{f'p{p}': percentil(todas, p) for p in PERCENTIS}, 'status': status}
+    return resumo
+
+def imprimir(resumo):
+    print(f"{'rota':36} {'req':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'4xx':>6} {'5xx':>6}")
+    for rota, m in resumo.items():
+        falhas = m['status'].get('5xx', 0) + m['status'].get('falha', 0)
+        print(f"{rota:36} {m['requisicoes']:7} {m['rps']:8.1f} {m['p50']:8.1f} {m['p95']:8.1f} {m['p99']:8.1f} "
+              f"{m['status'].get('4xx', 0):6} {falhas:6}")
+
+def comparar(resumo, baseline, tolerancia):
+    """Compara com o baseline; retorna as regressões encontradas
+
+    Regressão: p95 ou p99 acima de (1 + tolerancia) vezes o do baseline,
+    vazão abaixo de (1 - tolerancia) vezes a do baseline, ou erros 5xx em
+    uma rota que não os tinha. Percentis só são comparados em rotas com pelo
+    menos MIN_AMOSTRAS requisições nas duas rodadas.
+    """
+    regressoes = []
+    print(f"\ncomparação com o baseline de {baseline['data']} (tolerância {tolerancia:.0%})")
+    print(f"{'rota':36} {'req/s':>18} {'p95 ms':>18} {'p99 ms':>18}")
+    for rota, base in baseline['rotas'].items():
+        atual = resumo.get(rota)
+        if atual is None:
+            regressoes.append(f'{rota}: sem requisições nesta rodada')
+            continue
+        amostras = min(atual['requisicoes'], base['requisicoes']) >= MIN_AMOSTRAS
+        colunas = []
+        for chave, pior in (('rps', -1), ('p95', 1), ('p99', 1)):
+            variacao = atual[chave] / base[chave] - 1 if base[chave] else 0
+            colunas.append(f'{base[chave]:7.1f} {variacao:+8.1%}' + ('' if amostras or chave == 'rps' else '*'))
+            if variacao * pior > tolerancia and (amostras or chave == 'rps'):
+                regressoes.append(f'{rota}: {chave} {base[chave]:.1f} -> {atual[chave]:.1f} ({variacao:+.1%})')
+        print(f'{rota:36} ' + ' '.join(f'{coluna:>18}' for coluna in colunas))
+        if atual['status'].get('5xx', 0) and not base['status'].get('5xx', 0):
+            regressoes.append(f"{rota}: {atual['status']['5xx']} respostas 5xx")
+    print(f'* menos de {MIN_AMOSTRAS} requisições: percentil não comparado')
+    return regressoes
+
+def preparar(args):
+    """Gera a massa sintética em um SQLite temporário e sobe o gunicorn; retorna o processo"""
+    from app import create_app, migrations
+    from app.models import db
+    from app.services import synthetic
+
+    if shutil.which('gunicorn') is None:
+        raise SystemExit('gunicorn não instalado: suba o servidor e informe --url')
+    diretorio = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f'sqlite:///{diretorio}/bench_carga.db'
+    os.environ['RATE_LIMIT_ENABLED'] = '0'
+    app = create_app()
+    inicio = time.perf_counter()
+    with app.app_context():
+        migrations.aplicar(db.engine)
+        contagem = synthetic.gerar(args.usuarios, args.investimentos, args.transacoes, seed=args.seed)
+    print(f"{contagem['usuarios']} usuários, {contagem['investimentos']} ofertas, {contagem['transacoes']} "
+          f'transações geradas em {time.perf_counter() - inicio:.0f}s')
+
+    porta = porta_livre()
+    args.url = f'http://127.0.0.1:{porta}'
+    processo = subprocess.Popen(['gunicorn', '--bind', f'127.0.0.1:{porta}', '--workers', str(args.workers), 'run:app'],
+                                cwd=BACKEND, env=os.environ.copy(), stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL, start_new_session=True)
+    limite = time.perf_counter() + 60
+    while time.perf_counter() < limite:
+        try:
+            urllib.request.urlopen(f'{args.url}/api/investments/categories', timeout=5)
+            return processo
+        except urllib.error.HTTPError:
+            return processo  # 401 sem token: o servidor já responde
+        except OSError:
+            time.sleep(0.05)
+    os.killpg(processo.pid, signal.SIGTERM)
+    raise RuntimeError('gunicorn não respondeu a tempo')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Servidor já populado por flask seed (padrão: gunicorn local)')
+    parser.add_argument('--usuarios', type=int, default=2000, help='Usuários sintéticos (os mesmos de flask seed)')
+    parser.add_argument('--investimentos', type=int, default=500)
+    parser.add_argument('--transacoes', type=int, default=100000)
+    parser.add_argument('--workers', type=int, default=2, help='Workers do gunicorn local')
+    parser.add_argument('--processos', type=int, default=2, help='Processos clientes')
+    parser.add_argument('--clientes', type=int, default=4, help='Usuários virtuais por processo')
+    parser.add_argument('--duracao', type=float, default=30, help='Segundos medidos')
+    parser.add_argument('--aquecimento', type=float, default=5, help='Segundos iniciais descartados')
+    parser.add_argument('--pausa', type=float, default=0, help='Pausa média entre cenários, em ms')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--salvar', help='Grava as métricas da rodada como baseline neste arquivo')
+    parser.add_argument('--comparar', help='Baseline com que a rodada é comparada')
+    parser.add_argument('--tolerancia', type=float, default=0.10, help='Variação aceita sobre o baseline')
+    args = parser.parse_args()
+
+    servidor = None if args.url else preparar(args)
+    try:
+        inicio_medicao = time.time() + args.aquecimento
+        fim = inicio_medicao + args.duracao
+        print(f'{args.processos} processos x {args.clientes} usuários virtuais contra {args.url}, '
+              f'{args.aquecimento:.0f}s de aquecimento e {args.duracao:.0f}s medidos')
+        with multiprocessing.Pool(args.processos) as pool:
+            parciais = pool.starmap(processo_cliente, [(i, args, inicio_medicao, fim) for i in range(args.processos)])
+    finally:
+        if servidor:
+            os.killpg(servidor.pid, signal.SIGTERM)
+            servidor.wait(timeout=30)
+
+    medicoes = juntar(parciais)
+    if not medicoes:
+        print('nenhuma requisição medida (login falhou?)')
+        return 1
+    resumo = resumir(medicoes, args.duracao)
+    imprimir(resumo)
+
+    if args.salvar:
+        parametros = {chave: getattr(args, chave) for chave in
+                      ('usuarios', 'investimentos', 'transacoes', 'workers', 'processos', 'clientes', 'duracao',
+                       'pausa', 'seed')}
+        with open(args.salvar, 'w', encoding='utf-8') as arquivo:
+            json.dump({'data': datetime.now().isoformat(timespec='seconds'), 'parametros': parametros,
+                       'rotas': resumo}, arquivo, indent=2, ensure_ascii=False)
+        print(f'baseline gravado em {args.salvar}')
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            baseline = json.load(arquivo)
+        diferentes = [chave for chave, valor in baseline['parametros'].items() if getattr(args, chave) != valor]
+        if diferentes:
+            print(f"atenção: parâmetros diferentes do baseline: {', '.join(diferentes)}")
+        regressoes = comparar(resumo, baseline, args.tolerancia)
+        for regressao in regressoes:
+            print(f'REGRESSÃO {regressao}')
+        if regressoes:
+            return 1
+        print('sem regressões')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Benchmark do painel da conta: /api/dashboard x chamadas separadas
+
+Compara o carregamento da página Conta feito com as chamadas separadas
+(/api/profile, /api/saldo, /api/meus_investimentos, /api/transacoes e
+/api/portfolio/resumo, em sequência e em paralelo como no Promise.all do
+frontend) com uma única chamada a /api/dashboard. Para cada padrão reporta
+requisições HTTP e consultas SQL por carregamento e a latência p50/p95.
+
+Uso:
+    python benchmarks/bench_dashboard.py
+    python benchmarks/bench_dashboard.py --aplicacoes 200 --transacoes 2000 --carregamentos 500
+    python benchmarks/bench_dashboard.py --identity-cache-ttl 0
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+CHAMADAS_SEPARADAS = [
+    '/api/profile',
+    '/api/saldo',
+    '/api/meus_investimentos',
+    '/api/transacoes',
+    '/api/portfolio/resumo',
+]
+
+def preparar(app, args):
+    from sqlalchemy import insert
+    from app import migrations
+    from app.models import db
+    from app.models.investment import Investment, UserInvestment, InvestmentCategory, InvestmentStatus
+    from app.models.user import User, Transaction, TransactionType, TransactionStatus
+    from app.services import portfolio
+
+    rng = random.Random(args.seed)
+    agora = datetime.utcnow()
+    with app.app_context():
+        migrations.aplicar(db.engine)
+        db.session.execute(insert(User.__table__), [
+            {'cpf': f'bench-{i}', 'email': f'bench-{i}@bench', 'nome': f'Bench {i}',
+             'senha_hash': '-', 'saldo': Decimal('1000.00'), 'ativo': True}
+            for i in range(args.usuarios)
+        ])
+        db.session.execute(insert(Investment.__table__), [
+            {'titulo': f'Investimento {i}', 'categoria': rng.choice(list(InvestmentCategory)),
+             'status': InvestmentStatus.DISPONIVEL, 'valor_minimo': Decimal('10.00'),
+             'taxa_retorno': Decimal(rng.randint(800, 2000)) / 100, 'prazo': rng.choice([6, 12, 24]),
+             'isencao_ir': bool(i % 2), 'valor_captado': Decimal('0')}
+            for i in range(args.investimentos)
+        ])
+        db.session.execute(insert(UserInvestment.__table__), [
+            {'user_id': u + 1, 'investment_id': rng.randint(1, args.investimentos),
+             'valor_aplicado': Decimal(rng.randint(100, 5000)), 'data_aplicacao': agora - timedelta(days=rng.randint(0, 300))}
+            for u in range(args.usuarios) for _ in range(args.aplicacoes)
+        ])
+        db.session.execute(insert(Transaction.__table__), [
+            {'user_id': u + 1, 'tipo': TransactionType.DEPOSITO, 'valor': Decimal(rng.randint(100, 100000)) / 100,
+             'status': TransactionStatus.APROVADO, 'descricao': 'Depósito',
+             'data_criacao': agora - timedelta(minutes=i)}
+            for u in range(args.usuarios) for i in range(args.transacoes)
+        ])
+        db.session.commit()
+        for u in range(args.usuarios):
+            portfolio.reconstruir(u + 1)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--usuarios', type=int, default=20)
+    parser.add_argument('--investimentos', type=int, default=500)
+    parser.add_argument('--aplicacoes', type=int, default=30, help='Aplicações por usuário')
+    parser.add_argument('--transacoes', type=int, default=200, help='Transações por usuário')
+    parser.add_argument('--carregamentos', type=int, default=300)
+    parser.add_argument('--identity-cache-ttl', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/bench_dashboard.db'
+    os.environ['IDENTITY_CACHE_TTL'] = str(args.identity_cache_ttl)
+
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import event
+    from app import create_app
+    from app.models import db
+
+    app = create_app()
+    preparar(app, args)
+    with app.app_context():
+        tokens = [create_access_token(identity=str(u + 1)) for u in range(args.usuarios)]
+        engine = db.engine
+
+    consultas = [0]
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _contar(conn, cursor, statement, parameters, context, executemany):
+        consultas[0] += 1
+
+    cliente = app.test_client()
+
+    def get(url, headers):
+        resposta = cliente.get(url, headers=headers)
+        if resposta.status_code != 200:
+            raise RuntimeError(f'{url}: {resposta.status_code} {resposta.get_data(as_text=True)}')
+
+    executor = ThreadPoolExecutor(max_workers=len(CHAMADAS_SEPARADAS))
+    padroes = {
+        'separadas (sequencial)': lambda h: [get(url, h) for url in CHAMADAS_SEPARADAS],
+        'separadas (paralelo)': lambda h: list(executor.map(lambda url: get(url, h), CHAMADAS_SEPARADAS)),
+        'dashboard': lambda h: get('/api/dashboard', h),
+    }
+    requisicoes = {'separadas (sequencial)': len(CHAMADAS_SEPARADAS),
+                   'separadas (paralelo)': len(CHAMADAS_SEPARADAS), 'dashboard': 1}
+
+    print(f'{args.carregamentos} carregamentos da página Conta, {args.aplicacoes} aplicações e '
+          f'{args.transacoes} transações por usuário, cache de identidade {args.identity_cache_ttl}s')
+    print(f"{'padrão':24} {'HTTP':>5} {'SQL':>6} {'p50 ms':>8} {'p95 ms':>8}")
+    rng = random.Random(args.seed)
+    for nome, carregar in padroes.items():
+        carregar({'Authorization': f'Bearer {tokens[0]}'})
+        consultas[0] = 0
+        latencias = []
+        for _ in range(args.carregamentos):
+            headers = {'Authorization': f'Bearer {rng.choice(tokens)}'}
+            inicio = time.perf_counter()
+            carregar(headers)
+            latencias.append(time.perf_counter() - inicio)
+        latencias.sort()
+        p95 = latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))]
+        print(f'{nome:24} {requisicoes[nome]:5} {consultas[0] / args.carregamentos:6.1f} '
+              f'{statistics.median(latencias) * 1000:8.2f} {p95 * 1000:8.2f}')
+    executor.shutdown()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
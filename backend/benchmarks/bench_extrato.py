@@ -0,0 +1,204 @@
+"""Benchmark da exportação de extratos e informes de rendimentos
+
+Gera alguns milhões de transações (e as aplicações dos mesmos usuários) e
+compara, cada modo em um processo Python novo, o tempo, o volume e o pico
+de memória (RSS) de:
+
+- memoria: todas as transações em uma lista de dicts serializada de uma vez
+  em JSON, como faria uma rota que monta a resposta inteira;
+- csv / jsonl: /api/admin/extrato em fluxo, lido bloco a bloco;
+- informe-calculado: /api/admin/informe/<ano> calculado das aplicações;
+- consolidar: flask statements-build do ano;
+- informe-consolidado: /api/admin/informe/<ano> lendo annual_statements.
+
+Reporta também a latência p50/p95 do extrato de um único usuário.
+
+Uso:
+    python benchmarks/bench_extrato.py
+    python benchmarks/bench_extrato.py --transacoes 5000000 --usuarios 50000
+    python benchmarks/bench_extrato.py --modos csv memoria --banco /tmp/extrato.db
+"""
+import argparse
+import json
+import math
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+MODOS = ['memoria', 'csv', 'jsonl', 'informe-calculado', 'consolidar', 'informe-consolidado']
+ANO = 2024
+LOTE = 50000
+
+def preparar(app, args):
+    from sqlalchemy import insert
+    from app import migrations
+    from app.models import db
+    from app.models.investment import Investment, UserInvestment, InvestmentCategory, InvestmentStatus
+    from app.models.user import User, Transaction, TransactionType, TransactionStatus
+
+    rng = random.Random(args.seed)
+    inicio_periodo = datetime(ANO - 1, 1, 1)
+    segundos_periodo = int((datetime(ANO + 2, 1, 1) - inicio_periodo).total_seconds())
+    tipos = [TransactionType.DEPOSITO] * 40 + [TransactionType.INVESTIMENTO] * 55 + [TransactionType.RESGATE] * 5
+    situacoes = [TransactionStatus.APROVADO] * 90 + [TransactionStatus.PENDENTE] * 7 + [TransactionStatus.REJEITADO] * 3
+
+    def valor():
+        # Valores log-normais: muitos aportes pequenos, poucos grandes
+        return Decimal(min(math.exp(rng.gauss(6.5, 1.2)), 500000)).quantize(Decimal('0.01'))
+
+    with app.app_context():
+        migrations.aplicar(db.engine)
+        db.session.execute(insert(User.__table__), [
+            {'cpf': f'bench-{i}', 'email': f'bench-{i}@bench', 'nome': f'Bench {i}',
+             'senha_hash': '-', 'saldo': Decimal('0'), 'ativo': True}
+            for i in range(args.usuarios)
+        ])
+        db.session.execute(insert(Investment.__table__), [
+            {'titulo': f'Investimento {i}', 'categoria': rng.choice(list(InvestmentCategory)),
+             'status': InvestmentStatus.DISPONIVEL, 'valor_minimo': Decimal('10.00'),
+             'taxa_retorno': Decimal(rng.randint(800, 2000)) / 100, 'prazo': rng.choice([6, 12, 24, 36]),
+             'isencao_ir': rng.random() < 0.4, 'valor_captado': Decimal('0')}
+            for i in range(args.investimentos)
+        ])
+        for inicio in range(0, args.transacoes, LOTE):
+            db.session.execute(insert(Transaction.__table__), [
+                {'user_id': rng.randint(1, args.usuarios), 'tipo': rng.choice(tipos), 'valor': valor(),
+                 'status': rng.choice(situacoes), 'descricao': 'Movimentação',
+                 'data_criacao': inicio_periodo + timedelta(seconds=rng.randrange(segundos_periodo))}
+                for _ in range(min(LOTE, args.transacoes - inicio))
+            ])
+        for inicio in range(0, args.aplicacoes, LOTE):
+            db.session.execute(insert(UserInvestment.__table__), [
+                {'user_id': rng.randint(1, args.usuarios), 'investment_id': rng.randint(1, args.investimentos),
+                 'valor_aplicado': valor(),
+                 'data_aplicacao': inicio_periodo + timedelta(seconds=rng.randrange(segundos_periodo))}
+                for _ in range(min(LOTE, args.aplicacoes - inicio))
+            ])
+        db.session.commit()
+
+def _rss_mb():
+    # ru_maxrss vem em KB no Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _baixar(cliente, url, headers):
+    resposta = cliente.get(url, headers=headers)
+    if resposta.status_code != 200:
+        raise RuntimeError(f'{url}: {resposta.status_code} {resposta.get_data(as_text=True)}')
+    total = linhas = 0
+    for bloco in resposta.response:
+        total += len(bloco)
+        linhas += bloco.count('\n' if isinstance(bloco, str) else b'\n')
+    resposta.close()
+    return total, linhas
+
+def filho(modo, args):
+    """Executado no processo novo: roda um modo e imprime as medições em JSON"""
+    from app import create_app
+    from app.models import db
+    from app.services import statements
+    from app.utils.serialization import linhas
+
+    app = create_app()
+    cliente = app.test_client()
+    headers = {'X-Admin-Token': os.environ['ADMIN_TOKEN']}
+    with app.app_context():
+        db.session.execute(statements.consulta_extrato(1)).all()  # aquece conexão e imports
+    base = _rss_mb()
+
+    inicio = time.perf_counter()
+    if modo == 'memoria':
+        with app.app_context():
+            dados = linhas(db.session.execute(statements.consulta_extrato()).all())
+            conteudo = app.json.dumps(dados)
+            volume, quantidade = len(conteudo), len(dados)
+    elif modo in ('csv', 'jsonl'):
+        volume, quantidade = _baixar(cliente, f'/api/admin/extrato?formato={modo}', headers)
+        quantidade -= modo == 'csv'  # cabeçalho
+    elif modo == 'consolidar':
+        with app.app_context():
+            quantidade = statements.consolidar(ANO, chunk_size=args.chunk_size)
+            volume = 0
+    else:
+        volume, quantidade = _baixar(cliente, f'/api/admin/informe/{ANO}?formato=csv', headers)
+        quantidade -= 1
+    segundos = time.perf_counter() - inicio
+
+    print(json.dumps({'segundos': segundos, 'mb': volume / 2 ** 20, 'linhas': quantidade,
+                      'pico_mb': _rss_mb() - base}))
+
+def medir_usuario(args):
+    """Latência do extrato completo de um usuário (p50, p95 em ms)"""
+    from flask_jwt_extended import create_access_token
+    from app import create_app
+
+    app = create_app()
+    cliente = app.test_client()
+    rng = random.Random(args.seed)
+    with app.app_context():
+        tokens = [create_access_token(identity=str(rng.randint(1, args.usuarios))) for _ in range(args.repeticoes)]
+    latencias = []
+    for token in tokens:
+        inicio = time.perf_counter()
+        _baixar(cliente, '/api/extrato', {'Authorization': f'Bearer {token}'})
+        latencias.append(time.perf_counter() - inicio)
+    latencias.sort()
+    return statistics.median(latencias) * 1000, latencias[min(len(latencias) - 1, int(len(latencias) * 0.95))] * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--transacoes', type=int, default=2000000)
+    parser.add_argument('--aplicacoes', type=int, default=500000)
+    parser.add_argument('--usuarios', type=int, default=20000)
+    parser.add_argument('--investimentos', type=int, default=2000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--repeticoes', type=int, default=200, help='Extratos de um único usuário')
+    parser.add_argument('--modos', nargs='+', choices=MODOS, default=MODOS)
+    parser.add_argument('--banco', help='Arquivo SQLite a reaproveitar (gerado se não existir)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--filho', choices=MODOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        filho(args.filho, args)
+        return 0
+
+    banco = args.banco or os.path.join(tempfile.mkdtemp(), 'bench_extrato.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{banco}'
+    os.environ['ADMIN_TOKEN'] = 'bench'
+    os.environ['RATE_LIMIT_ENABLED'] = '0'
+    # Páginas do arquivo mapeadas pelo mmap do SQLite contam no RSS e
+    # mascarariam a memória das próprias exportações
+    os.environ.setdefault('SQLITE_MMAP_SIZE', '0')
+
+    if not os.path.exists(banco):
+        from app import create_app
+        inicio = time.perf_counter()
+        preparar(create_app(), args)
+        print(f'{args.transacoes} transações e {args.aplicacoes} aplicações geradas em '
+              f'{time.perf_counter() - inicio:.0f}s')
+
+    print('modo de exportação, processo novo por modo (pico de RSS acima do processo ocioso)')
+    print(f"{'modo':20} {'linhas':>9} {'s':>7} {'linhas/s':>10} {'MB':>8} {'pico MB':>8}")
+    for modo in args.modos:
+        saida = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--filho', modo, '--chunk-size', str(args.chunk_size)],
+            env=os.environ.copy(), capture_output=True, text=True, check=True)
+        r = json.loads(saida.stdout.strip().splitlines()[-1])
+        print(f"{modo:20} {r['linhas']:9} {r['segundos']:7.2f} {r['linhas'] / r['segundos']:10.0f} "
+              f"{r['mb']:8.1f} {r['pico_mb']:8.1f}")
+
+    p50, p95 = medir_usuario(args)
+    print(f'extrato de um usuário (~{args.transacoes // args.usuarios} transações): p50 {p50:.2f} ms, p95 {p95:.2f} ms')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
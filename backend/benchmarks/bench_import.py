@@ -0,0 +1,97 @@
+"""Benchmark da importação em lote de investimentos
+
+Gera um CSV sintético e compara o importador em lotes
+(app.services.importer) com a inserção objeto a objeto pelo ORM.
+
+Uso:
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --linhas 200000 --database-url postgresql://...
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+def gerar_csv(caminho, linhas, seed):
+    from app.models.investment import InvestmentCategory
+    rng = random.Random(seed)
+    categorias = [categoria.value for categoria in InvestmentCategory]
+    with open(caminho, 'w', newline='', encoding='utf-8') as arquivo:
+        writer = csv.writer(arquivo)
+        writer.writerow(['titulo', 'descricao', 'categoria', 'valor_minimo', 'taxa_retorno',
+                         'prazo', 'status', 'isencao_ir', 'valor_total', 'data_vencimento'])
+        for i in range(linhas):
+            writer.writerow([
+                f'Oferta {i}', f'Oferta sintética {i}', rng.choice(categorias),
+                rng.choice([100, 500, 1000, 5000]), f'{rng.uniform(8, 24):.2f}',
+                rng.choice([6, 12, 24, 36, 60]), 'disponivel', rng.random() < 0.4,
+                rng.choice(['', 100000, 1000000]), ''
+            ])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='URL do banco (padrão: SQLite temporário)')
+    parser.add_argument('--linhas', type=int, default=50000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    diretorio = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = args.database_url or f'sqlite:///{diretorio}/bench_import.db'
+
+    from app import create_app
+    from app.models import db
+    from app.models.investment import Investment
+    from app.services import importer
+
+    caminho = os.path.join(diretorio, 'ofertas.csv')
+    gerar_csv(caminho, args.linhas, args.seed)
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+        # Caminho objeto a objeto: um Investment por linha, commit ao final
+        inicio = time.perf_counter()
+        with open(caminho, newline='', encoding='utf-8') as arquivo:
+            for linha in importer.ler_linhas(arquivo, 'csv'):
+                db.session.add(Investment(**importer.validar(linha)))
+        db.session.commit()
+        por_objeto = time.perf_counter() - inicio
+
+        db.session.query(Investment).delete()
+        db.session.commit()
+        db.session.expunge_all()
+
+        inicio = time.perf_counter()
+        with open(caminho, newline='', encoding='utf-8') as arquivo:
+            resultado = importer.importar(arquivo, 'csv', chunk_size=args.chunk_size)
+        em_lote = time.perf_counter() - inicio
+
+        total = db.session.query(Investment).count()
+
+        # Segunda passada só para medir o pico de memória (o tracemalloc distorce o tempo)
+        db.session.query(Investment).delete()
+        db.session.commit()
+        tracemalloc.start()
+        with open(caminho, newline='', encoding='utf-8') as arquivo:
+            importer.importar(arquivo, 'csv', chunk_size=args.chunk_size)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f'linhas:          {args.linhas}')
+    print(f'por objeto:      {por_objeto:.2f}s ({args.linhas / por_objeto:,.0f} linhas/s)')
+    print(f'em lote:         {em_lote:.2f}s ({args.linhas / em_lote:,.0f} linhas/s, chunk {args.chunk_size})')
+    print(f'ganho:           {por_objeto / em_lote:.1f}x')
+    print(f'pico de memória: {pico / 1024 / 1024:.1f} MiB (importação em lote)')
+    print(f'inseridos:       {resultado["inseridos"]} (tabela: {total}), rejeitados: {resultado["rejeitados"]}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Benchmark de logins concorrentes em /api/login
+
+Cadastra usuários em um banco temporário e dispara logins em paralelo pelo
+cliente de testes do Flask, reportando vazão e latências p50/p99.
+
+Uso:
+    python benchmarks/bench_login.py
+    python benchmarks/bench_login.py --method scrypt:32768:8:1 --hash-workers 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+def percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='URL do banco (padrão: SQLite temporário)')
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--method', help='PASSWORD_HASH_METHOD (padrão: configuração da aplicação)')
+    parser.add_argument('--hash-workers', type=int, help='PASSWORD_HASH_WORKERS')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or f'sqlite:///{tempfile.mkdtemp()}/bench_login.db'
+    if args.method:
+        os.environ['PASSWORD_HASH_METHOD'] = args.method
+    if args.hash_workers:
+        os.environ['PASSWORD_HASH_WORKERS'] = str(args.hash_workers)
+
+    from app import create_app
+    from app.models import db
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+    client = app.test_client()
+    for i in range(args.users):
+        client.post('/api/register', json={
+            'cpf': f'bench-{i}', 'email': f'bench-{i}@bench', 'nome': f'Bench {i}', 'senha': 'senha-bench'
+        })
+
+    def login(i):
+        inicio = time.perf_counter()
+        response = app.test_client().post('/api/login', json={'cpf': f'bench-{i % args.users}', 'senha': 'senha-bench'})
+        return time.perf_counter() - inicio, response.status_code
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        resultados = list(executor.map(login, range(args.logins)))
+    duracao = time.perf_counter() - inicio
+
+    latencias = [latencia * 1000 for latencia, status in resultados if status == 200]
+    falhas = sum(1 for _, status in resultados if status != 200)
+
+    print(f'método:          {app.config["PASSWORD_HASH_METHOD"]}')
+    print(f'hash workers:    {app.config["PASSWORD_HASH_WORKERS"]}')
+    print(f'logins:          {args.logins} em {duracao:.2f}s ({args.logins / duracao:.1f} logins/s)')
+    print(f'falhas:          {falhas}')
+    if latencias:
+        print(f'p50:             {percentil(latencias, 50):.1f} ms')
+        print(f'p99:             {percentil(latencias, 99):.1f} ms')
+    return 0 if not falhas else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
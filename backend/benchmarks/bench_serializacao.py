@@ -0,0 +1,141 @@
+"""Benchmark da serialização das listagens
+
+Compara, para uma página de investimentos, o caminho antigo (objetos ORM,
+to_dict campo a campo com float()/isoformat() e json da stdlib) com o novo
+(consulta por colunas, dicts direto das tuplas e o provedor JSON da
+aplicação com cada backend disponível). Em seguida mede a vazão dos
+endpoints de listagem com cada backend.
+
+Uso:
+    python benchmarks/bench_serializacao.py
+    python benchmarks/bench_serializacao.py --investimentos 5000 --limit 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+def to_dict_antigo(investment):
+    """Réplica do Investment.to_dict anterior, para comparação"""
+    return {
+        'id': investment.id,
+        'titulo': investment.titulo,
+        'descricao': investment.descricao,
+        'categoria': investment.categoria.value if investment.categoria else None,
+        'valor_minimo': float(investment.valor_minimo),
+        'taxa_retorno': float(investment.taxa_retorno),
+        'prazo': investment.prazo,
+        'status': investment.status.value if investment.status else None,
+        'isencao_ir': investment.isencao_ir,
+        'valor_total': float(investment.valor_total) if investment.valor_total else None,
+        'valor_captado': float(investment.valor_captado),
+        'data_criacao': investment.data_criacao.isoformat() if investment.data_criacao else None,
+        'data_vencimento': investment.data_vencimento.isoformat() if investment.data_vencimento else None
+    }
+
+def medir(funcao, repeticoes):
+    funcao()
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--investimentos', type=int, default=2000)
+    parser.add_argument('--transacoes', type=int, default=2000)
+    parser.add_argument('--limit', type=int, default=200)
+    parser.add_argument('--repeticoes', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = f'sqlite:///{tempfile.mkdtemp()}/bench_serializacao.db'
+    os.environ['CATALOG_CACHE_TTL'] = '0'
+
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import insert
+    from app import create_app
+    from app.models import db
+    from app.models.investment import (Investment, UserInvestment, InvestmentCategory,
+                                       InvestmentStatus, INVESTMENT_COLUMNS)
+    from app.models.user import User, Transaction, TransactionType, TransactionStatus
+    from app.utils import serialization
+
+    rng = random.Random(args.seed)
+    agora = datetime.utcnow()
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(insert(User.__table__), [
+            {'cpf': 'bench', 'email': 'bench@bench', 'nome': 'Bench', 'senha_hash': '-',
+             'saldo': Decimal('0'), 'ativo': True}
+        ])
+        db.session.execute(insert(Investment.__table__), [
+            {'titulo': f'Investimento {i}', 'descricao': 'Descrição ' * 20,
+             'categoria': rng.choice(list(InvestmentCategory)), 'status': InvestmentStatus.DISPONIVEL,
+             'valor_minimo': Decimal(rng.randint(1, 50) * 100), 'taxa_retorno': Decimal(rng.randint(800, 2000)) / 100,
+             'prazo': rng.choice([6, 12, 24, 36]), 'isencao_ir': bool(i % 2),
+             'valor_total': Decimal(rng.randint(100, 1000) * 1000), 'valor_captado': Decimal('0'),
+             'data_criacao': agora - timedelta(minutes=i), 'data_vencimento': agora + timedelta(days=365)}
+            for i in range(args.investimentos)
+        ])
+        db.session.execute(insert(UserInvestment.__table__), [
+            {'user_id': 1, 'investment_id': rng.randint(1, args.investimentos),
+             'valor_aplicado': Decimal(rng.randint(100, 10000)), 'data_aplicacao': agora}
+            for _ in range(args.limit)
+        ])
+        db.session.execute(insert(Transaction.__table__), [
+            {'user_id': 1, 'tipo': TransactionType.DEPOSITO, 'valor': Decimal(rng.randint(100, 100000)) / 100,
+             'status': TransactionStatus.APROVADO, 'descricao': 'Depósito', 'data_criacao': agora - timedelta(seconds=i)}
+            for i in range(args.transacoes)
+        ])
+        db.session.commit()
+
+        def antes():
+            investments = Investment.query.order_by(Investment.id).limit(args.limit).all()
+            json.dumps([to_dict_antigo(investment) for investment in investments], sort_keys=True).encode()
+            db.session.expunge_all()
+
+        def depois(dumps):
+            def executar():
+                resultado = db.session.query(*INVESTMENT_COLUMNS).order_by(Investment.id).limit(args.limit)
+                dumps(serialization.linhas(resultado))
+            return executar
+
+        backends = ['json'] + (['orjson'] if serialization.orjson is not None else [])
+
+        print(f'página de {args.limit} investimentos ({args.repeticoes} repetições)')
+        base = medir(antes, args.repeticoes)
+        print(f'  antes (ORM + to_dict + json):    {base * 1000:7.2f} ms')
+        for backend in backends:
+            duracao = medir(depois(serialization.resolver_backend(backend)), args.repeticoes)
+            print(f'  depois (colunas + {backend:6}):      {duracao * 1000:7.2f} ms  ({base / duracao:.1f}x)')
+
+        token = create_access_token(identity='1')
+
+    headers = {'Authorization': f'Bearer {token}'}
+    endpoints = [
+        f'/api/investments?limit={args.limit}',
+        f'/api/transacoes?limit={args.limit}',
+        '/api/meus_investimentos',
+    ]
+    print('vazão dos endpoints (requisições/s)')
+    for backend in backends:
+        app.config['JSON_BACKEND'] = backend
+        app.json = serialization.FastJSONProvider(app)
+        cliente = app.test_client()
+        for endpoint in endpoints:
+            duracao = medir(lambda: cliente.get(endpoint, headers=headers), args.repeticoes)
+            print(f'  {backend:6} {endpoint:40} {1 / duracao:8.0f}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Benchmark da liquidação em lote de depósitos PIX
+
+Cria depósitos PIX pendentes para vários usuários, liquida todos a partir de
+um extrato sintético e mede liquidados/s. Em seguida reprocessa o mesmo
+extrato para confirmar que a liquidação é idempotente.
+
+Uso:
+    python benchmarks/bench_settlement.py
+    python benchmarks/bench_settlement.py --depositos 500000 --batch-size 2000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from decimal import Decimal
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--database-url', help='URL do banco (padrão: SQLite temporário)')
+    parser.add_argument('--usuarios', type=int, default=1000)
+    parser.add_argument('--depositos', type=int, default=100000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = args.database_url or f'sqlite:///{tempfile.mkdtemp()}/bench_settlement.db'
+
+    from sqlalchemy import insert
+    from app import create_app
+    from app.models import db
+    from app.models.user import User, Transaction, TransactionType, TransactionStatus
+    from app.services import ledger, settlement
+
+    rng = random.Random(args.seed)
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.execute(insert(User.__table__), [
+            {'cpf': f'bench-{i}', 'email': f'bench-{i}@bench', 'nome': f'Bench {i}',
+             'senha_hash': '-', 'saldo': Decimal('0'), 'ativo': True}
+            for i in range(args.usuarios)
+        ])
+        user_ids = [user_id for (user_id,) in db.session.query(User.id)]
+
+        extrato = []
+        for inicio in range(0, args.depositos, 10000):
+            lote = []
+            for _ in range(min(10000, args.depositos - inicio)):
+                valor = Decimal(rng.randint(1000, 500000)) / 100
+                pix_id = str(uuid.UUID(int=rng.getrandbits(128)))
+                lote.append({'user_id': rng.choice(user_ids), 'tipo': TransactionType.DEPOSITO,
+                             'valor': valor, 'status': TransactionStatus.PENDENTE, 'pix_id': pix_id})
+                extrato.append((pix_id, valor))
+            db.session.execute(insert(Transaction.__table__), lote)
+        db.session.commit()
+        rng.shuffle(extrato)
+        esperado = sum(valor for _, valor in extrato)
+
+        inicio = time.perf_counter()
+        relatorio = settlement.liquidar(extrato, batch_size=args.batch_size)
+        duracao = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        repeticao = settlement.liquidar(extrato, batch_size=args.batch_size)
+        duracao_repeticao = time.perf_counter() - inicio
+
+        saldo_total = sum(ledger.saldos(user_ids).values(), Decimal('0'))
+
+        inicio = time.perf_counter()
+        verificacao = ledger.verificar()
+        duracao_verificacao = time.perf_counter() - inicio
+
+    print(f'depósitos:       {args.depositos} ({args.usuarios} usuários, lotes de {args.batch_size})')
+    print(f'liquidação:      {duracao:.2f}s ({relatorio["liquidados"] / duracao:,.0f} liquidados/s)')
+    print(f'reprocessamento: {duracao_repeticao:.2f}s, {repeticao["liquidados"]} liquidados, '
+          f'{repeticao["ja_liquidados"]} já liquidados')
+    print(f'verificação:     {verificacao["lancamentos"]} lançamentos em {duracao_verificacao:.2f}s')
+    consistente = (relatorio['liquidados'] == args.depositos and repeticao['liquidados'] == 0
+                   and saldo_total == esperado and not verificacao['usuarios_divergentes']
+                   and not verificacao['transacoes_desbalanceadas'])
+    print(f'consistência:    {"OK" if consistente else "FALHOU"} (saldo total {saldo_total}, esperado {esperado})')
+    return 0 if consistente else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
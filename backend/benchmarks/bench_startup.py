@@ -0,0 +1,177 @@
+"""Benchmark de inicialização: tempo de import, create_app e primeira requisição
+
+Cada medição roda em um processo Python novo, para que nada esteja em cache
+de módulos. Para cada modo (lazy: dependências pesadas no primeiro uso;
+preload: app.preload.aquecer() antes da primeira requisição, como faz o
+mestre do gunicorn) reporta a mediana do import de app, do create_app e da
+primeira chamada às rotas de saldo, projeção (numpy) e QR Code (qrcode/Pillow).
+Com --gunicorn mede também o tempo entre subir o servidor e a primeira
+resposta 200, com e sem GUNICORN_PRELOAD.
+
+Uso:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeticoes 10 --gunicorn
+"""
+import argparse
+import json
+import os
+import shutil
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND)
+
+ROTAS = ['saldo', 'projecao', 'qr_code']
+
+def preparar():
+    """Cria o banco com um usuário, uma aplicação e um PIX; retorna (token, url do QR)"""
+    from decimal import Decimal
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import insert
+    from app import create_app, migrations
+    from app.models import db
+    from app.models.investment import Investment, UserInvestment, InvestmentCategory, InvestmentStatus
+    from app.models.user import User, Transaction, TransactionType, TransactionStatus
+    from app.services import pix_qr
+
+    app = create_app()
+    with app.app_context():
+        migrations.aplicar(db.engine)
+        db.session.execute(insert(User.__table__), [
+            {'cpf': 'bench', 'email': 'bench@bench', 'nome': 'Bench', 'senha_hash': '-',
+             'saldo': Decimal('1000.00'), 'ativo': True}
+        ])
+        db.session.execute(insert(Investment.__table__), [
+            {'titulo': 'Investimento', 'categoria': InvestmentCategory.CRI, 'status': InvestmentStatus.DISPONIVEL,
+             'valor_minimo': Decimal('10.00'), 'taxa_retorno': Decimal('12.00'), 'prazo': 12,
+             'isencao_ir': False, 'valor_captado': Decimal('0')}
+        ])
+        db.session.execute(insert(UserInvestment.__table__), [
+            {'user_id': 1, 'investment_id': 1, 'valor_aplicado': Decimal('100.00')}
+        ])
+        payload = pix_qr.montar_payload(10.0)
+        db.session.execute(insert(Transaction.__table__), [
+            {'user_id': 1, 'tipo': TransactionType.DEPOSITO, 'valor': Decimal('10.00'),
+             'status': TransactionStatus.PENDENTE, 'descricao': 'PIX', 'pix_id': 'bench', 'pix_qr_code': payload}
+        ])
+        db.session.commit()
+        token = create_access_token(identity='1')
+    return token, f'/api/pix/bench/qr/{pix_qr.digest(payload)}.png'
+
+def filho(modo, token, url_qr):
+    """Executado no processo novo: mede e imprime os tempos em JSON"""
+    tempos = {}
+    inicio = time.perf_counter()
+    import app as pacote
+    tempos['import'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    app = pacote.create_app()
+    tempos['create_app'] = time.perf_counter() - inicio
+
+    if modo == 'preload':
+        from app.preload import aquecer
+        inicio = time.perf_counter()
+        aquecer()
+        tempos['aquecer'] = time.perf_counter() - inicio
+
+    cliente = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    urls = {'saldo': '/api/saldo', 'projecao': '/api/portfolio/projecao', 'qr_code': url_qr}
+    for rota in ROTAS:
+        inicio = time.perf_counter()
+        resposta = cliente.get(urls[rota], headers=headers)
+        tempos[rota] = time.perf_counter() - inicio
+        if resposta.status_code != 200:
+            raise RuntimeError(f'{rota}: {resposta.status_code}')
+    tempos['modulos'] = len(sys.modules)
+    print(json.dumps(tempos))
+
+def medir_processo(modo, token, url_qr, repeticoes):
+    amostras = []
+    for _ in range(repeticoes):
+        saida = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--filho', modo, '--token', token, '--url-qr', url_qr],
+            cwd=BACKEND, env=os.environ.copy(), capture_output=True, text=True, check=True)
+        amostras.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    return {chave: statistics.median(a[chave] for a in amostras) for chave in amostras[0]}
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def medir_gunicorn(preload, workers, token):
+    """Segundos entre subir o gunicorn e a primeira resposta 200"""
+    porta = porta_livre()
+    ambiente = dict(os.environ, GUNICORN_PRELOAD='true' if preload else 'false')
+    inicio = time.perf_counter()
+    processo = subprocess.Popen(['gunicorn', '--bind', f'127.0.0.1:{porta}', '--workers', str(workers), 'run:app'],
+                                cwd=BACKEND, env=ambiente, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                                start_new_session=True)
+    try:
+        while time.perf_counter() - inicio < 60:
+            try:
+                pedido = urllib.request.Request(f'http://127.0.0.1:{porta}/api/saldo',
+                                                headers={'Authorization': f'Bearer {token}'})
+                with urllib.request.urlopen(pedido, timeout=5) as r:
+                    if r.status == 200:
+                        return time.perf_counter() - inicio
+            except OSError:
+                time.sleep(0.02)
+        raise RuntimeError('gunicorn não respondeu a tempo')
+    finally:
+        os.killpg(processo.pid, signal.SIGTERM)
+        processo.wait(timeout=30)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--gunicorn', action='store_true', help='Mede também o boot do gunicorn')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--filho', choices=['lazy', 'preload'], help=argparse.SUPPRESS)
+    parser.add_argument('--token', help=argparse.SUPPRESS)
+    parser.add_argument('--url-qr', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        filho(args.filho, args.token, args.url_qr)
+        return 0
+
+    diretorio = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f'sqlite:///{diretorio}/bench_startup.db'
+    os.environ['PIX_QR_WORKERS'] = '0'
+    try:
+        token, url_qr = preparar()
+        print(f'mediana de {args.repeticoes} processos (ms)')
+        print(f"{'modo':8} {'import':>8} {'create_app':>11} {'aquecer':>8} "
+              + ' '.join(f'{rota:>9}' for rota in ROTAS) + f" {'1ª req total':>13} {'módulos':>8}")
+        for modo in ('lazy', 'preload'):
+            t = medir_processo(modo, token, url_qr, args.repeticoes)
+            primeira = t['import'] + t['create_app'] + t['saldo']
+            print(f"{modo:8} {t['import'] * 1000:8.1f} {t['create_app'] * 1000:11.1f} "
+                  f"{t.get('aquecer', 0) * 1000:8.1f} "
+                  + ' '.join(f'{t[rota] * 1000:9.1f}' for rota in ROTAS)
+                  + f' {primeira * 1000:13.1f} {t["modulos"]:8.0f}')
+
+        if args.gunicorn:
+            if shutil.which('gunicorn') is None:
+                print('gunicorn não instalado, boot não medido')
+            else:
+                print(f'gunicorn, {args.workers} workers: subida até a primeira resposta 200 (ms)')
+                for preload in (False, True):
+                    tempos = [medir_gunicorn(preload, args.workers, token) for _ in range(args.repeticoes)]
+                    print(f"  preload={'sim' if preload else 'não':3} {statistics.median(tempos) * 1000:8.1f}")
+    finally:
+        shutil.rmtree(diretorio, ignore_errors=True)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
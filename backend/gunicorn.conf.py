@@ -0,0 +1,17 @@
+import os
+
+# Lido automaticamente pelo gunicorn quando iniciado a partir de backend/.
+# Com GUNICORN_PRELOAD (padrão) a aplicação e as dependências pesadas são
+# carregadas uma vez no mestre antes do fork dos workers.
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'true').lower() in ('1', 'true', 'sim')
+
+def when_ready(server):
+    if preload_app:
+        from app.preload import aquecer
+        server.log.info('Módulos pré-carregados: %s', ', '.join(aquecer()))
+
+def post_fork(server, worker):
+    if preload_app:
+        from app.preload import apos_fork
+        apos_fork(worker.app.wsgi())
@@ -0,0 +1,34 @@
+import pytest
+from app import create_app, migrations
+from app.models import db
+from app.models.user import User
+from app.services import identity
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Aplicação com um SQLite em arquivo temporário, já migrado"""
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path}/teste.db')
+    monkeypatch.setenv('RATE_LIMIT_ENABLED', '0')
+    monkeypatch.setenv('PIX_QR_WORKERS', '0')
+    monkeypatch.setenv('SQLITE_MMAP_SIZE', '0')
+    monkeypatch.setenv('JWT_SECRET_KEY', 'chave-de-teste-com-pelo-menos-32-bytes')
+    app = create_app()
+    app.config['TESTING'] = True
+    # Os ids se repetem entre os bancos temporários: nada de identidade de outro teste
+    identity.invalidar()
+    with app.app_context():
+        migrations.aplicar(db.engine)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+@pytest.fixture
+def usuario(app):
+    """id de um usuário com saldo de abertura zero"""
+    with app.app_context():
+        user = User(cpf='123.456.789-09', email='teste@exemplo.com', nome='Teste', senha_hash='-')
+        db.session.add(user)
+        db.session.commit()
+        return user.id
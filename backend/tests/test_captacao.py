@@ -0,0 +1,45 @@
+import threading
+import time
+from flask_jwt_extended import create_access_token
+from app.services import fundraising
+
+def _url(app, usuario):
+    with app.app_context():
+        return f'/api/investments/stream?jwt={create_access_token(identity=str(usuario))}'
+
+def test_config_fora_do_asgi(app):
+    assert app.test_client().get('/api/config').get_json() == {'captacao_tempo_real': False}
+
+def test_stream_wsgi_termina_no_limite(app, usuario):
+    app.config['FUNDRAISING_LONG_POLL'] = 1
+    app.config['FUNDRAISING_KEEPALIVE'] = 1
+    inicio = time.monotonic()
+    resposta = app.test_client().get(_url(app, usuario))
+    corpo = resposta.get_data(as_text=True)
+    assert resposta.status_code == 200
+    assert corpo.startswith('retry: ')
+    assert time.monotonic() - inicio < 3
+    with app.app_context():
+        assert len(fundraising.hub()) == 0
+
+def test_stream_wsgi_termina_no_primeiro_lote(app, usuario):
+    app.config['FUNDRAISING_LONG_POLL'] = 10
+    with app.app_context():
+        hub = fundraising.hub()
+
+    def publicar():
+        # Espera a assinatura do stream antes de entregar o delta
+        while not len(hub):
+            time.sleep(0.01)
+        hub.entregar({'id': 1, 'valor_captado': '100', 'valor_total': None, 'status': 'disponivel'})
+
+    threading.Thread(target=publicar).start()
+    inicio = time.monotonic()
+    corpo = app.test_client().get(_url(app, usuario)).get_data(as_text=True)
+    assert 'event: captacao' in corpo
+    assert time.monotonic() - inicio < 5
+
+def test_config_no_asgi(app):
+    from app.asgi import AsgiApp
+    AsgiApp(app)
+    assert app.test_client().get('/api/config').get_json() == {'captacao_tempo_real': True}
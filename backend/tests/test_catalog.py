@@ -0,0 +1,81 @@
+from decimal import Decimal
+import pytest
+from app.models import db
+from app.models.investment import Investment, InvestmentCategory, InvestmentStatus
+from app.models.user import Transaction, TransactionType, TransactionStatus
+from app.services import allocation, catalog, settlement
+
+@pytest.fixture
+def ofertas(app, usuario):
+    """ids de duas ofertas e um saldo de 1000 para o usuário"""
+    with app.app_context():
+        catalog.invalidar()
+        investimentos = [
+            Investment(titulo=f'CRI {i}', categoria=InvestmentCategory.CRI, valor_minimo=100, taxa_retorno=12,
+                       prazo=12, valor_total=valor_total, valor_captado=0)
+            for i, valor_total in enumerate((10000, 200))
+        ]
+        db.session.add_all(investimentos)
+        db.session.add(Transaction(user_id=usuario, tipo=TransactionType.DEPOSITO, valor=Decimal('1000.00'),
+                                   status=TransactionStatus.PENDENTE, pix_id='pix-1'))
+        db.session.commit()
+        settlement.liquidar_lote([('pix-1', Decimal('1000.00'))])
+        return [investimento.id for investimento in investimentos]
+
+def _cachear(app, chave, ids):
+    with app.test_request_context():
+        catalog.pagina(chave, lambda: {'investments': [{'id': i} for i in ids]})
+
+def test_ordem_descarta_so_as_paginas_da_oferta(app, usuario, ofertas):
+    a, b = ofertas
+    _cachear(app, (('id', 'a'),), [a])
+    _cachear(app, (('id', 'b'),), [b])
+    with app.test_request_context():
+        catalog.categorias()
+        allocation.investir(usuario, a, 100)
+    assert set(catalog._paginas) == {(('id', 'b'),)}
+    assert catalog._metadados is not None
+
+def test_oferta_esgotada_descarta_filtros_de_status(app, usuario, ofertas):
+    a, b = ofertas
+    _cachear(app, (('id', 'a'),), [a])
+    _cachear(app, (('status', 'disponivel'),), [a])
+    with app.test_request_context():
+        catalog.categorias()
+        allocation.investir(usuario, b, 200)
+        assert db.session.get(Investment, b).status == InvestmentStatus.ESGOTADO
+    assert set(catalog._paginas) == {(('id', 'a'),)}
+    assert catalog._metadados is None
+
+def test_edicao_descarta_tudo(app, ofertas):
+    a, b = ofertas
+    _cachear(app, (('id', 'b'),), [b])
+    with app.app_context():
+        db.session.get(Investment, a).titulo = 'Outro título'
+        db.session.commit()
+    assert not catalog._paginas
+
+def test_reabastece_pelo_principal_logo_apos_escrita(app, ofertas, monkeypatch):
+    bancos = []
+    monkeypatch.setattr(catalog, 'primario', lambda: _Registrar(bancos))
+    app.config['DB_REPLICA_LAG'] = 60
+    with app.app_context():
+        catalog.invalidar()
+    _cachear(app, (('id', 'a'),), ofertas)
+    assert bancos == ['principal']
+
+    app.config['DB_REPLICA_LAG'] = 0
+    with app.app_context():
+        catalog.invalidar()
+    _cachear(app, (('id', 'b'),), ofertas)
+    assert bancos == ['principal']
+
+class _Registrar:
+    def __init__(self, bancos):
+        self.bancos = bancos
+
+    def __enter__(self):
+        self.bancos.append('principal')
+
+    def __exit__(self, *exc):
+        return False
@@ -0,0 +1,44 @@
+from decimal import Decimal
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine, text
+from app.models import db
+
+@pytest.fixture
+def headers(app, usuario):
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=str(usuario))}'}
+
+def _outro_processo(app, sql, **parametros):
+    # Conexão própria, sem os eventos da sessão: como um outro worker ou o CLI
+    engine = create_engine(app.config['SQLALCHEMY_DATABASE_URI'])
+    with engine.begin() as conn:
+        conn.execute(text(sql), parametros)
+    engine.dispose()
+
+def test_saldo_nao_vem_do_cache(app, usuario, headers):
+    cliente = app.test_client()
+    assert Decimal(cliente.get('/api/profile', headers=headers).get_json()['saldo']) == 0
+    _outro_processo(app, 'INSERT INTO transactions (user_id, tipo, valor, status) '
+                         "VALUES (:u, 'DEPOSITO', 50, 'APROVADO')", u=usuario)
+    _outro_processo(app, "INSERT INTO ledger_entries (transaction_id, conta, user_id, valor) "
+                         "VALUES (1, 'usuario', :u, 50)", u=usuario)
+    assert Decimal(cliente.get('/api/profile', headers=headers).get_json()['saldo']) == 50
+    assert Decimal(cliente.get('/api/saldo', headers=headers).get_json()['saldo']) == 50
+
+def test_usuario_inativo_recusado(app, usuario, headers):
+    app.config['IDENTITY_CACHE_TTL'] = 0  # expira logo, como depois do TTL em outro worker
+    cliente = app.test_client()
+    assert cliente.get('/api/dashboard', headers=headers).status_code == 200
+    _outro_processo(app, 'UPDATE users SET ativo = 0 WHERE id = :u', u=usuario)
+    for rota in ('/api/dashboard', '/api/saldo', '/api/transacoes'):
+        assert cliente.get(rota, headers=headers).status_code == 401
+
+def test_desativado_no_processo_vale_na_hora(app, usuario, headers):
+    from app.models.user import User
+    cliente = app.test_client()
+    assert cliente.get('/api/saldo', headers=headers).status_code == 200
+    with app.app_context():
+        db.session.get(User, usuario).ativo = False
+        db.session.commit()
+    assert cliente.get('/api/saldo', headers=headers).status_code == 401
@@ -0,0 +1,58 @@
+import threading
+from decimal import Decimal
+from app.models import db
+from app.models.user import Transaction, TransactionType, TransactionStatus
+from app.services import ledger
+
+def _depositar(user_id, valor):
+    ledger.bloquear(user_id)
+    transaction = Transaction(user_id=user_id, tipo=TransactionType.DEPOSITO, valor=valor,
+                              status=TransactionStatus.APROVADO)
+    db.session.add(transaction)
+    db.session.flush()
+    ledger.lancar([(transaction.id, user_id, valor, ledger.CONTA_PIX)])
+    db.session.commit()
+
+def test_snapshots_concorrentes_nao_perdem_lancamentos(app, usuario):
+    depositos, escritores = 25, 4
+    parar = threading.Event()
+    erros = []
+
+    def depositar():
+        try:
+            with app.app_context():
+                for _ in range(depositos):
+                    _depositar(usuario, Decimal('10.00'))
+        except Exception as e:
+            erros.append(e)
+
+    def consolidar():
+        try:
+            with app.app_context():
+                while not parar.is_set():
+                    ledger.consolidar()
+        except Exception as e:
+            erros.append(e)
+
+    consolidador = threading.Thread(target=consolidar)
+    threads = [threading.Thread(target=depositar) for _ in range(escritores)]
+    consolidador.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    parar.set()
+    consolidador.join()
+
+    assert not erros
+    with app.app_context():
+        ledger.consolidar()
+        esperado = Decimal('10.00') * depositos * escritores
+        assert ledger.saldo(usuario) == esperado
+        resultado = ledger.verificar()
+        assert not resultado['usuarios_divergentes']
+        assert not resultado['transacoes_desbalanceadas']
+
+def test_consolidar_sem_lancamentos(app):
+    with app.app_context():
+        assert ledger.consolidar() == 0
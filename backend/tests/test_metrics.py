@@ -0,0 +1,25 @@
+import os
+import pytest
+from app import create_app
+
+@pytest.fixture
+def cliente(app, monkeypatch):
+    monkeypatch.setenv('METRICS_ENABLED', '1')
+    monkeypatch.setenv('METRICS_TOKEN', 'token-de-metricas')
+    app = create_app()
+    app.config['TESTING'] = True
+    return app.test_client()
+
+def test_metrics_exige_token(cliente):
+    assert cliente.get('/metrics').status_code == 403
+    assert cliente.get('/metrics', headers={'Authorization': 'Bearer outro'}).status_code == 403
+
+def test_metrics_fechado_sem_token(cliente):
+    cliente.application.config['METRICS_TOKEN'] = None
+    assert cliente.get('/metrics', headers={'Authorization': 'Bearer None'}).status_code == 403
+
+def test_metrics_rotula_o_worker(cliente):
+    cliente.get('/api/config')
+    resposta = cliente.get('/metrics', headers={'Authorization': 'Bearer token-de-metricas'})
+    assert resposta.status_code == 200
+    assert f'pid="{os.getpid()}",endpoint="investments.get_config"' in resposta.get_data(as_text=True)
@@ -0,0 +1,16 @@
+from sqlalchemy import inspect
+from app.models import db, investment, ledger, portfolio, statement, user  # noqa: F401  (registram as tabelas)
+
+def test_esquema_migrado_igual_aos_modelos(app):
+    """Mudança de modelo sem migração (ou migração divergente do modelo) quebra aqui"""
+    with app.app_context():
+        inspetor = inspect(db.engine)
+        for tabela in db.metadata.sorted_tables:
+            migradas = {coluna['name']: coluna for coluna in inspetor.get_columns(tabela.name)}
+            assert set(migradas) >= {coluna.name for coluna in tabela.columns}, tabela.name
+            for coluna in tabela.columns:
+                assert migradas[coluna.name]['nullable'] == coluna.nullable, f'{tabela.name}.{coluna.name}'
+                assert migradas[coluna.name]['type']._type_affinity is coluna.type._type_affinity, \
+                    f'{tabela.name}.{coluna.name}'
+            indices = {indice['name'] for indice in inspetor.get_indexes(tabela.name)}
+            assert indices >= {indice.name for indice in tabela.indexes}, tabela.name
@@ -0,0 +1,40 @@
+import threading
+import pytest
+from werkzeug.security import generate_password_hash
+from app.services import passwords
+
+METODOS = ['scrypt', 'scrypt:16384:8:1', 'pbkdf2', 'pbkdf2:sha256', 'pbkdf2:sha512', 'pbkdf2:sha256:1000']
+
+@pytest.mark.parametrize('metodo', METODOS)
+def test_prefixo_igual_ao_do_werkzeug(metodo):
+    assert passwords.prefixo(metodo) == generate_password_hash('x', method=metodo).split('$', 1)[0]
+
+@pytest.mark.parametrize('metodo', METODOS)
+def test_sem_rehash_com_o_metodo_configurado(app, metodo):
+    app.config['PASSWORD_HASH_METHOD'] = metodo
+    with app.app_context():
+        assert not passwords.precisa_rehash(generate_password_hash('x', method=metodo))
+
+def test_rehash_quando_o_metodo_muda(app):
+    app.config['PASSWORD_HASH_METHOD'] = 'scrypt'
+    with app.app_context():
+        assert passwords.precisa_rehash(generate_password_hash('x', method='pbkdf2:sha256:1000'))
+        assert passwords.precisa_rehash(generate_password_hash('x', method='scrypt:16384:8:1'))
+
+def test_vaga_so_volta_quando_o_hash_termina(app, monkeypatch):
+    monkeypatch.setattr(passwords, '_executor', None)
+    monkeypatch.setattr(passwords, '_vagas', None)
+    app.config.update(PASSWORD_HASH_WORKERS=1, PASSWORD_HASH_FILA=1, PASSWORD_HASH_TIMEOUT=0.2)
+    liberar = threading.Event()
+    with app.app_context():
+        # Rodando quando o tempo esgota: a vaga fica presa até o hash terminar
+        with pytest.raises(passwords.HashIndisponivel):
+            passwords.executar(liberar.wait, 5)
+        assert passwords._vagas._value == 1
+        # Ainda na fila quando o tempo esgota: cancelado e a vaga volta na hora
+        with pytest.raises(passwords.HashIndisponivel):
+            passwords.executar(liberar.wait, 5)
+        assert passwords._vagas._value == 1
+        liberar.set()
+        passwords._executor.shutdown(wait=True)
+        assert passwords._vagas._value == 2
@@ -0,0 +1,16 @@
+from types import SimpleNamespace
+import pytest
+from app.migrations import planos
+from app.models import db
+
+def test_consultas_quentes_usam_indices(app):
+    with app.app_context():
+        resultado = planos.verificar(db.engine)
+    assert set(resultado) == set(planos.CONSULTAS) | set(planos.CONSULTAS_POR_DIALETO)
+    problemas = {nome: plano for nome, (plano, problemas) in resultado.items() if problemas}
+    assert not problemas
+
+def test_dialeto_nao_suportado():
+    engine = SimpleNamespace(dialect=SimpleNamespace(name='mysql'))
+    with pytest.raises(planos.DialetoNaoSuportado, match='mysql'):
+        planos.verificar(engine)
@@ -0,0 +1,48 @@
+import pytest
+from datetime import date, datetime
+from flask_jwt_extended import create_access_token
+from app.models import db
+from app.models.investment import Investment, InvestmentCategory, UserInvestment
+
+@pytest.fixture
+def headers(app, usuario):
+    with app.app_context():
+        return {'Authorization': f'Bearer {create_access_token(identity=str(usuario))}'}
+
+@pytest.mark.parametrize('meses', ['-1', '601', 'doze'])
+def test_meses_invalido(app, headers, meses):
+    resposta = app.test_client().get(f'/api/portfolio/projecao?meses={meses}', headers=headers)
+    assert resposta.status_code == 400
+
+@pytest.mark.parametrize('meses', ['0', '12', '600'])
+def test_meses_valido(app, headers, meses):
+    resposta = app.test_client().get(f'/api/portfolio/projecao?meses={meses}', headers=headers)
+    assert resposta.status_code == 200
+    assert len(resposta.get_json()['curva']) == int(meses) + 1
+
+def _aplicar(usuario, data_aplicacao, prazo=12, isento=True):
+    investimento = Investment(titulo='CRI teste', categoria=InvestmentCategory.CRI, valor_minimo=100,
+                              taxa_retorno=12, prazo=prazo, isencao_ir=isento)
+    db.session.add(investimento)
+    db.session.flush()
+    db.session.add(UserInvestment(user_id=usuario, investment_id=investimento.id, valor_aplicado=1000,
+                                  data_aplicacao=data_aplicacao))
+    db.session.commit()
+
+def test_mes_zero_inclui_rendimento_ja_acumulado(app, usuario):
+    from app.services import projection
+    with app.app_context():
+        _aplicar(usuario, datetime(2024, 1, 15))
+        _, proj = projection.projetar_carteira(usuario, hoje=date(2024, 7, 15))
+    assert proj['curva_bruta'][0] == pytest.approx(1000 * 1.12 ** 0.5)
+    # Restam 6 dos 12 meses; depois disso a curva chega ao vencimento e para
+    assert len(proj['curva_bruta']) == 7
+    assert proj['curva_bruta'][6] == pytest.approx(proj['valor_bruto'][0])
+
+def test_posicao_vencida_fica_no_valor_liquido(app, usuario):
+    from app.services import projection
+    with app.app_context():
+        _aplicar(usuario, datetime(2022, 3, 10), isento=False)
+        _, proj = projection.projetar_carteira(usuario, meses=12, hoje=date(2024, 7, 15))
+    assert proj['curva_liquida'] == pytest.approx([proj['valor_liquido'][0]] * 13)
+    assert proj['curva_bruta'] == pytest.approx([proj['valor_bruto'][0]] * 13)
@@ -0,0 +1,51 @@
+import threading
+from decimal import Decimal
+from app.models import db
+from app.models.ledger import LedgerEntry
+from app.models.user import Transaction, TransactionType, TransactionStatus
+from app.services import ledger, settlement
+
+def _deposito_pendente(user_id, pix_id, valor):
+    transaction = Transaction(user_id=user_id, tipo=TransactionType.DEPOSITO, valor=valor,
+                              status=TransactionStatus.PENDENTE, pix_id=pix_id)
+    db.session.add(transaction)
+    db.session.commit()
+    return transaction.id
+
+def test_liquidacao_idempotente(app, usuario):
+    with app.app_context():
+        _deposito_pendente(usuario, 'pix-1', Decimal('100.00'))
+        primeiro = settlement.liquidar_lote([('pix-1', Decimal('100.00'))])
+        segundo = settlement.liquidar_lote([('pix-1', Decimal('100.00'))])
+        assert primeiro['liquidados'] == 1
+        assert segundo['liquidados'] == 0
+        assert segundo['ja_liquidados'] == 1
+        assert ledger.saldo(usuario) == Decimal('100.00')
+
+def test_liquidacoes_concorrentes_creditam_uma_vez(app, usuario):
+    with app.app_context():
+        transaction_id = _deposito_pendente(usuario, 'pix-1', Decimal('100.00'))
+
+    largada = threading.Barrier(4)
+    relatorios, erros = [], []
+
+    def liquidar():
+        try:
+            with app.app_context():
+                largada.wait()
+                relatorios.append(settlement.liquidar_lote([('pix-1', Decimal('100.00'))]))
+        except Exception as e:
+            erros.append(e)
+
+    threads = [threading.Thread(target=liquidar) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not erros
+    assert sum(relatorio['liquidados'] for relatorio in relatorios) == 1
+    with app.app_context():
+        assert ledger.saldo(usuario) == Decimal('100.00')
+        pernas = db.session.query(LedgerEntry).filter_by(transaction_id=transaction_id).count()
+        assert pernas == 2
@@ -0,0 +1,42 @@
+from datetime import date, datetime
+from decimal import Decimal
+from app.models import db
+from app.models.investment import Investment, UserInvestment, InvestmentCategory
+from app.services import statements
+
+def _aplicar(user_id, investment_id, valor, data):
+    db.session.add(UserInvestment(user_id=user_id, investment_id=investment_id, valor_aplicado=valor,
+                                  data_aplicacao=data))
+    db.session.commit()
+
+def _investimento():
+    investment = Investment(titulo='CRI Teste', categoria=InvestmentCategory.CRI, valor_minimo=Decimal('100'),
+                            taxa_retorno=Decimal('12.00'), prazo=24, isencao_ir=True)
+    db.session.add(investment)
+    db.session.commit()
+    return investment.id
+
+def _aplicado_no_ano(linhas):
+    return sum(linha[statements.CAMPOS_INFORME.index('aplicado_no_ano')] for linha in linhas)
+
+def test_ano_corrente_ignora_consolidacao(app, usuario):
+    hoje = date(2025, 6, 30)
+    with app.app_context():
+        investment_id = _investimento()
+        _aplicar(usuario, investment_id, Decimal('1000.00'), datetime(2025, 2, 1))
+        statements.consolidar(2025, hoje=hoje)
+        _aplicar(usuario, investment_id, Decimal('500.00'), datetime(2025, 5, 1))
+
+        linhas = list(statements.informe(2025, usuario, hoje=hoje))
+        assert _aplicado_no_ano(linhas) == Decimal('1500.00')
+
+def test_ano_encerrado_usa_consolidacao(app, usuario):
+    with app.app_context():
+        investment_id = _investimento()
+        _aplicar(usuario, investment_id, Decimal('1000.00'), datetime(2024, 2, 1))
+        statements.consolidar(2024, hoje=date(2025, 1, 10))
+        # Aplicação gravada depois da consolidação: só o cálculo na hora a enxergaria
+        _aplicar(usuario, investment_id, Decimal('500.00'), datetime(2024, 3, 1))
+
+        linhas = list(statements.informe(2024, usuario, hoje=date(2025, 6, 30)))
+        assert _aplicado_no_ano(linhas) == Decimal('1000.00')
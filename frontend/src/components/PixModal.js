@@ -111,7 +111,7 @@ const PixModal = ({ onClose, onSuccess }) => {
                 <h4>QR Code PIX</h4>
                 <div className="qr-code-container">
                   <img 
-                    src={`data:image/png;base64,${pixData.qr_code}`}
+                    src={ApiService.pixQrCodeUrl(pixData.qr_code_url)}
                     alt="QR Code PIX"
                     className="qr-code"
                   />
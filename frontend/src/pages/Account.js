@@ -8,6 +8,7 @@ const Account = () => {
   const [saldo, setSaldo] = useState(0);
   const [investments, setInvestments] = useState([]);
   const [transactions, setTransactions] = useState([]);
+  const [resumo, setResumo] = useState(null);
   const [loading, setLoading] = useState(true);
   const [showPixModal, setShowPixModal] = useState(false);
 
@@ -18,17 +19,13 @@ const Account = () => {
   const loadAccountData = async () => {
     try {
       setLoading(true);
-      const [userData, saldoData, investmentsData, transactionsData] = await Promise.all([
-        ApiService.getProfile(),
-        ApiService.getSaldo(),
-        ApiService.getMeusInvestimentos(),
-        ApiService.getTransacoes()
-      ]);
-
-      setUser(userData);
-      setSaldo(saldoData.saldo);
-      setInvestments(investmentsData);
-      setTransactions(transactionsData);
+      const painel = await ApiService.getDashboard();
+
+      setUser(painel.perfil);
+      setSaldo(painel.saldo);
+      setInvestments(painel.investimentos);
+      setTransactions(painel.transacoes.transacoes);
+      setResumo(painel.resumo);
     } catch (error) {
       console.error('Erro ao carregar dados da conta:', error);
       alert('Erro ao carregar dados da conta');
@@ -37,6 +34,17 @@ const Account = () => {
     }
   };
 
+  const anoInforme = new Date().getFullYear() - 1;
+
+  const handleExport = async (exportar) => {
+    try {
+      await exportar();
+    } catch (error) {
+      console.error('Erro ao exportar:', error);
+      alert('Erro ao exportar');
+    }
+  };
+
   const formatCurrency = (value) => {
     return new Intl.NumberFormat('pt-BR', {
       style: 'currency',
@@ -72,10 +80,6 @@ const Account = () => {
     return statuses[status] || status;
   };
 
-  const calculateTotalInvested = () => {
-    return investments.reduce((total, inv) => total + inv.valor_aplicado, 0);
-  };
-
   const handlePixSuccess = () => {
     setShowPixModal(false);
     loadAccountData(); // Recarregar dados após depósito
@@ -122,11 +126,19 @@ const Account = () => {
           <div className="summary-stats">
             <div className="stat-item">
               <span className="stat-label">Total Investido:</span>
-              <span className="stat-value">{formatCurrency(calculateTotalInvested())}</span>
+              <span className="stat-value">{formatCurrency(resumo?.total_aplicado || 0)}</span>
             </div>
             <div className="stat-item">
               <span className="stat-label">Quantidade de Investimentos:</span>
-              <span className="stat-value">{investments.length}</span>
+              <span className="stat-value">{resumo?.quantidade || 0}</span>
+            </div>
+            <div className="stat-item">
+              <span className="stat-label">Taxa Média Ponderada:</span>
+              <span className="stat-value">{(resumo?.taxa_media_ponderada || 0).toFixed(2)}% a.a.</span>
+            </div>
+            <div className="stat-item">
+              <span className="stat-label">Rendimento Projetado:</span>
+              <span className="stat-value">{formatCurrency(resumo?.rendimento_projetado || 0)}</span>
             </div>
           </div>
         </div>
@@ -164,6 +176,14 @@ const Account = () => {
       {/* Histórico de Transações */}
       <div className="section-card">
         <h2>Histórico de Transações</h2>
+        <div className="export-actions">
+          <button className="btn btn-secondary" onClick={() => handleExport(() => ApiService.exportarExtrato())}>
+            Exportar extrato (CSV)
+          </button>
+          <button className="btn btn-secondary" onClick={() => handleExport(() => ApiService.exportarInforme(anoInforme))}>
+            Informe de rendimentos {anoInforme}
+          </button>
+        </div>
         {transactions.length === 0 ? (
           <div className="empty-state">
             <p>Nenhuma transação encontrada.</p>
@@ -7,36 +7,73 @@ const Home = () => {
   const [investments, setInvestments] = useState([]);
   const [categories, setCategories] = useState([]);
   const [selectedCategory, setSelectedCategory] = useState('');
+  const [busca, setBusca] = useState('');
+  const [buscaAplicada, setBuscaAplicada] = useState('');
   const [loading, setLoading] = useState(true);
   const [saldo, setSaldo] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [tempoReal, setTempoReal] = useState(false);
 
   useEffect(() => {
     loadData();
   }, []);
 
+  // Aplica a busca só quando o usuário para de digitar
+  useEffect(() => {
+    const timer = setTimeout(() => setBuscaAplicada(busca.trim()), 300);
+    return () => clearTimeout(timer);
+  }, [busca]);
+
   useEffect(() => {
     loadInvestments();
-  }, [selectedCategory]);
+  }, [selectedCategory, buscaAplicada]);
+
+  // Valores captados e status chegam por SSE, sem recarregar o catálogo. Só
+  // quando o backend é servido por ASGI: nos workers síncronos cada conexão
+  // aberta prenderia um worker
+  const investmentIds = investments.map((investment) => investment.id).join(',');
+  useEffect(() => {
+    if (!tempoReal || !investmentIds) {
+      return undefined;
+    }
+    const source = ApiService.streamCaptacao(investmentIds.split(','), (deltas) => {
+      const porId = new Map(deltas.map((delta) => [delta.id, delta]));
+      setInvestments((current) => current.map((investment) => (
+        porId.has(investment.id) ? { ...investment, ...porId.get(investment.id) } : investment
+      )));
+    });
+    return () => source.close();
+  }, [tempoReal, investmentIds]);
 
   const loadData = async () => {
     try {
-      const [categoriesData, saldoData] = await Promise.all([
+      const [categoriesData, painel, config] = await Promise.all([
         ApiService.getCategories(),
-        ApiService.getSaldo()
+        ApiService.getDashboard(['saldo']),
+        ApiService.getConfig().catch(() => ({ captacao_tempo_real: false }))
       ]);
       
       setCategories(categoriesData);
-      setSaldo(saldoData.saldo);
+      setSaldo(painel.saldo);
+      setTempoReal(config.captacao_tempo_real);
     } catch (error) {
       console.error('Erro ao carregar dados:', error);
     }
   };
 
+  const fetchInvestments = (filtros) => (
+    buscaAplicada
+      ? ApiService.searchInvestments(buscaAplicada, filtros)
+      : ApiService.getInvestments(filtros)
+  );
+
   const loadInvestments = async () => {
     try {
       setLoading(true);
-      const data = await ApiService.getInvestments(selectedCategory);
-      setInvestments(data);
+      const data = await fetchInvestments({ categoria: selectedCategory });
+      setInvestments(data.investments);
+      setNextCursor(data.next_cursor);
     } catch (error) {
       console.error('Erro ao carregar investimentos:', error);
       alert('Erro ao carregar investimentos');
@@ -45,14 +82,29 @@ const Home = () => {
     }
   };
 
+  const loadMoreInvestments = async () => {
+    try {
+      setLoadingMore(true);
+      const data = await fetchInvestments({
+        categoria: selectedCategory,
+        cursor: nextCursor
+      });
+      setInvestments((current) => [...current, ...data.investments]);
+      setNextCursor(data.next_cursor);
+    } catch (error) {
+      console.error('Erro ao carregar investimentos:', error);
+      alert('Erro ao carregar investimentos');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleInvest = async (investmentId, valor) => {
     try {
-      await ApiService.investir(investmentId, valor);
-      // Recarregar saldo após investimento
-      const saldoData = await ApiService.getSaldo();
-      setSaldo(saldoData.saldo);
-      // Recarregar investimentos para atualizar valores captados
-      loadInvestments();
+      const resultado = await ApiService.investir(investmentId, valor);
+      // A resposta do investimento já traz o saldo atualizado
+      setSaldo(resultado.saldo_restante);
+      // O valor captado do investimento é atualizado pelo stream de captação
     } catch (error) {
       throw error;
     }
@@ -78,6 +130,17 @@ const Home = () => {
       </div>
 
       <div className="filters-section">
+        <div className="filter-group">
+          <label htmlFor="search-input">Buscar por emissor, devedor ou palavra-chave:</label>
+          <input
+            id="search-input"
+            type="search"
+            value={busca}
+            onChange={(e) => setBusca(e.target.value)}
+            placeholder="Ex.: debêntures energia"
+            className="search-input"
+          />
+        </div>
         <div className="filter-group">
           <label htmlFor="category-filter">Filtrar por categoria:</label>
           <select
@@ -105,18 +168,31 @@ const Home = () => {
         ) : investments.length === 0 ? (
           <div className="empty-state">
             <h3>Nenhum investimento encontrado</h3>
-            <p>Não há investimentos disponíveis para a categoria selecionada.</p>
+            <p>Não há investimentos disponíveis para a busca e a categoria selecionadas.</p>
           </div>
         ) : (
-          <div className="investments-grid">
-            {investments.map((investment) => (
-              <InvestmentCard
-                key={investment.id}
-                investment={investment}
-                onInvest={handleInvest}
-              />
-            ))}
-          </div>
+          <>
+            <div className="investments-grid">
+              {investments.map((investment) => (
+                <InvestmentCard
+                  key={investment.id}
+                  investment={investment}
+                  onInvest={handleInvest}
+                />
+              ))}
+            </div>
+            {nextCursor && (
+              <div className="load-more">
+                <button
+                  className="btn btn-secondary"
+                  onClick={loadMoreInvestments}
+                  disabled={loadingMore}
+                >
+                  {loadingMore ? 'Carregando...' : 'Carregar mais'}
+                </button>
+              </div>
+            )}
+          </>
         )}
       </div>
     </div>
@@ -48,6 +48,29 @@ class ApiService {
     }
   }
 
+  // Downloads gerados em fluxo pelo servidor (CSV ou JSON lines)
+  async download(endpoint, nomeArquivo) {
+    const response = await fetch(`${API_BASE_URL}${endpoint}`, { headers: this.getHeaders() });
+    if (!response.ok) {
+      const data = await response.json().catch(() => ({}));
+      throw new Error(data.error || 'Erro na requisição');
+    }
+    const url = URL.createObjectURL(await response.blob());
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = nomeArquivo;
+    link.click();
+    URL.revokeObjectURL(url);
+  }
+
+  async exportarExtrato(formato = 'csv') {
+    return this.download(`/api/extrato?formato=${formato}`, `extrato.${formato}`);
+  }
+
+  async exportarInforme(ano, formato = 'csv') {
+    return this.download(`/api/informe/${ano}?formato=${formato}`, `informe-${ano}.${formato}`);
+  }
+
   // Autenticação
   async login(cpf, senha) {
     const data = await this.request('/api/login', {
@@ -74,9 +97,27 @@ class ApiService {
   }
 
   // Investimentos
-  async getInvestments(categoria = null) {
-    const params = categoria ? `?categoria=${categoria}` : '';
-    return this.request(`/api/investments${params}`);
+  async getInvestments(filtros = {}) {
+    const params = new URLSearchParams();
+    Object.entries(filtros).forEach(([key, value]) => {
+      if (value !== null && value !== undefined && value !== '') {
+        params.append(key, value);
+      }
+    });
+    const query = params.toString();
+    return this.request(`/api/investments${query ? `?${query}` : ''}`);
+  }
+
+  // Busca textual no título e na descrição, ordenada por relevância; aceita
+  // os mesmos filtros e cursor de getInvestments
+  async searchInvestments(texto, filtros = {}) {
+    const params = new URLSearchParams({ q: texto });
+    Object.entries(filtros).forEach(([key, value]) => {
+      if (value !== null && value !== undefined && value !== '') {
+        params.append(key, value);
+      }
+    });
+    return this.request(`/api/investments/search?${params.toString()}`);
   }
 
   async getCategories() {
@@ -94,6 +135,10 @@ class ApiService {
     return this.request('/api/meus_investimentos');
   }
 
+  async getPortfolioResumo() {
+    return this.request('/api/portfolio/resumo');
+  }
+
   // Saldo e transações
   async getSaldo() {
     return this.request('/api/saldo');
@@ -113,10 +158,43 @@ class ApiService {
     });
   }
 
+  pixQrCodeUrl(path) {
+    return `${API_BASE_URL}${path}`;
+  }
+
   async getTransacoes() {
     return this.request('/api/transacoes');
   }
 
+  // Painel da conta em uma única chamada; secoes limita o que é carregado
+  async getDashboard(secoes = []) {
+    const query = secoes.length ? `?secoes=${secoes.join(',')}` : '';
+    return this.request(`/api/dashboard${query}`);
+  }
+
+  // Progresso da captação em tempo real (server-sent events). O EventSource
+  // não envia cabeçalhos, então o token vai na query string.
+  // Recursos do servidor; não muda durante a sessão, então é buscado uma vez
+  getConfig() {
+    if (!this.config) {
+      this.config = this.request('/api/config').catch((error) => {
+        this.config = null;
+        throw error;
+      });
+    }
+    return this.config;
+  }
+
+  streamCaptacao(ids, onDeltas) {
+    const params = new URLSearchParams({ jwt: this.token || '' });
+    if (ids.length && ids.length <= 200) {
+      params.append('ids', ids.join(','));
+    }
+    const source = new EventSource(`${API_BASE_URL}/api/investments/stream?${params}`);
+    source.addEventListener('captacao', (event) => onDeltas(JSON.parse(event.data)));
+    return source;
+  }
+
   logout() {
     this.setToken(null);
   }